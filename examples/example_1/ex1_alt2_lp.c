@@ -20,6 +20,10 @@ float code(float x) {
 	return powf((sqrtf(x) + 1.0), -1.0);
 }
 
+#ifdef VFC_DRIVER
+#include "vfc_driver.h"
+VFC_DRIVER_MAIN1(code)
+#else
 int main(int argc, char **argv){
 	float x = atof(argv[1]);
 
@@ -28,4 +32,5 @@ int main(int argc, char **argv){
 	printf("x = %.17e, sqrt(x) = %.17e\n", x, result);
 
 	return 0;
-}
\ No newline at end of file
+}
+#endif
@@ -7,6 +7,10 @@ float code(float x) {
 	return fma(0.5f, x, (1.0f - sqrtf(x)));
 }
 
+#ifdef VFC_DRIVER
+#include "vfc_driver.h"
+VFC_DRIVER_MAIN1(code)
+#else
 int main(int argc, char **argv){
 	float x = atof(argv[1]);
 
@@ -15,4 +19,5 @@ int main(int argc, char **argv){
 	printf("x = %.17e, sqrt(x) = %.17e\n", x, result);
 
 	return 0;
-}
\ No newline at end of file
+}
+#endif
@@ -17,6 +17,11 @@ import argparse
 from pathlib import Path
 from datetime import datetime
 
+# Shared tooling (.tab readers, statistics) lives in tools/vfctools
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'tools'))
+from vfctools.summary import file_summary
+from vfctools.tabfile import read_tab
+
 def parse_arguments():
     """Parse command line arguments"""
     parser = argparse.ArgumentParser(
@@ -71,57 +76,29 @@ Examples:
 
 def load_data(filename):
     """Load and parse the data file"""
+    # One pass over the file, or its columnar copy if the runner wrote one;
+    # header lines are detected
     try:
-        # Try to load with headers
-        data = np.loadtxt(filename, skiprows=1,
-                         dtype=dict(names=('i', 'x', 'result'),
-                                  formats=('i4', 'f8', 'f8')))
-    except:
-        # Try without headers or with different format
-        try:
-            data = np.loadtxt(filename,
-                             dtype=dict(names=('i', 'x', 'result'),
-                                      formats=('i4', 'f8', 'f8')))
-        except Exception as e:
-            print(f"Error loading data file: {e}")
-            sys.exit(1)
+        data, _ = read_tab(filename, names=('i', 'x', 'result'))
+    except Exception as e:
+        print(f"Error loading data file: {e}")
+        sys.exit(1)
     
     return data
 
-def compute_statistics(data, precision_bits):
+def compute_statistics(filename, precision_bits):
     """Compute mean, standard deviation, and significant digits"""
     # Convert binary to decimal precision
     precision_decimal = float(precision_bits) * math.log(2, 10)
     
-    # Get unique x values
-    x_values = np.unique(data['x'])
-    
-    # Initialize result arrays
-    mu_values = []
-    sigma_values = []
-    s_values = []
-    
-    for x in x_values:
-        # Select all samples for given x
-        samples = data[data['x'] == x]['result']
-        
-        # Compute mean and standard deviation
-        mu = np.mean(samples)
-        sigma = np.std(samples)
-        
-        # Compute significant digits using Stott Parker's formula
-        if sigma == 0:
-            s = precision_decimal
-        elif mu == 0:
-            s = 0
-        else:
-            s = min(-math.log10(sigma / abs(mu)), precision_decimal)
-        
-        mu_values.append(mu)
-        sigma_values.append(sigma)
-        s_values.append(s)
+    # Statistics of every x from the per-point summary next to the data
+    # file (rebuilt if missing or out of date); Stott Parker's formula,
+    # capped only when sigma is exactly 0
+    summary = file_summary(filename, quantiles=False)
+    stats = summary.statistics(precision_bits, tiny=0)
+    x = stats[summary.inputs[0]]
     
-    return x_values, np.array(mu_values), np.array(sigma_values), np.array(s_values), precision_decimal
+    return x, stats['mean'], stats['std'], stats['sig_digits'], precision_decimal
 
 def create_plot(data, x_values, mu_values, sigma_values, s_values, precision_decimal, args):
     """Create the plot with three subplots"""
@@ -304,7 +281,7 @@ def main():
     output_dir = create_output_directory(args)
     print(f"Output directory: {output_dir}")
     
-    # Load data
+    # Load data; the samples are only needed for the scatter plot
     print(f"Loading data from: {args.datafile}")
     data = load_data(args.datafile)
     print(f"Loaded {len(data)} data points")
@@ -312,7 +289,7 @@ def main():
     # Compute statistics
     print("Computing statistics...")
     x_values, mu_values, sigma_values, s_values, precision_decimal = compute_statistics(
-        data, args.precision)
+        args.datafile, args.precision)
     
     # Print summary
     print_summary(x_values, mu_values, sigma_values, s_values)
@@ -8,12 +8,24 @@ float gelu(float x0){
     return x0 / (1.0f + expf(-2.0f * c * (x0 + 0.044715f * x0*x0*x0)));
 }
 
+#ifdef VFC_DRIVER
+#include "vfc_driver.h"
+VFC_DRIVER_MAIN1(gelu)
+#else
 int main(int argc, char **argv) {
+    if (argc == 1) {
+        // Reference mode: one value per line on stdin, until its end
+        double x;
+        while (scanf("%lf", &x) == 1)
+            printf("%.17e\n", gelu(x));
+        return feof(stdin) ? 0 : 1;
+    }
     if (argc != 2) {
-        fprintf(stderr, "Usage: %s <value>\n", argv[0]);
+        fprintf(stderr, "Usage: %s <value>\n       %s < values\n", argv[0], argv[0]);
         return 1;
     }
     float x = atof(argv[1]);
     printf("%.17e\n", gelu(x));
     return 0;
-}
\ No newline at end of file
+}
+#endif
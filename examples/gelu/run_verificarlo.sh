@@ -3,11 +3,17 @@
 # Supports programs with or without method parameters
 
 set -e
+# A failing kernel fails its pipeline, not just the last command of it
+set -o pipefail
 export LC_ALL=C
 
 # Record start time
 SCRIPT_START=$(date +%s)
 
+# Shared driver and tooling
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+TOOLS_DIR="${SCRIPT_DIR}/../../tools"
+
 # Function to display usage
 usage() {
     echo "Usage: $0 -p PROGRAM -t TYPE -v VPRECISION -M MODE [-m METHOD] [-r RANGE] [-s STEP] [-i ITERATIONS] [-o OUTPUT_DIR] [-e EXTRA_FILES]"
@@ -124,16 +130,25 @@ echo "Output Directory: $OUTPUT_DIR"
 [ -n "$EXTRA_ARGS" ] && echo "Extra Arguments: $EXTRA_ARGS"
 echo "================================"
 
-# Build compile command
-COMPILE_CMD="verificarlo -D${REAL}"
-[ -n "$EXTRA_DEFS" ] && COMPILE_CMD="$COMPILE_CMD $EXTRA_DEFS"
-COMPILE_CMD="$COMPILE_CMD ${PROGRAM}.c"
-[ -n "$EXTRA_FILES" ] && COMPILE_CMD="$COMPILE_CMD $EXTRA_FILES"
-COMPILE_CMD="$COMPILE_CMD -o ${PROGRAM}_verificarlo -lm "
+# Programs taking a method or extra arguments keep their own main();
+# everything else is built against the shared batch driver in tools/
+if [ -z "$METHOD" ] && [ -z "$EXTRA_ARGS" ]; then
+    BATCH_MODE=true
+else
+    BATCH_MODE=false
+fi
+
+# Build compile arguments (the output path is chosen by the compile cache)
+COMPILE_ARGS="-D${REAL}"
+[ "$BATCH_MODE" = true ] && COMPILE_ARGS="$COMPILE_ARGS -DVFC_DRIVER -I${TOOLS_DIR}"
+[ -n "$EXTRA_DEFS" ] && COMPILE_ARGS="$COMPILE_ARGS $EXTRA_DEFS"
+COMPILE_ARGS="$COMPILE_ARGS ${PROGRAM}.c"
+[ -n "$EXTRA_FILES" ] && COMPILE_ARGS="$COMPILE_ARGS $EXTRA_FILES"
+COMPILE_ARGS="$COMPILE_ARGS -lm"
 
-# Compile source code with verificarlo
-echo "Compiling with: $COMPILE_CMD"
-eval $COMPILE_CMD
+# Compile source code with verificarlo, reusing a cached binary if the
+# sources, flags and compiler are unchanged
+BINARY=$(eval python3 '"${TOOLS_DIR}/vfc_build.py"' $COMPILE_ARGS) || exit 1
 
 # Set Verificarlo backend configuration
 export VFC_BACKENDS="libinterflop_mca.so --precision-binary32=$VERIFICARLO_PRECISION --precision-binary64=$VERIFICARLO_PRECISION --mode $VERIFICARLO_MCAMODE"
@@ -145,9 +160,6 @@ else
     OUTPUT_FILE="${OUTPUT_DIR}/${PROGRAM}-${REAL}-vp${VERIFICARLO_PRECISION}-${VERIFICARLO_MCAMODE}.tab"
 fi
 
-# Write header to output file
-echo "i x result" > "$OUTPUT_FILE"
-
 # Function to compare floating point numbers for seq
 float_seq() {
     local start=$1
@@ -164,43 +176,59 @@ for x in np.arange($start, $end + $step/2, $step):
 # Build program command
 build_program_cmd() {
     local x=$1
-    local cmd="./${PROGRAM}_verificarlo $x"
+    local cmd="$BINARY $x"
     [ -n "$METHOD" ] && cmd="$cmd $METHOD"
     [ -n "$EXTRA_ARGS" ] && cmd="$cmd $EXTRA_ARGS"
     echo "$cmd"
 }
 
-# Run tests for all values in the specified range
+# Run tests for all values in the specified range. Samples are streamed
+# into the .tab file (header "i x result") by vfc_tabwrite.py, which
+# computes the summary statistics on the way
+TABWRITE=(python3 "${TOOLS_DIR}/vfc_tabwrite.py" "$OUTPUT_FILE" "i x result")
 echo "Running tests..."
 total_values=$(float_seq "$RANGE_START" "$RANGE_END" "$STEP" | wc -l)
 current=0
 
-for x in $(float_seq "$RANGE_START" "$RANGE_END" "$STEP"); do
-    current=$((current + 1))
-    printf "\rProgress: %d/%d (%.1f%%)" "$current" "$total_values" "$(echo "scale=1; $current * 100 / $total_values" | bc)"
-
-    for i in $(seq 1 "$ITERATIONS"); do
-        # Build and run the program command
-        cmd=$(build_program_cmd "$x")
-        output=$(eval $cmd 2>&1)
-
-        # Parse output - try different strategies
-        # Strategy 1: Look for two numbers (x and result)
-        result=$(echo "$output" | grep -E "^[[:space:]]*[-+]?[0-9]*\.?[0-9]+([eE][-+]?[0-9]+)?[[:space:]]+[-+]?[0-9]*\.?[0-9]+([eE][-+]?[0-9]+)?[[:space:]]*$" | tail -n 1 | awk '{print $2}')
-
-        # Strategy 2: If no result, try just the last number on the last line
-        if [ -z "$result" ]; then
-            result=$(echo "$output" | tail -n 1 | grep -oE "[-+]?[0-9]*\.?[0-9]+([eE][-+]?[0-9]+)?" | tail -n 1)
-        fi
-
-        # Strategy 3: If still no result, use the entire last line
-        if [ -z "$result" ]; then
-            result=$(echo "$output" | tail -n 1)
-        fi
-
-        echo "$i $x $result" >> "$OUTPUT_FILE"
-    done
-done
+if [ "$BATCH_MODE" = true ]; then
+    # A single long-lived process takes every sample: "<iterations> <x>"
+    SUMMARY=$(for x in $(float_seq "$RANGE_START" "$RANGE_END" "$STEP"); do
+        echo "$ITERATIONS $x"
+    done | "$BINARY" --batch | "${TABWRITE[@]}") || {
+        echo "Error: $BINARY failed; $OUTPUT_FILE is incomplete" >&2
+        exit 1
+    }
+else
+    SUMMARY=$(for x in $(float_seq "$RANGE_START" "$RANGE_END" "$STEP"); do
+        current=$((current + 1))
+        printf "\rProgress: %d/%d (%.1f%%)" "$current" "$total_values" "$(echo "scale=1; $current * 100 / $total_values" | bc)" >&2
+
+        for i in $(seq 1 "$ITERATIONS"); do
+            # Build and run the program command
+            cmd=$(build_program_cmd "$x")
+            output=$(eval $cmd 2>&1)
+
+            # Parse output - try different strategies
+            # Strategy 1: Look for two numbers (x and result)
+            result=$(echo "$output" | grep -E "^[[:space:]]*[-+]?[0-9]*\.?[0-9]+([eE][-+]?[0-9]+)?[[:space:]]+[-+]?[0-9]*\.?[0-9]+([eE][-+]?[0-9]+)?[[:space:]]*$" | tail -n 1 | awk '{print $2}')
+
+            # Strategy 2: If no result, try just the last number on the last line
+            if [ -z "$result" ]; then
+                result=$(echo "$output" | tail -n 1 | grep -oE "[-+]?[0-9]*\.?[0-9]+([eE][-+]?[0-9]+)?" | tail -n 1)
+            fi
+
+            # Strategy 3: If still no result, use the entire last line
+            if [ -z "$result" ]; then
+                result=$(echo "$output" | tail -n 1)
+            fi
+
+            echo "$i $x $result"
+        done
+    done | "${TABWRITE[@]}") || {
+        echo "Error: sampling failed; $OUTPUT_FILE is incomplete" >&2
+        exit 1
+    }
+fi
 
 echo -e "\nTests completed. Results saved to: $OUTPUT_FILE"
 
@@ -208,29 +236,7 @@ echo -e "\nTests completed. Results saved to: $OUTPUT_FILE"
 echo -e "\n=== Summary Statistics ==="
 echo "Total test points: $total_values"
 echo "Total runs: $((total_values * ITERATIONS))"
-
-# Basic statistics using awk
-awk 'NR>1 {
-    # Try to parse the third column as a number
-    if ($3 ~ /^[-+]?[0-9]*\.?[0-9]+([eE][-+]?[0-9]+)?$/) {
-        sum += $3
-        sumsq += $3 * $3
-        count++
-    }
-}
-END {
-    if (count > 0) {
-        mean = sum / count
-        variance = (sumsq / count) - (mean * mean)
-        if (variance < 0) variance = 0
-        stddev = sqrt(variance)
-        printf "Mean result: %.6e\n", mean
-        printf "Std deviation: %.6e\n", stddev
-        printf "Valid numeric results: %d/%d\n", count, NR-1
-    } else {
-        print "Warning: No valid numeric results found"
-    }
-}' "$OUTPUT_FILE"
+echo "$SUMMARY"
 
 # Plot results if requested and plot.py exists
 if [ "$ENABLE_PLOT" = true ]; then
@@ -242,9 +248,6 @@ if [ "$ENABLE_PLOT" = true ]; then
     fi
 fi
 
-# Clean up executable
-rm -f "${PROGRAM}_verificarlo"
-
 # Calculate and display execution time
 SCRIPT_END=$(date +%s)
 DURATION=$((SCRIPT_END - SCRIPT_START))
@@ -16,6 +16,11 @@ matplotlib.use('Agg')
 
 import matplotlib.pyplot as plt
 
+# Shared tooling (.tab readers, statistics) lives in tools/vfctools
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'tools'))
+from vfctools.stats import group_statistics
+from vfctools.tabfile import read_tab
+
 def main():
     # Read command line arguments
     if len(sys.argv) < 4:
@@ -36,57 +41,18 @@ def main():
     # Convert binary to decimal precision
     prec_dec = float(prec_b) * math.log(2, 10)
 
-    # Count header lines (including the column names line)
-    with open(fname, 'r') as f:
-        header_lines = 0
-        for line in f:
-            if line.startswith('#') or line.strip() == 'i x result':
-                header_lines += 1
-            else:
-                # Check if this is actually a data line
-                parts = line.strip().split()
-                if len(parts) >= 3:
-                    try:
-                        int(parts[0])  # Try to parse first column as int
-                        float(parts[1])  # Try to parse second column as float
-                        float(parts[2])  # Try to parse third column as float
-                        break  # This is a valid data line
-                    except ValueError:
-                        header_lines += 1  # This is still a header line
-                else:
-                    header_lines += 1
-
-    # Parse table file
+    # Parse table file in one pass, or load its columnar copy if the
+    # runner wrote one
     # three columns:
     #   - i: sample number
     #   - x: input value
     #   - result: function evaluation on x
-    D = np.loadtxt(fname, skiprows=header_lines,
-            dtype = dict(names=('i', 'x', 'result'),
-                         formats=('i4', 'f8', 'f8')))
-
-    # Compute significant digits for each unique x value
-    x_values = np.unique(D['x'])
-    s_values = []
+    D, layout = read_tab(fname, names=('i', 'x', 'result'))
 
-    for x in x_values:
-        # select all result samples for given x
-        result_samples = D[D['x'] == x]['result']
-        
-        # Compute mu and sigma statistics
-        mu = np.mean(result_samples)
-        sigma = np.std(result_samples)
-        
-        # Compute significant digits
-        if sigma == 0:
-            s = prec_dec
-        elif mu == 0:
-            s = 0
-        else:
-            # Stott Parker's formula using mean as reference
-            s = min(-math.log10(sigma/abs(mu)), prec_dec)
-        
-        s_values.append(s)
+    # Compute significant digits for each unique x value at once
+    stats = group_statistics(D, ('x',), float(prec_b), tiny=0)
+    x_values = stats['x']
+    s_values = stats['sig_digits']
 
     # Create the plot in similar style to lineplotv
     fig, ax = plt.subplots(figsize=(7, 4))
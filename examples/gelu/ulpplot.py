@@ -1,71 +1,51 @@
 #!/usr/bin/env python3
 import csv
-import pandas as pd
 import numpy as np
-import subprocess
-import math
 import matplotlib.pyplot as plt
 import sys
 import argparse
+from pathlib import Path
 
-def get_true_value(x, c_program):
-    """Calls the compiled C program to get the high-precision value."""
-    # Pass the value as a command-line argument, not via stdin
-    command = [c_program, str(x)]
-    
-    try:
-        result = subprocess.run(
-            command, 
-            capture_output=True, 
-            text=True, 
-            check=True
-        )
-        output = result.stdout.strip()
-        
-        # Parse the scientific notation output (e.g., "1.23456789012345e-01")
-        return float(output)
-        
-    except subprocess.CalledProcessError as e:
-        print(f"Error running C program: {e}")
-        print(f"Command was: {' '.join(command)}")
-        print(f"Stderr: {e.stderr}")
-        print(f"Stdout: {e.stdout}")
-        sys.exit(1)
-    except ValueError as e:
-        print(f"Error parsing output from C program: {e}")
-        print(f"Output was: '{output}'")
-        sys.exit(1)
-
-
+# Shared tooling (per-point statistics, reference programs, ULP errors)
+# lives in tools/vfctools
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'tools'))
+from vfctools import ulp
+from vfctools.exact import REFERENCES
+from vfctools.reference import reference_for
+from vfctools.stats import summarize_file
 
 def main():
     parser = argparse.ArgumentParser(description='Analyze ULP errors from Verificarlo MCA results')
-    parser.add_argument('c_program', help='Path to the compiled C reference program')
+    parser.add_argument('c_program',
+                        help='In-process reference (gelu_exp or gelu_tanh) or path to the '
+                             'compiled C reference program')
     parser.add_argument('input_file', help='Path to the input .tab file from Verificarlo')
     parser.add_argument('output_csv', help='Path for the output CSV file with analysis results')
+    parser.add_argument('--histogram-csv',
+                        help='Path for the CSV histogram of the ULP errors of all the samples '
+                             '(default: next to output_csv, ending in _histogram.csv)')
     
     args = parser.parse_args()
     
-    # Validate that C program exists and is executable
+    # Validate that C program exists and is executable, unless the
+    # reference is computed in process
     import os
-    if not os.path.exists(args.c_program):
+    if args.c_program in REFERENCES:
+        pass
+    elif not os.path.exists(args.c_program):
         print(f"Error: C program '{args.c_program}' not found")
         sys.exit(1)
-    if not os.access(args.c_program, os.X_OK):
+    elif not os.access(args.c_program, os.X_OK):
         print(f"Error: C program '{args.c_program}' is not executable")
         sys.exit(1)
     
     print(f"Loading data from '{args.input_file}'...")
     
     try:
-        # Load the raw data from the .tab file
-        # Skip the header lines starting with #
-        df = pd.read_csv(
-            args.input_file, 
-            delim_whitespace=True, 
-            comment='#',
-            names=['i', 'x', 'result']
-        )
+        # Per-point summary of the .tab file. Samples with a NaN result
+        # are left out, so a point that sometimes overflows keeps the
+        # statistics of its other samples
+        summary = summarize_file(args.input_file, skip_nan=True)
     except FileNotFoundError:
         print(f"Error: Input file '{args.input_file}' not found")
         sys.exit(1)
@@ -73,80 +53,80 @@ def main():
         print(f"Error reading input file: {e}")
         sys.exit(1)
     
-    # Convert columns to appropriate types
-    df['x'] = pd.to_numeric(df['x'], errors='coerce')
-    df['result'] = pd.to_numeric(df['result'], errors='coerce')
-    
-    # Drop any rows where conversion failed (NaN values)
-    df = df.dropna()
+    # Skip points with a NaN input
+    points = summary.records
+    if summary.inputs:
+        points = points[~np.isnan(points[summary.inputs[0]])]
     
-    if df.empty:
+    if not len(points):
         print("Error: No valid data found in input file")
         sys.exit(1)
     
-    print(f"Processing {len(df)} data points...")
+    print(f"Processing {points['count'].sum()} data points...")
     
-    # Group the data by the unique input value
-    grouped = df.groupby('x')
+    # Mean and sample standard deviation (ddof=1) of every input value
+    x_values, means = points[summary.inputs[0]], points['mean']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        std_devs = np.sqrt(points['m2'] / (points['count'] - 1))
     
-    # Initialize tracking variables
+    # The high-precision values of all the inputs, computed in process or
+    # by a single run of the C program, which reads one value per line on
+    # stdin
+    try:
+        program = reference_for(args.c_program)
+        true_values = program(x_values[:, None].tolist())
+    except RuntimeError as e:
+        print(f"Error running C program: {e}")
+        sys.exit(1)
+    
+    # Calculate significant digits
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sig_digits = np.where((means != 0) & (std_devs > 0),
+                              -np.log10(std_devs / np.abs(means)),
+                              np.where(std_devs == 0, np.inf, 0.0))
+    
+    # ULP errors in the working precision (FLOAT or DOUBLE) of the input
+    # file, from the tag in its name
+    real = ulp.real_of(args.input_file)
+    abs_errors = np.abs(means - true_values)
+    ulp_errors = ulp.ulp_error(means, true_values, real)
+    print(f"Working precision: {real}")
+    
+    # ULP errors of the individual samples, read from the file a chunk at
+    # a time: their median, 99th percentile and maximum at each x, and a
+    # histogram of all of them
+    tail, histogram = ulp.error_distribution(args.input_file, points, true_values,
+                                             summary.inputs, real)
+    output_csv = Path(args.output_csv)
+    histogram_csv = args.histogram_csv or output_csv.with_name(output_csv.stem + '_histogram.csv')
+    
+    # Track the maximum ULP error
     max_ulp_error = 0.0
     max_ulp_x = None
-    
-    # Lists to store data for plotting
-    x_values_list = []
-    ulp_errors_list = []
+    if ulp_errors.max() > 0:
+        max_index = np.argmax(ulp_errors)
+        max_ulp_error, max_ulp_x = ulp_errors[max_index], x_values[max_index]
     
     # Open the output CSV file for writing
     with open(args.output_csv, 'w', newline='') as csvfile:
         writer = csv.writer(csvfile)
-        writer.writerow(['x', 'mean', 'std_dev', 'significant_digits', 'true_value', 'abs_error', 'ulp_error'])
-        
-        # Process each group of inputs
-        for x_value, group in grouped:
-            mca_results = group['result']
-            mean_val = mca_results.mean()
-            std_dev = mca_results.std()
-            
-            # Calculate significant digits
-            if mean_val != 0 and std_dev > 0:
-                sig_digits = -math.log10(std_dev / abs(mean_val))
-            else:
-                sig_digits = float('inf') if std_dev == 0 else 0
-            
-            # Get the true value for this input
-            true_val = get_true_value(x_value, args.c_program)
-            
-            abs_error = abs(mean_val - true_val)
-            
-            # Determine the precision based on the data type
-            # Check if we're dealing with float32 or float64
-            # Assuming float64 (double precision) by default
-            true_val_float = np.float64(true_val)
-            
-            # Use np.spacing() for ULP calculation
-            ulp = abs(np.spacing(true_val_float))
-            
-            ulp_error = abs_error / ulp if ulp != 0 else 0.0
-            
-            # Track the maximum ULP error
-            if ulp_error > max_ulp_error:
-                max_ulp_error = ulp_error
-                max_ulp_x = x_value
-            
-            # Store data for plotting
-            x_values_list.append(x_value)
-            ulp_errors_list.append(ulp_error)
-            
-            writer.writerow([x_value, mean_val, std_dev, sig_digits, true_val, abs_error, ulp_error])
+        writer.writerow(['x', 'mean', 'std_dev', 'significant_digits', 'true_value', 'abs_error', 'ulp_error',
+                         'p50_ulp_error', 'p99_ulp_error', 'max_ulp_error'])
+        writer.writerows(np.column_stack([x_values, means, std_devs, sig_digits, true_values,
+                                          abs_errors, ulp_errors, tail['p50'], tail['p99'],
+                                          tail['max']]).tolist())
+    ulp.write_histogram(histogram_csv, histogram)
     
     print(f"\nAnalysis complete. Results saved to '{args.output_csv}'")
+    print(f"Histogram of the ULP errors of all {histogram.sum()} samples saved to '{histogram_csv}'")
     print(f"\nSummary Statistics:")
-    print(f"  Total unique x values: {len(x_values_list)}")
+    print(f"  Total unique x values: {len(x_values)}")
     print(f"  Maximum ULP error: {max_ulp_error:.6f} at x = {max_ulp_x}")
-    print(f"  Mean ULP error: {np.mean(ulp_errors_list)}")
-    print(f"  Median ULP error: {np.median(ulp_errors_list)}")
-    print(f"  Min ULP error: {np.min(ulp_errors_list)}")
+    print(f"  Mean ULP error: {np.mean(ulp_errors)}")
+    print(f"  Median ULP error: {np.median(ulp_errors)}")
+    print(f"  Min ULP error: {np.min(ulp_errors)}")
+    print(f"  Largest p99 ULP error of the samples of an x: {np.nanmax(tail['p99'])}")
+    print(f"  Maximum ULP error of a single sample: {np.nanmax(tail['max'])}")
     
 
 if __name__ == "__main__":
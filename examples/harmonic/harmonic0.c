@@ -7,6 +7,10 @@ double harmonic(double x0, double x1){
     return (2*x0*x1)/(x0+x1);
 }
 
+#ifdef VFC_DRIVER
+#include "vfc_driver.h"
+VFC_DRIVER_MAIN2(harmonic)
+#else
 int main(int argc, char **argv) {
     if (argc != 3) {
         fprintf(stderr, "Usage: %s <value1> <value2>\n", argv[0]);
@@ -16,4 +20,5 @@ int main(int argc, char **argv) {
     double x1 = atof(argv[2]);
     printf("%.17e\n", harmonic(x0, x1));
     return 0;
-}
\ No newline at end of file
+}
+#endif
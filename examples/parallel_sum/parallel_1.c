@@ -8,6 +8,10 @@ double parallel_sum1(double x) {
     return v0;
 }
 
+#ifdef VFC_DRIVER
+#include "vfc_driver.h"
+VFC_DRIVER_MAIN1(parallel_sum1)
+#else
 int main(int argc, char **argv) {
     if (argc != 2) {
         fprintf(stderr, "Usage: %s <value>\n", argv[0]);
@@ -17,3 +21,4 @@ int main(int argc, char **argv) {
     printf("%.17e\n", parallel_sum1(x));
     return 0;
 }
+#endif
@@ -10,15 +10,18 @@ double parallel_sum1(double x) {
 
 int main() {
     double x;
+    long n = 0;
 
-    // Read one double value from standard input
-    if (scanf("%lf", &x) == 1) {
-        // If successful, call the function and print the result
+    // Read one double value per line from standard input, until its end
+    while (scanf("%lf", &x) == 1) {
+        // Call the function and print the result of each
         printf("%.17e\n", parallel_sum1(x));
-        return 0; // Success
-    } else {
+        n++;
+    }
+    if (n == 0 || !feof(stdin)) {
         // If scanf fails, print an error and exit
         fprintf(stderr, "Error: Failed to read a double value from input.\n");
         return 1; // Failure
     }
+    return 0; // Success
 }
\ No newline at end of file
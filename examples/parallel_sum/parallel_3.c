@@ -13,6 +13,10 @@ double parallel_sum3(double x) {
     return v0;
 }
 
+#ifdef VFC_DRIVER
+#include "vfc_driver.h"
+VFC_DRIVER_MAIN1(parallel_sum3)
+#else
 int main(int argc, char **argv) {
     if (argc != 2) {
         fprintf(stderr, "Usage: %s <value>\n", argv[0]);
@@ -22,3 +26,4 @@ int main(int argc, char **argv) {
     printf("%.17e\n", parallel_sum3(x));
     return 0;
 }
+#endif
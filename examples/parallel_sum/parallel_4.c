@@ -18,6 +18,10 @@ double parallel_sum4(double x) {
     return v0;
 }
 
+#ifdef VFC_DRIVER
+#include "vfc_driver.h"
+VFC_DRIVER_MAIN1(parallel_sum4)
+#else
 int main(int argc, char **argv) {
     if (argc != 2) {
         fprintf(stderr, "Usage: %s <value>\n", argv[0]);
@@ -27,3 +31,4 @@ int main(int argc, char **argv) {
     printf("%.17e\n", parallel_sum4(x));
     return 0;
 }
+#endif
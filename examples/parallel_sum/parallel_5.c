@@ -27,6 +27,10 @@ double parallel_sum5(double x) {
     return v0;
 }
 
+#ifdef VFC_DRIVER
+#include "vfc_driver.h"
+VFC_DRIVER_MAIN1(parallel_sum5)
+#else
 int main(int argc, char **argv) {
     if (argc != 2) {
         fprintf(stderr, "Usage: %s <value>\n", argv[0]);
@@ -36,3 +40,4 @@ int main(int argc, char **argv) {
     printf("%.7e\n", parallel_sum5(x));
     return 0;
 }
+#endif
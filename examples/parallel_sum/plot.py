@@ -17,6 +17,11 @@ matplotlib.use('Agg')
 
 import matplotlib.pyplot as plt
 
+# Shared tooling (.tab readers, statistics) lives in tools/vfctools
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'tools'))
+from vfctools.stats import group_statistics
+from vfctools.tabfile import read_tab
+
 # Read command line arguments
 if len(sys.argv) < 3 or not sys.argv[1].endswith('.tab'):
     print("usage: ./plot_verificarlo.py DATA.tab precision [expected_function]")
@@ -44,83 +49,37 @@ if len(sys.argv) > 3:
 # Convert binary to decimal precision
 prec_dec = float(prec_b) * math.log(2, 10)
 
-# Count header lines (including the column names line)
-with open(fname, 'r') as f:
-    header_lines = 0
-    for line in f:
-        if line.startswith('#') or line.strip() == 'i x result':
-            header_lines += 1
-        else:
-            # Check if this is actually a data line
-            parts = line.strip().split()
-            if len(parts) >= 3:
-                try:
-                    int(parts[0])  # Try to parse first column as int
-                    float(parts[1])  # Try to parse second column as float
-                    float(parts[2])  # Try to parse third column as float
-                    break  # This is a valid data line
-                except ValueError:
-                    header_lines += 1  # This is still a header line
-            else:
-                header_lines += 1
-
-print(f"Detected {header_lines} header lines in {fname}")
-
-# Parse table file
+# Parse table file in one pass, or load its columnar copy if the
+# runner wrote one
 # three columns:
 #   - i: sample number
 #   - x: input value
 #   - result: function evaluation on x
-D = np.loadtxt(fname, skiprows=header_lines,
-        dtype = dict(names=('i', 'x', 'result'),
-                     formats=('i4', 'f8', 'f8')))
+D, layout = read_tab(fname, names=('i', 'x', 'result'))
+print(f"Detected {layout.header_lines} header lines in {fname}")
 
 # Extract program name from filename
 program_name = os.path.basename(version).split('-')[0]
 
-# Compute all statistics (mu, sigma, s)
-x_values = np.unique(D['x'])
-mu_values = []
-sigma_values = []
-s_values = []
+# Compute all statistics (mu, sigma, s) for every x at once
+stats = group_statistics(D, ('x',), float(prec_b), tiny=0)
+x_values = stats['x']
+mu_values = stats['mean']
+sigma_values = stats['std']
+s_values = stats['sig_digits']
 expected_values = []
 relative_errors = []
 
-for x in x_values:
-    # select all result samples for given x
-    result_samples = D[D['x'] == x]['result']
-    
-    # Compute expected value if function provided
-    if expected_func:
+# Compute expected values and relative errors if function provided
+if expected_func:
+    for x, mu in zip(x_values, mu_values):
         expected = expected_func(x)
         expected_values.append(expected)
-    else:
-        expected = None
-    
-    # Compute mu and sigma statistics
-    mu = np.mean(result_samples)
-    sigma = np.std(result_samples)
-    
-    # Compute significant digits
-    if sigma == 0:
-        s = prec_dec
-    elif mu == 0:
-        s = 0
-    else:
-        # Stott Parker's formula using mean as reference
-        s = min(-math.log10(sigma/abs(mu)), prec_dec)
-    
-    # Compute relative error if expected value available
-    if expected is not None:
         if expected != 0:
             rel_err = abs(mu - expected) / abs(expected)
         else:
             rel_err = abs(mu - expected) if mu != expected else 0
         relative_errors.append(rel_err)
-    
-    mu_values.append(mu)
-    sigma_values.append(sigma)
-    s_values.append(s)
 
 # Save statistics to CSV file
 csv_filename = version + "-stats.csv"
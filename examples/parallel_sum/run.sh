@@ -3,8 +3,14 @@
 # Test parallel summation with MCA for numerical stability analysis
 
 set -e
+# A failing kernel fails its pipeline, not just the last command of it
+set -o pipefail
 export LC_ALL=C
 
+# Shared driver and tooling
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+TOOLS_DIR="${SCRIPT_DIR}/../../tools"
+
 # Check all arguments
 if [ "$#" -lt 8 ] || [ "$#" -gt 9 ]; then
   echo "usage: run.sh source.c type vprecision mode start end step iterations [output_dir]"
@@ -80,9 +86,10 @@ PROGRAM_NAME=$(basename "$SOURCE_FILE" .c)
 # Create output directory if it doesn't exist
 mkdir -p "$OUTPUT_DIR"
 
-# Compile with verificarlo
+# Compile with verificarlo against the shared batch driver in tools/,
+# reusing a cached binary if the source, flags and compiler are unchanged
 echo "Compiling $SOURCE_FILE with Verificarlo..."
-verificarlo -D${REAL} "$SOURCE_FILE" -o "$PROGRAM_NAME" -lm
+BINARY=$(python3 "$TOOLS_DIR/vfc_build.py" -D${REAL} -DVFC_DRIVER -I"$TOOLS_DIR" "$SOURCE_FILE" -lm) || exit 1
 
 # Set up MCA backend
 export VFC_BACKENDS="libinterflop_mca.so --precision-binary32=$VERIFICARLO_PRECISION --precision-binary64=$VERIFICARLO_PRECISION --mode $VERIFICARLO_MCAMODE"
@@ -111,20 +118,18 @@ echo "i x result" >> $OUTPUT_FILE
 # Run iterations
 echo "Running MCA analysis..."
 
-# Calculate total number of values for progress tracking
+# Calculate total number of values
 total_values=$(python3 -c "import math; print(int(math.floor(($END - $START) / $STEP) + 1))")
-current=0
-
-for x in $(seq $START $STEP $END); do
-    current=$((current + 1))
-    percent=$(python3 -c "print(f'{$current * 100 / $total_values:.1f}')")
-    printf "\rProgress: %d/%d (%s%%) - Processing x=%s..." "$current" "$total_values" "$percent" "$x"
-    
-    for i in $(seq 1 $ITERATIONS); do
-        result=$(./"$PROGRAM_NAME" $x 2>/dev/null)
-        echo "$i $x $result" >> $OUTPUT_FILE
-    done
-done
+
+# A single long-lived process takes every sample: "<iterations> <x>";
+# vfc_tabwrite.py appends them after the header and computes the
+# summary statistics on the way
+SUMMARY=$(for x in $(seq $START $STEP $END); do
+    echo "$ITERATIONS $x"
+done | "$BINARY" --batch | python3 "$TOOLS_DIR/vfc_tabwrite.py" --append "$OUTPUT_FILE") || {
+    echo "Error: $BINARY failed; $OUTPUT_FILE is incomplete" >&2
+    exit 1
+}
 
 echo -e "\nAnalysis complete!"
 
@@ -135,6 +140,7 @@ echo "Output file: $OUTPUT_FILE"
 echo -e "\n=== Summary Statistics ==="
 echo "Total test points: $total_values"
 echo "Total MCA runs: $((total_values * ITERATIONS))"
+echo "$SUMMARY"
 
 # Calculate and display execution time
 DURATION=$SECONDS
@@ -152,8 +158,4 @@ echo ""
 echo "To plot results, run:"
 echo "  ./plot_verificarlo.py $OUTPUT_FILE $VERIFICARLO_PRECISION"
 
-# Clean up the compiled executable
-echo -e "\nCleaning up..."
-rm -f "$PROGRAM_NAME"
-
 echo -e "\nDone!"
@@ -1,90 +1,73 @@
 #!/usr/bin/env python3
 import csv
-import pandas as pd
 import numpy as np
-import subprocess
-import math
+import sys
+from pathlib import Path
 
-def get_true_value(x):
-    """Calls the compiled C program to get the high-precision value."""
-    # You'll need to modify this based on your reference program
-    # For example, if you have a program that computes 2*x:
-    command = ['./parallel_5ref']  # Replace with your actual program
-    input_str = f"{x}"
-    
-    result = subprocess.run(
-        command, 
-        input=input_str, 
-        capture_output=True, 
-        text=True, 
-        check=True
-    )
-    return float(result.stdout.strip())
+# Shared tooling (per-point statistics, reference programs, ULP errors)
+# lives in tools/vfctools
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'tools'))
+from vfctools import ulp
+from vfctools.reference import reference_for
+from vfctools.stats import summarize_file
+
+# Exact values of the 32-term tree sum of parallel_5, computed in process
+# (tree_sum1 to tree_sum5 match parallel_1 to parallel_5); the path of a
+# reference program reading one input per line (such as './parallel_5ref')
+# can be given instead
+reference_program = reference_for('tree_sum5')  # Replace with your actual reference
 
 # Input and output filenames
 raw_data_filename = 'verificarlo_results/parallel_5/input2/parallel_5-DOUBLE-p53-mca.tab'  # Your input file
 output_csv_filename = 'analysis_results.csv'
+histogram_csv_filename = 'ulp_histogram.csv'
+
+# Per-point summary of the raw data in your .tab file. Samples with a
+# NaN result are left out, so a point that sometimes overflows keeps the
+# statistics of its other samples
+summary = summarize_file(raw_data_filename, skip_nan=True)
+points = summary.records
+# Skip points with a NaN input
+points = points[~np.isnan(points[summary.inputs[0]])]
+x_values, means = points[summary.inputs[0]], points['mean']
+# Sample standard deviation (ddof=1), as pandas computes it
+with np.errstate(divide='ignore', invalid='ignore'):
+    std_devs = np.sqrt(points['m2'] / (points['count'] - 1))
+# The high-precision values of all the inputs at once
+true_values = reference_program(x_values[:, None].tolist())
 
-# Load the raw data from your .tab file
-# Skip the header lines starting with #
-df = pd.read_csv(
-    raw_data_filename, 
-    delim_whitespace=True, 
-    comment='#',
-    names=['i', 'x', 'result']
-)
-# Convert columns to appropriate types
-df['x'] = pd.to_numeric(df['x'], errors='coerce')
-df['result'] = pd.to_numeric(df['result'], errors='coerce')
+with np.errstate(divide='ignore', invalid='ignore'):
+    sig_digits = np.where((means != 0) & (std_devs > 0),
+                          -np.log10(std_devs / np.abs(means)), np.inf)
+# ULP errors in the working precision (FLOAT or DOUBLE) of the file
+real = ulp.real_of(raw_data_filename)
+ulp_errors = ulp.ulp_error(means, true_values, real)
 
-# Drop any rows where conversion failed (NaN values)
-df = df.dropna()
-# Group the data by the unique input value
-grouped = df.groupby('x')
-# Initialize variable to track maximum ULP error
+# ULP errors of the individual samples, read from the file a chunk at a
+# time: their median, 99th percentile and maximum at each input value,
+# and a histogram of all of them
+tail, histogram = ulp.error_distribution(raw_data_filename, points, true_values,
+                                         summary.inputs, real)
+
+# Track the maximum ULP error
 max_ulp_error = 0.0
 max_ulp_x = None
+if len(ulp_errors) and ulp_errors.max() > 0:
+    max_index = np.argmax(ulp_errors)
+    max_ulp_error, max_ulp_x = ulp_errors[max_index], x_values[max_index]
 
 # Open the output CSV file for writing
 with open(output_csv_filename, 'w', newline='') as csvfile:
     writer = csv.writer(csvfile)
-    writer.writerow(['x', 'mean', 'std_dev', 'significant_digits', 'ulp_error'])
-
-    # Process each group of inputs
-    for x_value, group in grouped:
-
-        mca_results = group['result']
-        mean_val = mca_results.mean()
-        std_dev = mca_results.std()
-        
-        if mean_val != 0 and std_dev > 0:
-            sig_digits = -math.log10(std_dev / abs(mean_val))
-        else:
-            sig_digits = float('inf')
-
-        # Get the true value for this input
-        # NOTE: You need to implement get_true_value() based on what your program computes
-        # For now, I'm assuming it's computing 2*x based on the pattern in your data
-        # You should replace this with the actual computation
-        true_val = get_true_value(x_value)  # REPLACE THIS with: true_val = get_true_value(x)
-        
-        abs_error = abs(mean_val - true_val)
-        
-        # Determine the precision based on the data type
-        # Since your file says DOUBLE with precision 53, use float64
-        true_val_float = np.float64(true_val)
-
-        # Use np.spacing() for ULP calculation
-        ulp = np.spacing(true_val_float)
-        
-        ulp_error = abs_error / ulp if ulp > 0 else 0.0
-
-                # Track the maximum ULP error
-        if ulp_error > max_ulp_error:
-            max_ulp_error = ulp_error
-            max_ulp_x = x_value
-        
-        writer.writerow([x_value, mean_val, std_dev, sig_digits, ulp_error])
+    writer.writerow(['x', 'mean', 'std_dev', 'significant_digits', 'ulp_error',
+                     'p50_ulp_error', 'p99_ulp_error', 'max_ulp_error'])
+    writer.writerows(np.column_stack([x_values, means, std_devs, sig_digits, ulp_errors,
+                                      tail['p50'], tail['p99'], tail['max']]).tolist())
+ulp.write_histogram(histogram_csv_filename, histogram)
 
 print(f"Analysis complete. Results have been saved to '{output_csv_filename}'")
+print(f"Histogram of the ULP errors of all {histogram.sum()} samples saved to "
+      f"'{histogram_csv_filename}'")
 print(f"\nMaximum ULP error: {max_ulp_error:.6f} at x = {max_ulp_x}")
+if len(tail) and tail['count'].any():
+    print(f"Maximum ULP error of a single sample: {np.nanmax(tail['max']):.6f}")
@@ -1,8 +1,14 @@
 import sys
 import argparse
-import numpy as np
-import itertools
-import random
+from pathlib import Path
+from types import SimpleNamespace
+
+# Shared tooling (job plans, low-discrepancy point sets) lives in tools/vfctools
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'tools'))
+from vfctools.plan import JobPlan
+
+# Points materialized at a time when printing jobs
+BLOCK = 4096
 
 def main():
     parser = argparse.ArgumentParser()
@@ -13,78 +19,69 @@ def main():
     parser.add_argument('--ranges', type=str, nargs='*')
     parser.add_argument('--steps', type=str, nargs='*')
     parser.add_argument('--fixed', type=str, nargs='*')
+    parser.add_argument('--points', type=int, default=1024,
+                        help='number of sobol/halton points (a power of two for sobol)')
+    parser.add_argument('--seed', type=int, help='seed for the random and scrambled sequences')
+    parser.add_argument('--no-scramble', action='store_true',
+                        help='use the plain sobol/halton sequences')
+    parser.add_argument('--plan', type=str,
+                        help='write a compact job plan (JSON) to this file instead of '
+                             'printing one line per job; run it with tools/sweep.py --plan')
+    parser.add_argument('--slice', type=str,
+                        help="only print the jobs of points START:STOP of the plan")
     args = parser.parse_args()
 
     # --- Parse inputs ---
-    ranges = {f'x{i}': r.split(':') for i, r in enumerate(args.ranges)}
-    steps = {f'x{i}': s for i, s in enumerate(args.steps)}
+    variables = [f'x{i}' for i in range(args.n_inputs)]
+    raw_ranges = {f'x{i}': r.split(':') for i, r in enumerate(args.ranges or [])}
+    raw_steps = {f'x{i}': s for i, s in enumerate(args.steps or [])}
     fixed_vars = dict(f.split('=') for f in args.fixed or [])
 
-    # --- Define generator functions ---
-    def get_sequence(var):
-        if var in fixed_vars:
-            return [float(fixed_vars[var])]
-        
+    ranges, steps = {}, {}
+    for var in variables:
+        if var in fixed_vars or (args.test_pattern == 'diagonal' and var != 'x0'):
+            continue
         try:
-            start, end = map(float, ranges[var])
+            ranges[var] = tuple(map(float, raw_ranges[var]))
+            steps[var] = float(raw_steps.get(var, 1.0))
         except (ValueError, KeyError) as e:
-            print(f"Error: Invalid range for variable {var}. Received {ranges.get(var)}. Exiting.", file=sys.stderr)
+            print(f"Error: Invalid range for variable {var}. Received {raw_ranges.get(var)}. Exiting.", file=sys.stderr)
             sys.exit(1)
 
-        step = float(steps[var])
-        if step <= 0:
-            print(f"Error: Step for variable {var} must be positive. Received {step}. Exiting.", file=sys.stderr)
-            sys.exit(1)
-
-        # Use np.linspace for robust floating point ranges
-        num_points = int(round((end - start) / step)) + 1
-        return np.linspace(start, end, num_points)
-
-    def get_random(var):
-        if var in fixed_vars:
-            return float(fixed_vars[var])
-        start, end = map(float, ranges[var])
-        return random.uniform(start, end)
+    config = SimpleNamespace(
+        ninputs=args.n_inputs, pattern=args.test_pattern, iterations=args.iterations,
+        ranges=ranges, steps=steps, fixed=fixed_vars, points=args.points,
+        seed=args.seed, scramble=not args.no_scramble)
 
-    # --- Generate Jobs ---
+    # --- Describe the jobs ---
     try:
-        if args.test_pattern == 'grid':
-            sequences = [get_sequence(f'x{i}') for i in range(args.n_inputs)]
-            job_iterator = itertools.product(*sequences)
-        
-        elif args.test_pattern == 'diagonal':
-            job_iterator = ( (val,)*args.n_inputs for val in get_sequence('x0') )
-
-        elif args.test_pattern == 'random':
-            job_iterator = None # Handled separately
-        else: # fixed
-            job_iterator = itertools.product(*[get_sequence(f'x{i}') for i in range(args.n_inputs)])
-    except (SystemExit, Exception) as e:
-        # Catch errors from get_sequence and exit gracefully
+        plan = JobPlan.from_config(config)
+    except ValueError as e:
         print(f"Job generation failed: {e}", file=sys.stderr)
         sys.exit(1)
 
+    if args.plan:
+        plan.save(args.plan)
+        print(f"Wrote job plan to {args.plan}: {plan.describe()}", file=sys.stderr)
+        return
+
+    start, stop = 0, len(plan)
+    if args.slice:
+        first, last = args.slice.split(':')
+        start, stop = int(first or 0), min(int(last or stop), stop)
 
     # --- Print job commands ---
-    if job_iterator:
-        for combo in job_iterator:
+    for block in range(start, stop, BLOCK):
+        values = plan.values(block, min(block + BLOCK, stop))
+        for offset, combo in enumerate(values.tolist()):
+            params = ' '.join([f"'{val}'" for val in combo])
+            params += " ''" * (3 - len(combo))
+            if args.test_pattern == 'random':
+                # Random jobs are numbered by point, each sampled once
+                print(f"run_one_job {args.n_inputs} {args.program}_verificarlo {params} '{block + offset + 1}'")
+                continue
             for i in range(1, args.iterations + 1):
-                # Ensure combo is a mutable list for padding
-                combo_list = list(combo)
-                params = ' '.join([f"'{val}'" for val in combo_list])
-                while len(combo_list) < 3:
-                    params += " ''"
-                    combo_list.append(None)
                 print(f"run_one_job {args.n_inputs} {args.program}_verificarlo {params} '{i}'")
-    
-    elif args.test_pattern == 'random':
-        for i in range(1, args.iterations + 1):
-            combo = [get_random(f'x{v}') for v in range(args.n_inputs)]
-            params = ' '.join([f"'{val}'" for val in combo])
-            while len(combo) < 3:
-                params += " ''"
-                combo.append(None)
-            print(f"run_one_job {args.n_inputs} {args.program}_verificarlo {params} '{i}'")
 
 
 if __name__ == '__main__':
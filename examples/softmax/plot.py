@@ -15,6 +15,12 @@ import argparse
 from pathlib import Path
 from datetime import datetime
 
+# Shared tooling (.tab readers, statistics) lives in tools/vfctools
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'tools'))
+from vfctools import columnar
+from vfctools.stats import STATISTICS
+from vfctools.summary import file_summary
+
 def parse_arguments():
     """Parse command line arguments"""
     parser = argparse.ArgumentParser(
@@ -70,73 +76,29 @@ Examples:
     
     return args
 
-def detect_input_count(filename):
-    """Detect number of inputs and which ones are varying"""
-    # First, detect total number of input columns
-    with open(filename, 'r') as f:
-        header = f.readline().strip()
-        if header.startswith('i x'):
-            # Count x columns in header
-            total_inputs = header.count(' x')
-        else:
-            # Try to detect from first data line
-            f.seek(0)
-            f.readline()  # Skip header if any
-            first_line = f.readline().strip().split()
-            # Assume format: i x0 [x1] [x2] result
-            total_inputs = len(first_line) - 2  # subtract i and result
-    
-    # Now detect which inputs are actually varying
-    data = np.loadtxt(filename, skiprows=1)
-    if data.ndim == 1:
-        data = data.reshape(1, -1)
-    
-    # Check which columns have varying values
-    varying_inputs = []
-    if total_inputs >= 1:
-        x0_values = np.unique(data[:, 1])  # x0 is column 1
-        if len(x0_values) > 1:
-            varying_inputs.append('x0')
-    
-    if total_inputs >= 2:
-        x1_values = np.unique(data[:, 2])  # x1 is column 2
-        if len(x1_values) > 1:
-            varying_inputs.append('x1')
-    
-    if total_inputs >= 3:
-        x2_values = np.unique(data[:, 3])  # x2 is column 3
-        if len(x2_values) > 1:
-            varying_inputs.append('x2')
-    
-    # Return both total inputs and number of varying inputs
-    return total_inputs, len(varying_inputs), varying_inputs
+def load_statistics(filename, precision_bits=53):
+    """Per-point statistics from the summary sidecar of the data file.
 
-def load_data(filename):
-    """Load and parse the multi-input data file"""
-    # Detect number of inputs and which are varying
-    n_inputs, n_varying, varying_inputs = detect_input_count(filename)
-    
-    print(f"Total inputs: {n_inputs}, Varying inputs: {n_varying} ({', '.join(varying_inputs)})")
-    
-    # Define column names based on total input count
-    if n_inputs == 1:
-        names = ('i', 'x0', 'result')
-        formats = ('i4', 'f8', 'f8')
-    elif n_inputs == 2:
-        names = ('i', 'x0', 'x1', 'result')
-        formats = ('i4', 'f8', 'f8', 'f8')
-    else:  # 3 inputs
-        names = ('i', 'x0', 'x1', 'x2', 'result')
-        formats = ('i4', 'f8', 'f8', 'f8', 'f8')
-    
+    The sidecar is rebuilt from the samples if it is missing or older
+    than the file. Returns a structured array with one record per input
+    combination, sorted by inputs: x0 [x1] [x2], mean, std, min, max,
+    count and sig_digits; the number of inputs; and the inputs that vary.
+    """
     try:
-        data = np.loadtxt(filename, skiprows=1,
-                          dtype=dict(names=names, formats=formats))
-        return data, n_inputs, n_varying, varying_inputs
+        summary = file_summary(filename)
     except Exception as e:
         print(f"Error loading data: {e}")
         sys.exit(1)
 
+    n_inputs = len(summary.inputs)
+    inputs = tuple(f'x{k}' for k in range(n_inputs))
+    stats = columnar.rename(summary.statistics(precision_bits), inputs + STATISTICS)
+    varying_inputs = [var for var in inputs if len(np.unique(stats[var])) > 1]
+
+    print(f"Total inputs: {n_inputs}, Varying inputs: {len(varying_inputs)} "
+          f"({', '.join(varying_inputs)})")
+    return stats, n_inputs, len(varying_inputs), varying_inputs
+
 def filter_data(data, filter_str, n_inputs):
     """Filter data based on fixed values"""
     if not filter_str:
@@ -156,113 +118,15 @@ def filter_data(data, filter_str, n_inputs):
     
     return data[mask]
 
-def compute_statistics(data, n_inputs, precision_bits=53):
-    """Compute statistics for each unique input combination"""
-    results = data['result']
-    
-    # Calculate maximum significant digits based on precision
-    max_sig_digits = precision_bits * np.log10(2)
-    
-    # Get unique input combinations
-    if n_inputs == 1:
-        unique_inputs = np.unique(data['x0'])
-        stats = []
-        for x0 in unique_inputs:
-            mask = data['x0'] == x0
-            values = results[mask]
-            mean_val = np.mean(values)
-            std_val = np.std(values)
-            
-            # Compute significant digits with proper bounds
-            if std_val < 1e-15 or std_val == 0:  # Below machine epsilon
-                sig_digits = max_sig_digits
-            elif mean_val == 0:
-                sig_digits = 0
-            else:
-                # Cap at maximum possible for the precision
-                sig_digits = min(-np.log10(std_val/abs(mean_val)), max_sig_digits)
-            
-            stats.append({
-                'x0': x0,
-                'mean': mean_val,
-                'std': std_val,
-                'min': np.min(values),
-                'max': np.max(values),
-                'count': len(values),
-                'sig_digits': sig_digits
-            })
-    elif n_inputs == 2:
-        unique_x0 = np.unique(data['x0'])
-        unique_x1 = np.unique(data['x1'])
-        stats = []
-        for x0 in unique_x0:
-            for x1 in unique_x1:
-                mask = (data['x0'] == x0) & (data['x1'] == x1)
-                if np.any(mask):
-                    values = results[mask]
-                    mean_val = np.mean(values)
-                    std_val = np.std(values)
-                    
-                    # Compute significant digits with proper bounds
-                    if std_val < 1e-15 or std_val == 0:
-                        sig_digits = max_sig_digits
-                    elif mean_val == 0:
-                        sig_digits = 0
-                    else:
-                        sig_digits = min(-np.log10(std_val/abs(mean_val)), max_sig_digits)
-                    
-                    stats.append({
-                        'x0': x0, 'x1': x1,
-                        'mean': mean_val,
-                        'std': std_val,
-                        'min': np.min(values),
-                        'max': np.max(values),
-                        'count': len(values),
-                        'sig_digits': sig_digits
-                    })
-    else:  # 3 inputs
-        unique_x0 = np.unique(data['x0'])
-        unique_x1 = np.unique(data['x1'])
-        unique_x2 = np.unique(data['x2'])
-        stats = []
-        for x0 in unique_x0:
-            for x1 in unique_x1:
-                for x2 in unique_x2:
-                    mask = (data['x0'] == x0) & (data['x1'] == x1) & (data['x2'] == x2)
-                    if np.any(mask):
-                        values = results[mask]
-                        mean_val = np.mean(values)
-                        std_val = np.std(values)
-                        
-                        # Compute significant digits with proper bounds
-                        if std_val < 1e-15 or std_val == 0:
-                            sig_digits = max_sig_digits
-                        elif mean_val == 0:
-                            sig_digits = 0
-                        else:
-                            sig_digits = min(-np.log10(std_val/abs(mean_val)), max_sig_digits)
-                        
-                        stats.append({
-                            'x0': x0, 'x1': x1, 'x2': x2,
-                            'mean': mean_val,
-                            'std': std_val,
-                            'min': np.min(values),
-                            'max': np.max(values),
-                            'count': len(values),
-                            'sig_digits': sig_digits
-                        })
-    
-    return stats
-
-def plot_1d_data(data, stats, args, varying_input='x0'):
+def plot_1d_data(stats, args, varying_input='x0'):
     """Create plots for 1D data"""
     fig, axes = plt.subplots(3, 1, figsize=args.figsize, sharex=True)
     
     # Get the appropriate x values based on which input is varying
-    x_values = np.array([s[varying_input] for s in stats])
-    means = np.array([s['mean'] for s in stats])
-    stds = np.array([s['std'] for s in stats])
-    sig_digits = np.array([s['sig_digits'] for s in stats])
+    x_values = stats[varying_input]
+    means = stats['mean']
+    stds = stats['std']
+    sig_digits = stats['sig_digits']
     
     # Convert binary to decimal precision
     precision_decimal = float(args.precision) * np.log10(2)
@@ -318,51 +182,28 @@ def plot_1d_data(data, stats, args, varying_input='x0'):
     plt.tight_layout(pad=2.5)
     return fig
 
-def plot_2d_heatmap(data, stats, n_inputs, args):
+def plot_2d_heatmap(stats, n_inputs, args):
     """Create heatmap for 2D data"""
-    if n_inputs == 2:
-        # 2 varying inputs
-        unique_x0 = sorted(list(set(s['x0'] for s in stats)))
-        unique_x1 = sorted(list(set(s['x1'] for s in stats)))
+    # Axes of the heatmap: the two inputs that vary
+    if n_inputs == 2 or len(np.unique(stats['x2'])) == 1:
+        # x2 is fixed (or absent)
+        x_var, y_var = 'x0', 'x1'
+    elif len(np.unique(stats['x1'])) == 1:
+        # x1 is fixed
+        x_var, y_var = 'x0', 'x2'
     else:
-        # 3 inputs but one must be fixed
-        if len(set(s.get('x2', 0) for s in stats)) == 1:
-            # x2 is fixed
-            unique_x0 = sorted(list(set(s['x0'] for s in stats)))
-            unique_x1 = sorted(list(set(s['x1'] for s in stats)))
-        elif len(set(s.get('x1', 0) for s in stats)) == 1:
-            # x1 is fixed
-            unique_x0 = sorted(list(set(s['x0'] for s in stats)))
-            unique_x1 = sorted(list(set(s['x2'] for s in stats)))
-        else:
-            # x0 is fixed
-            unique_x0 = sorted(list(set(s['x1'] for s in stats)))
-            unique_x1 = sorted(list(set(s['x2'] for s in stats)))
+        # x0 is fixed
+        x_var, y_var = 'x1', 'x2'
+    unique_x0, i = np.unique(stats[x_var], return_inverse=True)
+    unique_x1, j = np.unique(stats[y_var], return_inverse=True)
     
     # Create matrices for mean, std, and significant digits
     mean_matrix = np.zeros((len(unique_x1), len(unique_x0)))
     std_matrix = np.zeros((len(unique_x1), len(unique_x0)))
     sig_digits_matrix = np.zeros((len(unique_x1), len(unique_x0)))
-    
-    for s in stats:
-        if n_inputs == 2:
-            i = unique_x0.index(s['x0'])
-            j = unique_x1.index(s['x1'])
-        else:
-            # Map based on which variable is fixed
-            if len(set(s.get('x2', 0) for s in stats)) == 1:
-                i = unique_x0.index(s['x0'])
-                j = unique_x1.index(s['x1'])
-            elif len(set(s.get('x1', 0) for s in stats)) == 1:
-                i = unique_x0.index(s['x0'])
-                j = unique_x1.index(s['x2'])
-            else:
-                i = unique_x0.index(s['x1'])
-                j = unique_x1.index(s['x2'])
-        
-        mean_matrix[j, i] = s['mean']
-        std_matrix[j, i] = s['std']
-        sig_digits_matrix[j, i] = s['sig_digits']
+    mean_matrix[j, i] = stats['mean']
+    std_matrix[j, i] = stats['std']
+    sig_digits_matrix[j, i] = stats['sig_digits']
     
     # Create figure with subplots
     fig, axes = plt.subplots(1, 3, figsize=(args.figsize[0]*2, args.figsize[1]*0.8))
@@ -405,9 +246,9 @@ def plot_statistics_summary(stats, n_inputs, args):
     fig = plt.figure(figsize=(args.figsize[0]*1.2, args.figsize[1]))
     
     # Extract statistics
-    means = [s['mean'] for s in stats]
-    stds = [s['std'] for s in stats]
-    sig_digits = [s['sig_digits'] for s in stats]
+    means = stats['mean']
+    stds = stats['std']
+    sig_digits = stats['sig_digits']
     
     # Convert binary to decimal precision
     precision_decimal = float(args.precision) * np.log10(2)
@@ -420,8 +261,8 @@ def plot_statistics_summary(stats, n_inputs, args):
     ax1.set_title('Distribution of means', fontsize=10)
     
     ax2 = plt.subplot(232)
-    if any(std > 0 for std in stds):
-        ax2.hist(np.log10(np.array(stds) + 1e-16), bins=50, alpha=0.7, color='green')
+    if np.any(stds > 0):
+        ax2.hist(np.log10(stds + 1e-16), bins=50, alpha=0.7, color='green')
         ax2.set_xlabel('Log10(Std deviation)')
     else:
         ax2.hist(stds, bins=50, alpha=0.7, color='green')
@@ -440,19 +281,17 @@ def plot_statistics_summary(stats, n_inputs, args):
     ax4.scatter(means, stds, alpha=0.5)
     ax4.set_xlabel('Mean')
     ax4.set_ylabel('Std deviation')
-    if any(std > 0 for std in stds):
+    if np.any(stds > 0):
         ax4.set_yscale('log')
     ax4.set_title('Mean vs Std deviation', fontsize=10)
     
     ax5 = plt.subplot(235)
     # Compute relative errors
-    rel_errors = []
-    for s in stats:
-        if s['mean'] != 0:
-            rel_errors.append(s['std'] / abs(s['mean']))
+    nonzero = stats[stats['mean'] != 0]
+    rel_errors = nonzero['std'] / np.abs(nonzero['mean'])
     
-    if rel_errors:
-        ax5.hist(np.log10(np.array(rel_errors) + 1e-16), bins=50, alpha=0.7, color='red')
+    if len(rel_errors):
+        ax5.hist(np.log10(rel_errors + 1e-16), bins=50, alpha=0.7, color='red')
         ax5.set_xlabel('Log10(Relative error)')
         ax5.set_ylabel('Count')
         ax5.set_title('Distribution of relative errors', fontsize=10)
@@ -475,10 +314,10 @@ def plot_3d_significant_digits(stats, args):
     import matplotlib.cm as cm
     
     # Extract data
-    x0_vals = np.array([s['x0'] for s in stats])
-    x1_vals = np.array([s['x1'] for s in stats])
-    x2_vals = np.array([s['x2'] for s in stats])
-    sig_digits = np.array([s['sig_digits'] for s in stats])
+    x0_vals = stats['x0']
+    x1_vals = stats['x1']
+    x2_vals = stats['x2']
+    sig_digits = stats['sig_digits']
     
     # Create figure
     fig = plt.figure(figsize=(12, 10))
@@ -514,11 +353,10 @@ def plot_3d_significant_digits(stats, args):
     sig_grid_01 = np.zeros((len(unique_x1), len(unique_x0)))
     count_grid = np.zeros((len(unique_x1), len(unique_x0)))
     
-    for s in stats:
-        i = np.where(unique_x0 == s['x0'])[0][0]
-        j = np.where(unique_x1 == s['x1'])[0][0]
-        sig_grid_01[j, i] += s['sig_digits']
-        count_grid[j, i] += 1
+    i = np.searchsorted(unique_x0, x0_vals)
+    j = np.searchsorted(unique_x1, x1_vals)
+    np.add.at(sig_grid_01, (j, i), sig_digits)
+    np.add.at(count_grid, (j, i), 1)
     
     # Average where we have data
     mask = count_grid > 0
@@ -540,11 +378,10 @@ def plot_3d_significant_digits(stats, args):
     sig_grid_02 = np.zeros((len(unique_x2), len(unique_x0)))
     count_grid = np.zeros((len(unique_x2), len(unique_x0)))
     
-    for s in stats:
-        i = np.where(unique_x0 == s['x0'])[0][0]
-        j = np.where(unique_x2 == s['x2'])[0][0]
-        sig_grid_02[j, i] += s['sig_digits']
-        count_grid[j, i] += 1
+    i = np.searchsorted(unique_x0, x0_vals)
+    j = np.searchsorted(unique_x2, x2_vals)
+    np.add.at(sig_grid_02, (j, i), sig_digits)
+    np.add.at(count_grid, (j, i), 1)
     
     mask = count_grid > 0
     sig_grid_02[mask] /= count_grid[mask]
@@ -564,11 +401,10 @@ def plot_3d_significant_digits(stats, args):
     sig_grid_12 = np.zeros((len(unique_x2), len(unique_x1)))
     count_grid = np.zeros((len(unique_x2), len(unique_x1)))
     
-    for s in stats:
-        i = np.where(unique_x1 == s['x1'])[0][0]
-        j = np.where(unique_x2 == s['x2'])[0][0]
-        sig_grid_12[j, i] += s['sig_digits']
-        count_grid[j, i] += 1
+    i = np.searchsorted(unique_x1, x1_vals)
+    j = np.searchsorted(unique_x2, x2_vals)
+    np.add.at(sig_grid_12, (j, i), sig_digits)
+    np.add.at(count_grid, (j, i), 1)
     
     mask = count_grid > 0
     sig_grid_12[mask] /= count_grid[mask]
@@ -604,10 +440,10 @@ def save_statistics(stats, output_dir, basename):
     csv_file = output_dir / f"{basename}_statistics.csv"
     
     with open(csv_file, 'w', newline='') as f:
-        if stats:
-            writer = csv.DictWriter(f, fieldnames=stats[0].keys())
-            writer.writeheader()
-            writer.writerows(stats)
+        if len(stats):
+            writer = csv.writer(f)
+            writer.writerow(stats.dtype.names)
+            writer.writerows(stats.tolist())
     
     print(f"Statistics saved to: {csv_file}")
 
@@ -615,19 +451,18 @@ def main():
     """Main function"""
     args = parse_arguments()
     
-    # Load data
+    # Load the per-point summary; the samples themselves are not needed
     print(f"Loading data from: {args.datafile}")
-    data, n_inputs, n_varying, varying_inputs = load_data(args.datafile)
-    print(f"Loaded {len(data)} data points")
+    stats, n_inputs, n_varying, varying_inputs = load_statistics(args.datafile,
+                                                                 args.precision)
+    print(f"Loaded {stats['count'].sum()} data points")
     
-    # Apply filters if specified
+    # Apply filters if specified; the points of the kept samples are
+    # the kept points
     if args.filter:
-        data = filter_data(data, args.filter, n_inputs)
-        print(f"After filtering: {len(data)} data points")
+        stats = filter_data(stats, args.filter, n_inputs)
+        print(f"After filtering: {stats['count'].sum()} data points")
     
-    # Compute statistics
-    print("Computing statistics...")
-    stats = compute_statistics(data, n_inputs, args.precision)
     print(f"Computed statistics for {len(stats)} unique input combinations")
     
     # Create output directory
@@ -651,9 +486,9 @@ def main():
     if plot_type == 'line' and n_varying == 1:
         # Determine which input is varying
         varying_input = varying_inputs[0] if varying_inputs else 'x0'
-        fig = plot_1d_data(data, stats, args, varying_input)
+        fig = plot_1d_data(stats, args, varying_input)
     elif plot_type == 'heatmap' and n_varying == 2:
-        fig = plot_2d_heatmap(data, stats, n_inputs, args)
+        fig = plot_2d_heatmap(stats, n_inputs, args)
     elif plot_type == 'stats':
         fig = plot_statistics_summary(stats, n_inputs, args)
     else:
@@ -13,6 +13,13 @@ import matplotlib.pyplot as plt
 import argparse
 from pathlib import Path
 
+# Shared tooling (.tab readers, statistics) lives in tools/vfctools
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'tools'))
+from vfctools import columnar
+from vfctools.stats import STATISTICS, group_statistics
+from vfctools.summary import file_summary
+from vfctools.tabfile import read_tab
+
 def parse_arguments():
     """Parse command line arguments"""
     parser = argparse.ArgumentParser(
@@ -48,15 +55,13 @@ def parse_arguments():
 
 def load_data(filename):
     """Load and parse the data file with 2 varying inputs"""
-    # First, detect the format by reading the header
-    with open(filename, 'r') as f:
-        # Skip comment lines
-        line = f.readline()
-        while line.startswith('#'):
-            line = f.readline()
-    
-    # Load the data
-    data = np.loadtxt(filename, skiprows=1 if not filename.endswith('.csv') else 0)
+    if filename.endswith('.csv'):
+        data = np.loadtxt(filename)
+    else:
+        # One pass over the .tab file, or its columnar copy if the runner
+        # wrote one
+        table, _ = read_tab(filename)
+        data = np.column_stack([table[name].astype(np.float64) for name in table.dtype.names])
     
     # Determine number of columns
     n_cols = data.shape[1]
@@ -74,39 +79,44 @@ def load_data(filename):
     else:
         raise ValueError(f"Unexpected number of columns: {n_cols}")
 
-def compute_significant_digits(x0_data, x1_data, results, precision_bits):
-    """Compute significant digits for each unique (x0, x1) combination"""
-    # Get unique values for each input
-    unique_x0 = np.unique(x0_data)
-    unique_x1 = np.unique(x1_data)
-    
-    # Create grid for significant digits
+def load_statistics(filename, precision_bits):
+    """Statistics of each (x0, x1) combination from the summary sidecar.
+
+    The sidecar is rebuilt from the samples if it is missing or older
+    than the file. Returns None if the file does not have 2 inputs, or
+    3 with x2 fixed, so the samples must be grouped by (x0, x1).
+    """
+    summary = file_summary(filename)
+    n_inputs = len(summary.inputs)
+    if n_inputs not in (2, 3):
+        return None
+    inputs = ('x0', 'x1', 'x2')[:n_inputs]
+    stats = columnar.rename(summary.statistics(precision_bits), inputs + STATISTICS)
+    if n_inputs == 3 and len(np.unique(stats['x2'])) > 1:
+        return None
+    return stats
+
+def compute_significant_digits(x0_data, x1_data, results, precision_bits, stats=None):
+    """Compute significant digits for each unique (x0, x1) combination.
+
+    stats, if given, holds the statistics of the combinations, as
+    returned by load_statistics(), and the samples are not used.
+    """
+    if stats is None:
+        # Statistics of every (x0, x1) combination at once
+        data = np.empty(len(results), dtype=[('x0', 'f8'), ('x1', 'f8'), ('result', 'f8')])
+        data['x0'], data['x1'], data['result'] = x0_data, x1_data, results
+        stats = group_statistics(data, ('x0', 'x1'), precision_bits)
+    
+    # Grid of significant digits, zero where a combination has no samples
+    unique_x0, i = np.unique(stats['x0'], return_inverse=True)
+    unique_x1, j = np.unique(stats['x1'], return_inverse=True)
     sig_digits_grid = np.zeros((len(unique_x1), len(unique_x0)))
+    sig_digits_grid[j, i] = stats['sig_digits']
     
     # Calculate maximum significant digits based on precision
     max_sig_digits = precision_bits * np.log10(2)
     
-    # Process each unique combination
-    for i, x0 in enumerate(unique_x0):
-        for j, x1 in enumerate(unique_x1):
-            # Find all results for this combination
-            mask = (x0_data == x0) & (x1_data == x1)
-            if np.any(mask):
-                values = results[mask]
-                mean_val = np.mean(values)
-                std_val = np.std(values)
-                
-                # Compute significant digits with proper bounds
-                if std_val < 1e-15 or std_val == 0:  # Below machine epsilon
-                    sig_digits = max_sig_digits
-                elif mean_val == 0:
-                    sig_digits = 0
-                else:
-                    # Cap at maximum possible for the precision
-                    sig_digits = min(-np.log10(std_val/abs(mean_val)), max_sig_digits)
-                
-                sig_digits_grid[j, i] = sig_digits
-    
     return unique_x0, unique_x1, sig_digits_grid, max_sig_digits
 
 def create_heatmap(unique_x0, unique_x1, sig_digits_grid, max_sig_digits, args):
@@ -154,8 +164,17 @@ def main():
     # Load data
     print(f"Loading data from: {args.datafile}")
     try:
-        x0_data, x1_data, results = load_data(args.datafile)
-        print(f"Loaded {len(results)} data points")
+        # The per-point summary next to a .tab file spares reading the
+        # samples
+        stats = None
+        if not args.datafile.endswith('.csv'):
+            stats = load_statistics(args.datafile, args.precision)
+        if stats is None:
+            x0_data, x1_data, results = load_data(args.datafile)
+            print(f"Loaded {len(results)} data points")
+        else:
+            x0_data = x1_data = results = None
+            print(f"Loaded {stats['count'].sum()} data points")
     except Exception as e:
         print(f"Error loading data: {e}")
         sys.exit(1)
@@ -163,7 +182,7 @@ def main():
     # Compute significant digits
     print("Computing significant digits...")
     unique_x0, unique_x1, sig_digits_grid, max_sig_digits = compute_significant_digits(
-        x0_data, x1_data, results, args.precision
+        x0_data, x1_data, results, args.precision, stats
     )
     print(f"Grid size: {len(unique_x0)} x {len(unique_x1)}")
     print(f"Max theoretical significant digits: {max_sig_digits:.2f}")
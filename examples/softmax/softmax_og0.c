@@ -7,6 +7,10 @@ double softmax_x0(double x0, double x1, double x2) {
     return exp(x0) / (exp(x0) + exp(x1) + exp(x2));
 }
 
+#ifdef VFC_DRIVER
+#include "vfc_driver.h"
+VFC_DRIVER_MAIN3(softmax_x0)
+#else
 int main(int argc, char **argv) {
     if (argc != 4) {
         fprintf(stderr, "Usage: %s <x0> <x1> <x2>\n", argv[0]);
@@ -26,3 +30,4 @@ int main(int argc, char **argv) {
 
     return 0;
 }
+#endif
@@ -9,6 +9,10 @@ float softmax_x0_float(float x0, float x1, float x2) {
     return expf(x0) / (expf(x0) + expf(x1) + expf(x2));
 }
 
+#ifdef VFC_DRIVER
+#include "vfc_driver.h"
+VFC_DRIVER_MAIN3(softmax_x0_float)
+#else
 int main(int argc, char **argv) {
     if (argc != 4) {
         fprintf(stderr, "Usage: %s <x0> <x1> <x2>\n", argv[0]);
@@ -28,4 +32,5 @@ int main(int argc, char **argv) {
     printf("softmax(%f, %f, %f) = %f\n", x0, x1, x2, y0);
 
     return 0;
-}
\ No newline at end of file
+}
+#endif
@@ -23,6 +23,10 @@ float softmax_x0_stable(float x0, float x1, float x2) {
     return exp0 / (exp0 + exp1 + exp2);
 }
 
+#ifdef VFC_DRIVER
+#include "vfc_driver.h"
+VFC_DRIVER_MAIN3(softmax_x0_stable)
+#else
 int main(int argc, char **argv) {
     // Ensure the user provides exactly three numbers
     if (argc != 4) {
@@ -43,3 +47,4 @@ int main(int argc, char **argv) {
 
     return 0;
 }
+#endif
@@ -11,18 +11,21 @@ double softmax_x0_stable_double(double x0, double x1, double x2) {
     return exp0 / (exp0 + exp1 + exp2);
 }
 
-// Main function that reads from standard input
+// Main function that reads lines of inputs from standard input, until its end
 int main() {
     double x0, x1, x2;
+    long n = 0;
 
-    // Read three doubles from standard input
-    if (scanf("%lf %lf %lf", &x0, &x1, &x2) == 3) {
+    // Read three doubles per line from standard input
+    while (scanf("%lf %lf %lf", &x0, &x1, &x2) == 3) {
         double true_value = softmax_x0_stable_double(x0, x1, x2);
         // Print result to standard output for Python to capture
         printf("%.17g\n", true_value);
-        return 0; // Success
-    } else {
+        n++;
+    }
+    if (n == 0 || !feof(stdin)) {
         // If scanf fails, exit with an error
         return 1; 
     }
+    return 0; // Success
 }
\ No newline at end of file
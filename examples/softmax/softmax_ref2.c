@@ -23,25 +23,29 @@ double softmax_x0_unstable_double(double x0, double x1, double x2) {
 
 /**
  * @brief Main function to read inputs and compute the unstable softmax.
- * * This program reads three double-precision floating-point numbers from
- * standard input, calculates the unstable softmax for the first value,
- * and prints the result to standard output with high precision.
+ * * This program reads lines of three double-precision floating-point
+ * numbers from standard input until its end, calculates the unstable
+ * softmax for the first value of each line, and prints the results to
+ * standard output with high precision, one per line.
  */
 int main() {
     double x0, x1, x2;
+    long n = 0;
 
-    // Read three doubles from standard input, separated by spaces
-    if (scanf("%lf %lf %lf", &x0, &x1, &x2) == 3) {
+    // Read three doubles per line from standard input, separated by spaces
+    while (scanf("%lf %lf %lf", &x0, &x1, &x2) == 3) {
         // Call the unstable version of the function
         double result_value = softmax_x0_unstable_double(x0, x1, x2);
         
         // Print the result to standard output for the Python script to capture
         printf("%.17g\n", result_value);
-        
-        return 0; // Success
-    } else {
+        n++;
+    }
+
+    if (n == 0 || !feof(stdin)) {
         // If scanf fails (e.g., incorrect input format), exit with an error
         fprintf(stderr, "Error: Failed to read three double values from stdin.\n");
         return 1; 
     }
+    return 0; // Success
 }
@@ -1,71 +1,65 @@
 #!/usr/bin/env python3
 import csv
-import pandas as pd
 import numpy as np
-import subprocess
-import math
+import sys
+from pathlib import Path
 
-def get_true_value(x0, x1, x2):
-    """Calls the compiled C program to get the high-precision value."""
-    command = ['./softmax_ref2']
-    input_str = f"{x0} {x1} {x2}"
-    
-    result = subprocess.run(
-        command, 
-        input=input_str, 
-        capture_output=True, 
-        text=True, 
-        check=True
-    )
-    return float(result.stdout.strip())
+# Shared tooling (per-point statistics, reference programs, ULP errors)
+# lives in tools/vfctools
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'tools'))
+from vfctools import ulp
+from vfctools.reference import reference_for
+from vfctools.stats import summarize_file
+
+# High-precision values of softmax y0, computed in process; the path of
+# a reference program reading one line of inputs per point (such as
+# './softmax_ref2') can be given instead
+reference_program = reference_for('softmax_y0')
 
 # Input and output filenames
 raw_data_filename = 'verificarlo_results/softmax8/softmax_og0_lp_naive-3inputs-grid-FLOAT-vp24-mca.tab' 
 output_csv_filename = 'analysis_results.csv'
+histogram_csv_filename = 'ulp_histogram.csv'
 
-# Load the raw data from your .tab file
-df = pd.read_csv(
-    raw_data_filename, 
-    delim_whitespace=True, 
-    skiprows=1,
-    names=['i', 'x0', 'x1', 'x2', 'result']
-)
-
-# Group the data by the unique input combinations
-grouped = df.groupby(['x0', 'x1', 'x2'])
+# Per-point summary of the raw data in your .tab file. Samples with a
+# NaN result are left out of the statistics, as pandas skips them
+summary = summarize_file(raw_data_filename, skip_nan=True)
+points = summary.records
+inputs = np.column_stack([points[var] for var in summary.inputs])
+# Sample standard deviation (ddof=1), as pandas computes it
+with np.errstate(divide='ignore', invalid='ignore'):
+    std_devs = np.sqrt(points['m2'] / (points['count'] - 1))
 
-# Open the output CSV file for writing
-with open(output_csv_filename, 'w', newline='') as csvfile:
-    writer = csv.writer(csvfile)
-    writer.writerow(['x0', 'x1', 'x2', 'mean', 'std_dev', 'significant_digits', 'ulp_error'])
+# Skip points if any of the input values are not valid numbers (NaN)
+valid = ~np.isnan(inputs).any(axis=1)
+inputs, means, std_devs = inputs[valid], points['mean'][valid], std_devs[valid]
 
-    # Process each group of inputs
-    for name, group in grouped:
-        x0, x1, x2 = name
-        
-        # Skip rows if any of the input values are not valid numbers (NaN)
-        if any(math.isnan(v) for v in [x0, x1, x2]):
-            continue
+# The high-precision values of all the points at once
+true_values = reference_program(inputs.tolist())
 
-        mca_results = group['result']
-        mean_val = mca_results.mean()
-        std_dev = mca_results.std()
-        
-        if mean_val != 0 and std_dev > 0:
-            sig_digits = -math.log10(std_dev / abs(mean_val))
-        else:
-            sig_digits = float('inf')
+# Significant digits and ULP errors of the means, in ulps of the working
+# precision (FLOAT or DOUBLE) given in the file name
+with np.errstate(divide='ignore', invalid='ignore'):
+    sig_digits = np.where((means != 0) & (std_devs > 0),
+                          -np.log10(std_devs / np.abs(means)), np.inf)
+real = ulp.real_of(raw_data_filename)
+ulp_errors = ulp.ulp_error(means, true_values, real)
 
-        true_val = get_true_value(x0, x1, x2)
-        
-        abs_error = abs(mean_val - true_val)
-        true_val_f32 = np.float32(true_val)
+# ULP errors of the individual samples, read from the file a chunk at a
+# time: their median, 99th percentile and maximum at each point, and a
+# histogram of all of them
+tail, histogram = ulp.error_distribution(raw_data_filename, points[valid], true_values,
+                                         summary.inputs, real)
 
-        # --- Use np.spacing() for a cleaner ULP calculation ---
-        ulp = np.spacing(true_val_f32)
-        
-        ulp_error = abs_error / ulp if ulp > 0 else 0.0
-        
-        writer.writerow([x0, x1, x2, mean_val, std_dev, sig_digits, ulp_error])
+# Open the output CSV file for writing
+with open(output_csv_filename, 'w', newline='') as csvfile:
+    writer = csv.writer(csvfile)
+    writer.writerow(['x0', 'x1', 'x2', 'mean', 'std_dev', 'significant_digits', 'ulp_error',
+                     'p50_ulp_error', 'p99_ulp_error', 'max_ulp_error'])
+    writer.writerows(np.column_stack([inputs, means, std_devs, sig_digits, ulp_errors,
+                                      tail['p50'], tail['p99'], tail['max']]).tolist())
+ulp.write_histogram(histogram_csv_filename, histogram)
 
-print(f"Analysis complete. Results have been saved to '{output_csv_filename}'")
\ No newline at end of file
+print(f"Analysis complete. Results have been saved to '{output_csv_filename}'")
+print(f"Histogram of the ULP errors of all {histogram.sum()} samples saved to "
+      f"'{histogram_csv_filename}'")
@@ -0,0 +1,617 @@
+#!/usr/bin/env python3
+"""
+Verificarlo sweep runner for programs with 1, 2, or 3 inputs
+
+Takes the same options as the run_verificarlo.sh/runp.sh runners it
+replaces. Test cases are generated in-process and sampled by a pool of
+long-lived kernel processes (see tools/vfc_driver.h); results are
+streamed into the .tab file by a single writer. Workers pull chunks
+dynamically, with guided chunk sizes, and their utilization is reported
+at the end (see vfctools/runner.py).
+
+-v and -M also accept comma-separated lists: the cross product of
+precisions and modes is run over one worker pool, sharing the job list
+and the compiled binary, and one .tab file is written per configuration.
+
+With --adaptive WIDTH, the number of samples per point is not fixed:
+points are resampled until the 95% confidence interval on their
+significant digits is narrower than WIDTH digits (see vfctools/adaptive.py).
+
+-T adaptive starts from the coarse grid and recursively refines only the
+cells where the significant digits drop or change sharply (see
+vfctools/refine.py).
+
+-T search looks for the least accurate inputs in the box with a batched
+differential evolution, within --budget points, and writes them to a
+-worst.csv file next to the .tab file (see vfctools/search.py).
+
+Progress is checkpointed in a manifest in the output directory; after an
+interruption (walltime limit, SIGTERM, ^C) the same command with
+--resume re-runs only the missing chunks and appends them to the .tab
+files. Once a sweep completes, the per-point summary of each .tab file
+is written next to it (see vfctools/summary.py).
+"""
+
+import getopt
+import os
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from vfctools import (adaptive, checkpoint, exact, jobs, library, reference, refine, runner,
+                      search, summary, tabfile)
+from vfctools.plan import JobPlan
+
+# -E engines and the worker pool each runs on. runp.sh's gnu_parallel and
+# xargs both run the default pool of kernel processes; none runs it with
+# a single worker
+ENGINES = {'none': 'kernel', 'library': 'library', 'gnu_parallel': 'kernel',
+           'xargs': 'kernel'}
+
+
+def usage(prog):
+    """Print usage and exit"""
+    print(f"""Usage: {prog} -p PROGRAM -t TYPE -v VPRECISION -M MODE -n NINPUTS [options]
+
+Required arguments:
+  -p PROGRAM      : C source file to compile (without .c extension)
+  -t TYPE         : Precision type [FLOAT | DOUBLE]
+  -v VPRECISION   : MCA Virtual Precision (positive integer, or a comma-separated list)
+  -M MODE         : MCA Mode [mca | pb | rr] (or a comma-separated list)
+  -n NINPUTS      : Number of inputs (1, 2, or 3)
+
+Optional arguments:
+  -r RANGE        : Test range as 'start:end' for all variables (default: '-1.0:1.0')
+  -R RANGES       : Individual ranges as 'x0=start:end,x1=start:end,x2=start:end'
+                    Example: -R 'x0=-10:10,x1=-5:5,x2=0:20'
+  -s STEP         : Step size for all variables (default: 0.5); the values are
+                    start, start+step, ... up to end, as np.arange(start, end+step/2, step)
+  -S STEPS        : Individual steps as 'x0=step,x1=step,x2=step'
+                    Example: -S 'x0=0.5,x1=1.0,x2=2.0'
+  -i ITERATIONS   : Number of iterations per test value (default: 20)
+  -o OUTPUT_DIR   : Output directory for results (default: './results')
+  -e EXTRA_FILES  : Additional source files to compile (space-separated)
+  -O OPTIMIZE     : Optimization flags (e.g., '-O3 -ffast-math')
+  -P              : Enable plotting (runs ./plot.py on the results if present)
+  -F FIXED        : Fixed values for some inputs (format: 'var=value,var=value')
+                    e.g., -F 'x1=0.0,x2=1.0' to fix x1 and x2
+  -T TEST         : Test pattern [grid | diagonal | random | fixed | adaptive]
+                    grid: test all combinations (default)
+                    diagonal: x0=x1=x2
+                    random: random values in range
+                    fixed: use -F to fix some variables
+                    adaptive: grid refined around low-significance regions
+                    sobol, halton: scrambled low-discrepancy points in range
+                    search: worst-case input search within --budget points
+  -j JOBS         : Number of parallel workers (default: number of CPU cores)
+  -b BATCH_SIZE   : Number of input points per chunk (default: auto)
+  -E ENGINE       : Execution engine [none | library | gnu_parallel | xargs]
+                    (default: parallel kernel processes). 'none' runs
+                    sequentially; 'library' builds the kernel as a shared
+                    library and calls it in-process over NumPy arrays;
+                    'gnu_parallel' and 'xargs', from runp.sh, run the default
+                    parallel kernel processes
+  --resume        : Continue an interrupted sweep run with the same options
+  --adaptive WIDTH: Sample each point until the 95% confidence interval on its
+                    significant digits is narrower than WIDTH digits (replaces -i)
+  --min-samples N : Samples drawn for every point in adaptive mode (default: 5)
+  --max-samples N : Maximum samples per point in adaptive mode (default: 200)
+  --depth N       : Refinement levels of the adaptive pattern (default: 3)
+  --budget N      : Maximum points per configuration for the adaptive pattern
+                    (default: 10 times the coarse grid) or the search pattern
+                    (default: 20 generations)
+  --refine-threshold D
+                  : Refine cells whose significant digits spread more than D,
+                    or drop more than D below the median (default: 1.0)
+  --points N      : Number of sobol/halton points (default: 1024; use a power
+                    of two for sobol)
+  --seed S        : Seed for the random, sobol and halton patterns
+  --no-scramble   : Use the plain (unscrambled) sobol/halton sequences
+  --objective OBJ : What the search pattern maximizes [digits | std | ulp]:
+                    lost significant digits (default), sample std, or ulp error
+                    of the sample mean against --reference
+  --reference PROG: Reference program for --objective ulp, reading one line of
+                    inputs per point on stdin and printing the exact values, or
+                    the name of an in-process reference (see vfctools/exact.py)
+  --population N  : Search population size (default: 10 per searched input, at least 8)
+  --top K         : Worst points reported by the search pattern (default: 10)
+  --raw-results   : Read the kernels' results as raw doubles from a dedicated pipe
+                    (vfc_driver.h --result-fd) instead of parsing their text output
+  --plan FILE     : Take the test cases from a job plan written by generate_jobs.py
+                    --plan (replaces -n, -T, -r/-R, -s/-S, -F, -i and --points)
+
+Examples:
+  # Different ranges for each variable:
+  {prog} -p softmax -t DOUBLE -v 53 -M mca -n 3 -R 'x0=-10:10,x1=-5:5,x2=0:20' -s 0.5
+
+  # Different ranges and steps, 8 workers:
+  {prog} -p softmax -t DOUBLE -v 53 -M mca -n 3 -R 'x0=-10:10,x1=-5:5,x2=0:20' -S 'x0=0.5,x1=1.0,x2=2.0' -j 8
+
+  # Full precision study in one pass (9 .tab files):
+  {prog} -p softmax -t DOUBLE -v 11,24,53 -M mca,pb,rr -n 3
+
+  # Coarse 1.0 grid refined down to 0.125 where accuracy drops:
+  {prog} -p softmax -t DOUBLE -v 53 -M mca -n 3 -T adaptive -s 1.0 --depth 3
+
+  # Worst-case inputs within 2000 points, ulp error against softmax_ref2:
+  {prog} -p softmax_og0 -t DOUBLE -v 53 -M mca -n 3 -r -10:10 -T search --budget 2000 \\
+      --objective ulp --reference ./softmax_ref2
+
+  # Adaptive sample counts, digits known to +/- 0.25:
+  {prog} -p softmax -t DOUBLE -v 53 -M mca -n 3 --adaptive 0.25 --max-samples 500""")
+    sys.exit(1)
+
+
+def fail(message):
+    print(f"Error: {message}")
+    sys.exit(1)
+
+
+def parse_arguments(argv):
+    """Parse getopt-style options into a sweep configuration"""
+    prog = os.environ.get('VFC_RUNNER_NAME', argv[0])
+    try:
+        opts, _ = getopt.getopt(argv[1:], 'p:t:v:M:n:r:R:s:S:i:o:e:O:F:T:j:b:E:Ph',
+                                ['resume', 'adaptive=', 'min-samples=', 'max-samples=',
+                                 'depth=', 'budget=', 'refine-threshold=',
+                                 'points=', 'seed=', 'no-scramble', 'plan=',
+                                 'objective=', 'reference=', 'population=', 'top=',
+                                 'raw-results'])
+    except getopt.GetoptError as e:
+        print(f"Error: {e}")
+        usage(prog)
+
+    config = SimpleNamespace(
+        program=None, real=None, precision=None, mode=None, ninputs=None,
+        range='-1.0:1.0', individual_ranges='', step='0.5', individual_steps='',
+        iterations='20', output_dir='./results', extra_files='', optimization='',
+        fixed_values='', pattern='grid', jobs=None, batch_size=None, engine=None,
+        plot=False, resume=False, adaptive=None, min_samples='5', max_samples='200',
+        depth='3', budget=None, threshold='1.0', points='1024', seed=None,
+        scramble=True, plan_file=None, plan=None, objective='digits', reference=None,
+        population=None, top='10', raw_results=False)
+
+    names = {'-p': 'program', '-t': 'real', '-v': 'precision', '-M': 'mode',
+             '-n': 'ninputs', '-r': 'range', '-R': 'individual_ranges',
+             '-s': 'step', '-S': 'individual_steps', '-i': 'iterations',
+             '-o': 'output_dir', '-e': 'extra_files', '-O': 'optimization',
+             '-F': 'fixed_values', '-T': 'pattern', '-j': 'jobs',
+             '-b': 'batch_size', '-E': 'engine', '--adaptive': 'adaptive',
+             '--min-samples': 'min_samples', '--max-samples': 'max_samples',
+             '--depth': 'depth', '--budget': 'budget', '--refine-threshold': 'threshold',
+             '--points': 'points', '--seed': 'seed', '--plan': 'plan_file',
+             '--objective': 'objective', '--reference': 'reference',
+             '--population': 'population', '--top': 'top'}
+    for opt, value in opts:
+        if opt == '-h':
+            usage(prog)
+        elif opt == '-P':
+            config.plot = True
+        elif opt == '--resume':
+            config.resume = True
+        elif opt == '--no-scramble':
+            config.scramble = False
+        elif opt == '--raw-results':
+            config.raw_results = True
+        else:
+            setattr(config, names[opt], value)
+
+    if config.plan_file:
+        load_plan(config)
+    if not all([config.program, config.real, config.precision, config.mode, config.ninputs]):
+        print("Error: Missing required arguments")
+        usage(prog)
+
+    validate(config)
+    return config
+
+
+def load_plan(config):
+    """Take the sweep's test cases and their options from a saved job plan"""
+    try:
+        config.plan = JobPlan.load(config.plan_file)
+    except (OSError, ValueError, KeyError) as e:
+        fail(f"Cannot read job plan '{config.plan_file}': {e}")
+    plan = config.plan
+    config.ninputs = str(plan.ninputs)
+    config.pattern = plan.pattern
+    config.iterations = str(plan.iterations)
+    config.points = str(plan.points or 0)
+    config.seed = None if plan.seed is None else str(plan.seed)
+    config.scramble = plan.scramble
+    ranges, steps, fixed = [], [], []
+    for v in plan.variables:
+        if 'fixed' in v:
+            fixed.append(f"{v['name']}={v['fixed']}")
+        elif 'start' in v:
+            ranges.append(f"{v['name']}={v['start']}:{v['end']}")
+            steps.append(f"{v['name']}={v['step']!r}")
+    config.individual_ranges = ','.join(ranges)
+    config.individual_steps = ','.join(steps)
+    config.fixed_values = ','.join(fixed)
+
+
+def validate(config):
+    """Check option values and convert them to their working types"""
+    if config.ninputs not in ('1', '2', '3'):
+        fail("Number of inputs must be 1, 2, or 3")
+    config.ninputs = int(config.ninputs)
+
+    if config.pattern not in jobs.PATTERNS and config.plan is None:
+        fail(f"Invalid test pattern '{config.pattern}'")
+    if config.engine is not None and config.engine not in ENGINES:
+        fail(f"Invalid engine '{config.engine}'. Choose between [{' | '.join(ENGINES)}]")
+    if config.real not in ('FLOAT', 'DOUBLE'):
+        fail(f"Invalid precision type '{config.real}'. Choose between [FLOAT | DOUBLE]")
+    config.modes = config.mode.split(',')
+    for mode in config.modes:
+        if mode not in ('mca', 'pb', 'rr'):
+            fail(f"Invalid MCA mode '{mode}'. Choose between [mca | pb | rr]")
+    config.precisions = config.precision.split(',')
+    for precision in config.precisions:
+        if not precision.isdigit() or int(precision) < 1:
+            fail("vprecision must be a positive integer")
+    if not Path(f"{config.program}.c").is_file():
+        fail(f"Source file '{config.program}.c' not found")
+
+    try:
+        config.iterations = int(config.iterations)
+        default_range = jobs.parse_range(config.range)
+        config.ranges = {var: default_range for var in jobs.VARIABLES}
+        for var, text in jobs.parse_assignments(config.individual_ranges).items():
+            config.ranges[var] = jobs.parse_range(text)
+        config.steps = {var: float(config.step) for var in jobs.VARIABLES}
+        for var, text in jobs.parse_assignments(config.individual_steps).items():
+            config.steps[var] = float(text)
+        config.fixed = jobs.parse_assignments(config.fixed_values)
+        config.batch_size = int(config.batch_size) if config.batch_size else None
+        if config.engine == 'none':
+            config.jobs = 1
+        config.jobs = int(config.jobs) if config.jobs else (os.cpu_count() or 4)
+        config.min_samples = int(config.min_samples)
+        config.max_samples = int(config.max_samples)
+        if config.adaptive is not None:
+            config.adaptive = float(config.adaptive)
+        config.depth = int(config.depth)
+        config.threshold = float(config.threshold)
+        config.budget = int(config.budget) if config.budget else None
+        config.points = int(config.points)
+        config.seed = int(config.seed) if config.seed is not None else None
+        config.population = int(config.population) if config.population else None
+        config.top = int(config.top)
+    except ValueError as e:
+        fail(f"Invalid option value: {e}")
+
+    if config.engine == 'library' and config.raw_results:
+        fail("--raw-results does not apply to the library engine, which has no text output")
+    if config.pattern in ('adaptive', 'search'):
+        if config.adaptive is not None:
+            fail(f"--adaptive sampling cannot be combined with the {config.pattern} test pattern")
+        if config.resume:
+            fail(f"{config.pattern.capitalize()} test pattern sweeps cannot be resumed")
+    if config.pattern == 'search':
+        if config.objective not in search.OBJECTIVES:
+            fail(f"Invalid search objective '{config.objective}'. "
+                 f"Choose between [{' | '.join(search.OBJECTIVES)}]")
+        if config.objective == 'ulp':
+            if not config.reference:
+                fail("--objective ulp needs a --reference program")
+            if (config.reference not in exact.REFERENCES
+                    and not os.access(config.reference, os.X_OK)):
+                fail(f"Reference program '{config.reference}' not found or not executable")
+        if config.population is not None and config.population < 4:
+            fail("Search population must be at least 4")
+        try:
+            space = search.SearchSpace(config)
+        except ValueError as e:
+            fail(str(e))
+        config.population = config.population or max(8, 10 * space.dims)
+        config.budget = config.budget or 20 * config.population
+        if config.iterations < 2 and config.objective != 'ulp':
+            fail("The search needs at least 2 iterations per point to estimate the error")
+    if config.pattern == 'adaptive' and config.depth < 0:
+        fail("Refinement depth must not be negative")
+    if config.adaptive is not None:
+        if config.pattern == 'random':
+            fail("Adaptive sampling needs a grid, diagonal or fixed test pattern")
+        if config.adaptive <= 0:
+            fail("Adaptive target width must be positive")
+        if not 2 <= config.min_samples <= config.max_samples:
+            fail("Sample caps must satisfy 2 <= --min-samples <= --max-samples")
+
+
+def print_configuration(config):
+    print("=== Verificarlo Configuration ===")
+    print(f"Program: {config.program}.c")
+    print(f"Number of inputs: {config.ninputs}")
+    print(f"Test pattern: {config.pattern}")
+    print(f"Precision Type: {config.real}")
+    print(f"Verificarlo Precision: {config.precision}")
+    print(f"MCA Mode: {config.mode}")
+    if config.plan_file:
+        print(f"Job plan: {config.plan_file} ({config.plan.describe()})")
+    elif config.individual_ranges:
+        print("Variable ranges:")
+        for var in jobs.input_variables(config):
+            if var not in config.fixed:
+                start, end = config.ranges[var]
+                print(f"  {var}: [{start}, {end}] step {config.steps[var]}")
+    else:
+        print(f"Test Range: [{config.ranges['x0'][0]}, {config.ranges['x0'][1]}] with step {config.step}")
+    if config.adaptive is not None:
+        print(f"Adaptive sampling: +/-{config.adaptive} digits, "
+              f"{config.min_samples}-{config.max_samples} samples per value")
+    else:
+        print(f"Iterations per value: {config.iterations}")
+    if config.pattern == 'adaptive':
+        print(f"Refinement: depth {config.depth}, threshold {config.threshold} digits")
+    if config.pattern == 'search':
+        print(f"Search objective: {config.objective}"
+              + (f" against {config.reference}" if config.objective == 'ulp' else ''))
+    if config.pattern in ('sobol', 'halton'):
+        print(f"Points: {config.points} ({'scrambled' if config.scramble else 'unscrambled'})")
+    print(f"Output Directory: {config.output_dir}")
+    if config.optimization:
+        print(f"Optimization: {config.optimization}")
+    if config.fixed_values:
+        print(f"Fixed values: {config.fixed_values}")
+    print(f"Parallel workers: {config.jobs}")
+    print("================================")
+
+
+def variants(config):
+    """One configuration per (precision, mode) pair of the sweep"""
+    return [SimpleNamespace(**{**vars(config), 'precision': precision, 'mode': mode})
+            for precision in config.precisions for mode in config.modes]
+
+
+def open_manifest(config, output_files):
+    """Load the checkpoint of an interrupted sweep when resuming"""
+    if not config.resume:
+        return None
+    path = checkpoint.manifest_path(config)
+    manifest = checkpoint.Manifest.load(path)
+    if manifest is None:
+        print("No checkpoint found for these options, starting from the beginning")
+        return None
+    if not manifest.matches(config) or manifest.outputs != [str(f) for f in output_files]:
+        fail(f"Checkpoint {path} was written with different options")
+    for output_file, offset in zip(output_files, manifest.offsets):
+        if offset is not None and not Path(output_file).is_file():
+            fail(f"Cannot resume: {output_file} is missing")
+    print(f"Resuming from {path} ({sum(manifest.chunks)} chunks already done)")
+    return manifest
+
+
+def start_searches(config, outputs, seed):
+    """One worst-case search per configuration of the search pattern"""
+    space = search.SearchSpace(config)
+    settings = SimpleNamespace(budget=config.budget, population=config.population,
+                               objective=config.objective, real=config.real)
+    # Reference values are shared by all configurations
+    program = (reference.reference_for(config.reference, config.jobs)
+               if config.objective == 'ulp' else None)
+    return [search.Search(space, settings, int(variant.precision), [seed, k], program)
+            for k, (variant, _) in enumerate(outputs)]
+
+
+def report_search(state, config, output_file):
+    """Print the worst points a search found and save them next to the .tab file"""
+    report_file = output_file.with_name(output_file.stem + '-worst.csv')
+    entries = search.write_report(report_file, state, config.ninputs, config.top)
+    print(f"\nWorst inputs found ({config.objective}, {state.evaluated} points searched):")
+    for entry in entries[:5]:
+        inputs = ' '.join(entry['inputs'])
+        if config.objective == 'ulp':
+            print(f"  {inputs}: {entry['loss']:.3g} ulp (mean {entry['mean']:.17g})")
+        elif config.objective == 'std':
+            print(f"  {inputs}: std {entry['std']:.3g} (mean {entry['mean']:.17g})")
+        else:
+            print(f"  {inputs}: {-entry['loss']:.2f} significant digits "
+                  f"(mean {entry['mean']:.17g}, std {entry['std']:.3g})")
+    print(f"Top {len(entries)} saved to: {report_file}")
+
+
+def kernel_pool(config, binary, envs, usage, materialize=None):
+    """Worker pool for the engine selected with -E"""
+    if ENGINES.get(config.engine) == 'library':
+        return library.LibraryPool(binary, envs, config.jobs, materialize, usage)
+    return runner.KernelPool(binary, envs, config.jobs, materialize, usage, config.raw_results)
+
+
+def sweep_results(config, binary, envs, manifest, searches=None, usage=None):
+    """Yield (env_index, lines, progress) for the sweep, in write order.
+
+    progress counts samples with a fixed iteration count and input
+    points in adaptive mode and for the adaptive and search patterns.
+    """
+    if config.pattern == 'search':
+        with kernel_pool(config, binary, envs, usage) as pool:
+            yield from search.run_search(pool, searches, config, manifest.chunk_size)
+        return
+
+    if config.pattern == 'adaptive':
+        settings = SimpleNamespace(
+            depth=config.depth, budget=config.budget, threshold=config.threshold,
+            precision_bits=[int(p) for p in config.precisions for _ in config.modes])
+        with kernel_pool(config, binary, envs, usage) as pool:
+            yield from refine.run_refinement(pool, envs, config, settings,
+                                             manifest.chunk_size)
+        return
+
+    if config.adaptive is None:
+        materialize = runner.plan_materializer(config.plan, jobs.format_value)
+        with kernel_pool(config, binary, envs, usage, materialize) as pool:
+            for index, lines in runner.run_plan(pool, config.plan, manifest.chunk_size,
+                                                skip=manifest.chunks,
+                                                schedule_workers=manifest.workers):
+                yield index, lines, len(lines)
+        return
+
+    # In adaptive mode the manifest's chunks are windows of points
+    settings = SimpleNamespace(
+        target=config.adaptive, min_samples=config.min_samples,
+        max_samples=config.max_samples,
+        precision_bits=[int(p) for p in config.precisions for _ in config.modes])
+    chunk_size = runner.chunk_size_for(manifest.chunk_size, config.jobs)
+    requests = jobs.generate_requests(config)
+    with kernel_pool(config, binary, envs, usage) as pool:
+        yield from adaptive.run_adaptive(pool, len(envs), requests, manifest.chunk_size,
+                                         chunk_size, settings, skip=manifest.chunks)
+
+
+def run_sweep(config, binary, outputs):
+    """Run every test case and stream the samples of each configuration.
+
+    outputs is a list of (variant, output_file) pairs; the test cases are
+    generated once and run under each variant's backend.
+    """
+    output_files = [output_file for _, output_file in outputs]
+    manifest = open_manifest(config, output_files)
+    if config.plan is None:
+        # Unless --seed is given, random/sobol/halton points are drawn from
+        # the seed recorded in the manifest, so that a resumed sweep
+        # regenerates the same job list
+        seed = config.seed if config.seed is not None or manifest is None else manifest.seed
+        try:
+            config.plan = JobPlan.from_config(config, seed=seed)
+        except ValueError as e:
+            fail(str(e))
+    n_requests = jobs.count_requests(config)
+    total_tests = jobs.count_tests(config)
+    if config.pattern == 'search':
+        # Points are sampled one generation at a time
+        n_requests = config.population
+
+    if manifest is None:
+        chunk_size = runner.chunk_size_for(n_requests * len(outputs), config.jobs,
+                                           config.batch_size)
+        if config.adaptive is not None:
+            # Windows of points sampled together, enough to keep every
+            # worker busy during the first round
+            chunk_size *= 2 * config.jobs
+        manifest = checkpoint.Manifest(checkpoint.manifest_path(config), config,
+                                       output_files, chunk_size, seed=config.plan.seed,
+                                       workers=config.jobs)
+    searches = None
+    if config.pattern == 'search':
+        searches = start_searches(config, outputs, manifest.seed)
+
+    envs = [runner.backend_env(variant.precision, variant.mode) for variant, _ in outputs]
+    writers = [tabfile.TabWriter(output_file, config.ninputs,
+                                 renumber=(config.pattern == 'random'),
+                                 offset=manifest.offsets[index])
+               for index, output_file in enumerate(output_files)]
+    if config.pattern == 'adaptive':
+        config.budget = config.budget or 10 * n_requests
+        grand_total = config.budget * len(outputs)
+        done = 0
+        print(f"Refining from {n_requests} points (up to {config.budget} per configuration) "
+              f"with {config.jobs} workers...")
+    elif config.pattern == 'search':
+        grand_total = config.budget * len(outputs)
+        done = 0
+        print(f"Searching {config.budget} points per configuration (population "
+              f"{config.population}, seed {manifest.seed}) with {config.jobs} workers...")
+    elif config.adaptive is None:
+        grand_total = total_tests * len(outputs)
+        done = sum(writer.written for writer in writers)
+        print(f"Running {grand_total} tests with {config.jobs} workers...")
+    else:
+        grand_total = n_requests * len(outputs)
+        done = sum(min(chunks * manifest.chunk_size, n_requests) for chunks in manifest.chunks)
+        print(f"Adaptively sampling {grand_total} points with {config.jobs} workers...")
+
+    usage = runner.WorkerUsage()
+    completed = False
+    try:
+        for index, lines, progress in sweep_results(config, binary, envs, manifest, searches,
+                                                    usage):
+            writers[index].write(lines)
+            manifest.record(index, writers[index].checkpoint())
+            manifest.save()
+            done += progress
+            print(f"\rProgress: {done}/{grand_total} ({done * 100 // max(grand_total, 1)}%)",
+                  end='', flush=True)
+        completed = True
+    except RuntimeError as e:
+        print()
+        fail(str(e))
+    finally:
+        for writer in writers:
+            writer.close()
+        if completed or config.pattern in ('adaptive', 'search'):
+            manifest.remove()
+        else:
+            manifest.save(force=True)
+            print(f"\nCheckpoint saved to {manifest.path}; "
+                  f"run again with --resume to continue")
+
+    print()
+    # Per-point summaries for the analysis scripts (see vfctools/summary.py)
+    for output_file in output_files:
+        summary.file_summary(output_file, workers=config.jobs)
+    for index, ((variant, output_file), writer) in enumerate(zip(outputs, writers)):
+        print(f"\nTests completed. Results saved to: {output_file}")
+        print(f"\n=== Summary Statistics (vp{variant.precision} {variant.mode}) ===")
+        print(f"Test pattern: {config.pattern}")
+        if config.pattern in ('adaptive', 'search'):
+            print(f"Total tests: {writer.written} "
+                  f"({writer.written // max(config.iterations, 1)} values)")
+        elif config.adaptive is None:
+            print(f"Total tests: {total_tests}")
+        else:
+            print(f"Total tests: {writer.written} "
+                  f"({writer.written / max(n_requests, 1):.1f} per value on average)")
+        writer.summary.report()
+        if config.pattern == 'search':
+            report_search(searches[index], config, output_file)
+    usage.report()
+
+
+def main():
+    start_time = time.time()
+    # Batch schedulers send SIGTERM at the walltime limit; exit through
+    # the normal cleanup so the checkpoint is saved
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
+    config = parse_arguments(sys.argv)
+    print_configuration(config)
+
+    Path(config.output_dir).mkdir(parents=True, exist_ok=True)
+    outputs = [(variant, Path(config.output_dir) / tabfile.tab_filename(variant))
+               for variant in variants(config)]
+
+    # Binaries are kept in the compile cache (see vfctools/cache.py)
+    try:
+        if config.engine == 'library':
+            binary = library.compile_library(config)
+        else:
+            binary = runner.compile_program(config)
+    except (OSError, subprocess.CalledProcessError) as e:
+        fail(f"Compilation failed: {e}")
+
+    run_sweep(config, binary, outputs)
+
+    if config.plot:
+        if Path('plot.py').is_file():
+            print("\nGenerating plot...")
+            for variant, output_file in outputs:
+                subprocess.run([sys.executable, 'plot.py', str(output_file), variant.precision])
+        else:
+            print("\nWarning: plot.py not found in current directory. Skipping plot generation.")
+
+    duration = int(time.time() - start_time)
+    print("\n=== Execution Time ===")
+    if duration >= 60:
+        print(f"Total time: {duration // 60}m {duration % 60}s")
+    else:
+        print(f"Total time: {duration}s")
+
+    print("\nDone!")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Write the columnar copies of existing .tab files
+
+Usage: tab2npy.py [--force] PATH...
+
+Each PATH is a .tab file or a directory searched recursively for .tab
+files. X.tab gets a columnar copy X.npy (see vfctools/columnar.py),
+which the plotting and analysis scripts load instead of parsing the
+text. Files whose copy is up to date are skipped unless --force is
+given. The sweep runners write the copies themselves.
+"""
+
+import sys
+from pathlib import Path
+
+from vfctools import columnar
+
+
+def tab_files(paths):
+    for path in map(Path, paths):
+        if path.is_dir():
+            yield from sorted(path.rglob('*.tab'))
+        else:
+            yield path
+
+
+def main():
+    args = sys.argv[1:]
+    force = '--force' in args
+    paths = [arg for arg in args if arg != '--force']
+    if not paths or any(arg in ('-h', '--help') for arg in paths):
+        print(__doc__.strip(), file=sys.stderr)
+        sys.exit(1)
+
+    failed = False
+    for tab_path in tab_files(paths):
+        if not force and columnar.is_fresh(tab_path):
+            print(f"{tab_path}: up to date")
+            continue
+        try:
+            count = columnar.convert(tab_path)
+        except (OSError, ValueError) as e:
+            print(f"Error: {tab_path}: {e}", file=sys.stderr)
+            failed = True
+            continue
+        size = tab_path.stat().st_size
+        print(f"{tab_path}: {count} samples, {columnar.columnar_path(tab_path).stat().st_size}"
+              f"/{size} bytes")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Build a Verificarlo binary through the compile cache
+
+Usage: vfc_build.py VERIFICARLO_ARGS...
+
+Takes the verificarlo arguments without -o and prints the path of the
+cached binary on stdout; compilation messages go to stderr. Used by the
+bash runners as:
+
+  BINARY=$(python3 "$TOOLS_DIR/vfc_build.py" -DDOUBLE prog.c -lm) || exit 1
+"""
+
+import subprocess
+import sys
+
+from vfctools import cache
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] in ('-h', '--help'):
+        print(__doc__.strip(), file=sys.stderr)
+        sys.exit(1)
+    try:
+        binary = cache.cached_build(sys.argv[1:], log=sys.stderr)
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"Error: Compilation failed: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(binary)
+
+
+if __name__ == '__main__':
+    main()
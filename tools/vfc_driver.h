@@ -0,0 +1,225 @@
+#ifndef VFC_DRIVER_H
+#define VFC_DRIVER_H
+
+/*
+ * Shared main() for the Verificarlo example kernels.
+ *
+ * A kernel expands VFC_DRIVER_MAIN1/2/3 with its function instead of
+ * writing its own main() when compiled with -DVFC_DRIVER, e.g.
+ *
+ *     #ifdef VFC_DRIVER
+ *     #include "vfc_driver.h"
+ *     VFC_DRIVER_MAIN3(softmax_x0)
+ *     #else
+ *     int main(int argc, char **argv) { ... }
+ *     #endif
+ *
+ * The resulting binary supports two modes:
+ *
+ *   ./prog x0 [x1 [x2]]   evaluate once and print the result
+ *   ./prog --batch        read "n x0 [x1 [x2]]" lines from stdin and, for
+ *                         each line, evaluate the kernel n times, writing
+ *                         "i x0 [x1 [x2]] result" for i = 1..n
+ *   ./prog --batch --result-fd N
+ *                         same input, but the n results of each line are
+ *                         written to file descriptor N as raw native-endian
+ *                         IEEE doubles, and nothing is printed on stdout
+ *
+ * Inputs are echoed exactly as they were read so that the runners produce
+ * the same .tab columns as before. Output is flushed after every input line
+ * so a runner can drive the process interactively. The raw result channel
+ * spares the runner parsing text and keeps every bit of the results.
+ *
+ * Built as a shared library (-shared -fPIC), the kernel is called in
+ * process instead (see tools/vfctools/library.py) through
+ *
+ *   long vfc_driver_eval(const double *x, const long *repeats, long n,
+ *                        double *out)
+ *
+ * which evaluates row k of x (n rows of vfc_driver_ninputs() values)
+ * repeats[k] times, writing the results one after the other to out, and
+ * returns the number of results written.
+ */
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <errno.h>
+
+#define VFC_DRIVER_MAX_INPUTS 3
+#define VFC_DRIVER_LINE_MAX 1024
+#define VFC_DRIVER_SEPARATORS " \t\r\n"
+
+typedef double (*vfc_driver_kernel)(const double *x);
+
+static int vfc_driver_usage(const char *prog, int ninputs)
+{
+    fprintf(stderr, "Usage: %s <x0>%s%s\n", prog,
+            ninputs >= 2 ? " <x1>" : "", ninputs >= 3 ? " <x2>" : "");
+    fprintf(stderr, "       %s --batch [--result-fd N] < inputs\n", prog);
+    return 1;
+}
+
+static int vfc_driver_batch(int ninputs, vfc_driver_kernel kernel,
+                            FILE *results)
+{
+    char line[VFC_DRIVER_LINE_MAX];
+    char *tokens[VFC_DRIVER_MAX_INPUTS];
+    double x[VFC_DRIVER_MAX_INPUTS];
+    long lineno = 0;
+
+    while (fgets(line, sizeof(line), stdin) != NULL) {
+        char *count_token, *end;
+        long count, i;
+        int k;
+
+        lineno++;
+        count_token = strtok(line, VFC_DRIVER_SEPARATORS);
+        if (count_token == NULL || count_token[0] == '#')
+            continue;
+
+        count = strtol(count_token, &end, 10);
+        if (*end != '\0' || count < 0) {
+            fprintf(stderr, "Error: line %ld: invalid repeat count '%s'\n",
+                    lineno, count_token);
+            return 1;
+        }
+
+        for (k = 0; k < ninputs; k++) {
+            tokens[k] = strtok(NULL, VFC_DRIVER_SEPARATORS);
+            if (tokens[k] == NULL) {
+                fprintf(stderr, "Error: line %ld: expected %d inputs\n",
+                        lineno, ninputs);
+                return 1;
+            }
+            x[k] = strtod(tokens[k], NULL);
+        }
+
+        for (i = 1; i <= count; i++) {
+            double result = kernel(x);
+
+            if (results != NULL) {
+                if (fwrite(&result, sizeof(result), 1, results) != 1) {
+                    fprintf(stderr, "Error: cannot write results: %s\n",
+                            strerror(errno));
+                    return 1;
+                }
+                continue;
+            }
+            printf("%ld", i);
+            for (k = 0; k < ninputs; k++)
+                printf(" %s", tokens[k]);
+            printf(" %.17g\n", result);
+        }
+        fflush(results != NULL ? results : stdout);
+    }
+
+    return 0;
+}
+
+static long vfc_driver_eval_rows(int ninputs, vfc_driver_kernel kernel,
+                                 const double *x, const long *repeats,
+                                 long n, double *out)
+{
+    long k, i, written = 0;
+
+    for (k = 0; k < n; k++)
+        for (i = 0; i < repeats[k]; i++)
+            out[written++] = kernel(x + k * ninputs);
+    return written;
+}
+
+static int vfc_driver_run(int ninputs, vfc_driver_kernel kernel,
+                          int argc, char **argv)
+{
+    double x[VFC_DRIVER_MAX_INPUTS];
+    int k;
+
+    if (argc == 2 && strcmp(argv[1], "--batch") == 0)
+        return vfc_driver_batch(ninputs, kernel, NULL);
+
+    if (argc == 4 && strcmp(argv[1], "--batch") == 0 &&
+        strcmp(argv[2], "--result-fd") == 0) {
+        char *end;
+        long fd = strtol(argv[3], &end, 10);
+        FILE *results;
+
+        if (*end != '\0' || fd < 0 ||
+            (results = fdopen((int)fd, "wb")) == NULL) {
+            fprintf(stderr, "Error: cannot write results to fd '%s'\n",
+                    argv[3]);
+            return 1;
+        }
+        return vfc_driver_batch(ninputs, kernel, results);
+    }
+
+    if (argc != ninputs + 1)
+        return vfc_driver_usage(argv[0], ninputs);
+
+    for (k = 0; k < ninputs; k++)
+        x[k] = strtod(argv[k + 1], NULL);
+    printf("%.17g\n", kernel(x));
+    return 0;
+}
+
+#define VFC_DRIVER_MAIN1(fn)                                            \
+    static double vfc_driver_call(const double *x)                      \
+    {                                                                   \
+        return (double)fn(x[0]);                                        \
+    }                                                                   \
+    long vfc_driver_eval(const double *x, const long *repeats, long n,  \
+                         double *out)                                   \
+    {                                                                   \
+        return vfc_driver_eval_rows(1, vfc_driver_call, x, repeats, n,  \
+                                    out);                               \
+    }                                                                   \
+    int vfc_driver_ninputs(void)                                        \
+    {                                                                   \
+        return 1;                                                       \
+    }                                                                   \
+    int main(int argc, char **argv)                                     \
+    {                                                                   \
+        return vfc_driver_run(1, vfc_driver_call, argc, argv);          \
+    }
+
+#define VFC_DRIVER_MAIN2(fn)                                            \
+    static double vfc_driver_call(const double *x)                      \
+    {                                                                   \
+        return (double)fn(x[0], x[1]);                                  \
+    }                                                                   \
+    long vfc_driver_eval(const double *x, const long *repeats, long n,  \
+                         double *out)                                   \
+    {                                                                   \
+        return vfc_driver_eval_rows(2, vfc_driver_call, x, repeats, n,  \
+                                    out);                               \
+    }                                                                   \
+    int vfc_driver_ninputs(void)                                        \
+    {                                                                   \
+        return 2;                                                       \
+    }                                                                   \
+    int main(int argc, char **argv)                                     \
+    {                                                                   \
+        return vfc_driver_run(2, vfc_driver_call, argc, argv);          \
+    }
+
+#define VFC_DRIVER_MAIN3(fn)                                            \
+    static double vfc_driver_call(const double *x)                      \
+    {                                                                   \
+        return (double)fn(x[0], x[1], x[2]);                            \
+    }                                                                   \
+    long vfc_driver_eval(const double *x, const long *repeats, long n,  \
+                         double *out)                                   \
+    {                                                                   \
+        return vfc_driver_eval_rows(3, vfc_driver_call, x, repeats, n,  \
+                                    out);                               \
+    }                                                                   \
+    int vfc_driver_ninputs(void)                                        \
+    {                                                                   \
+        return 3;                                                       \
+    }                                                                   \
+    int main(int argc, char **argv)                                     \
+    {                                                                   \
+        return vfc_driver_run(3, vfc_driver_call, argc, argv);          \
+    }
+
+#endif /* VFC_DRIVER_H */
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Per-point statistics of a .tab file in bounded memory
+
+Usage: vfc_stats.py [-p PRECISION] [-j WORKERS] [-c CHUNK_ROWS] DATA.tab [OUTPUT.csv]
+
+Uses the per-point summary sidecar of DATA.tab if it is up to date.
+Otherwise reads DATA.tab (or its columnar copy) CHUNK_ROWS samples at a
+time, summarizes each chunk, in WORKERS processes if more than one,
+merges the partial summaries and writes the sidecar. Writes the mean,
+std, min, max, sample count and significant digits of every input
+point as CSV, to OUTPUT.csv or stdout. PRECISION is the virtual
+precision in bits used for the significant digits cap; by default it
+is taken from the -vpN- or -pN- tag of the file name, or 53.
+"""
+
+import csv
+import getopt
+import re
+import sys
+
+from vfctools import columnar
+from vfctools.summary import file_summary
+
+
+def precision_from_name(path):
+    match = re.search(r'-v?p(\d+)-', str(path))
+    return int(match.group(1)) if match else 53
+
+
+def main():
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], 'hp:j:c:')
+    except getopt.GetoptError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    opts = dict(opts)
+    if '-h' in opts or len(args) not in (1, 2):
+        print(__doc__.strip(), file=sys.stderr)
+        sys.exit(1)
+
+    path = args[0]
+    try:
+        precision = int(opts.get('-p', precision_from_name(path)))
+        workers = int(opts.get('-j', 1))
+        chunk_rows = int(opts.get('-c', columnar.SCAN_BLOCK))
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        summary = file_summary(path, workers=workers, chunk_rows=chunk_rows)
+    except (OSError, ValueError) as e:
+        print(f"Error: Cannot read {path}: {e}", file=sys.stderr)
+        sys.exit(1)
+    points = summary.statistics(precision)
+
+    out = open(args[1], 'w', newline='') if len(args) == 2 else sys.stdout
+    try:
+        writer = csv.writer(out)
+        writer.writerow(points.dtype.names)
+        writer.writerows(points.tolist())
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    if len(args) == 2:
+        print(f"{len(points)} points written to {args[1]}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
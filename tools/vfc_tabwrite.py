@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Stream kernel samples into a .tab file
+
+Usage: vfc_tabwrite.py OUTPUT_FILE HEADER
+       vfc_tabwrite.py --append OUTPUT_FILE
+
+Copies "i x... result" sample lines from stdin to OUTPUT_FILE in the
+order they arrive, after the HEADER line (or after what the file already
+holds with --append), and prints the summary statistics of the results
+once stdin is closed. The statistics are updated as lines are written.
+TabWriter also writes the columnar .npy copy of the file, and the
+per-point summary sidecar is then computed by file_summary() from that
+copy rather than from the text (see vfctools/summary.py). Used by the
+bash runners as:
+
+  SUMMARY=$(... | "$BINARY" --batch | python3 "$TOOLS_DIR/vfc_tabwrite.py" out.tab "i x result")
+"""
+
+import sys
+
+from vfctools.summary import file_summary
+from vfctools.tabfile import TabWriter
+
+
+def main():
+    args = sys.argv[1:]
+    append = bool(args) and args[0] == '--append'
+    if append:
+        args = args[1:]
+    if len(args) != (1 if append else 2) or args[0] in ('-h', '--help'):
+        print(__doc__.strip(), file=sys.stderr)
+        sys.exit(1)
+
+    header = None if append else args[1].rstrip('\n') + '\n'
+    try:
+        writer = TabWriter(args[0], None, header=header, append=append)
+    except OSError as e:
+        print(f"Error: Cannot write {args[0]}: {e}", file=sys.stderr)
+        sys.exit(1)
+    try:
+        # Flush every block of lines so the file can be followed while
+        # the kernel runs
+        while lines := sys.stdin.readlines(1 << 16):
+            writer.write(lines)
+            writer.checkpoint()
+    finally:
+        writer.close()
+    file_summary(args[0])
+    writer.summary.report()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,6 @@
+"""
+Shared tooling for the Verificarlo examples.
+
+The modules in this package are used by tools/sweep.py and by the
+analysis scripts under examples/.
+"""
@@ -0,0 +1,142 @@
+"""
+Adaptive per-point sample counts for Verificarlo sweeps.
+
+Instead of a fixed number of samples per input point, points are
+sampled in rounds. Every point starts with min_samples; a point whose
+significant-digits estimate is still uncertain has its sample count
+doubled each round, until the confidence interval on the estimate is
+narrower than the target width or max_samples is reached.
+
+Significant digits are computed as in the plotting scripts (see
+stats.py).
+"""
+
+import math
+
+import numpy as np
+
+from .runner import chunked
+from .stats import significant_digits
+from .tabfile import results as sample_results
+
+# Two-sided 95% normal quantile
+Z_95 = 1.959964
+
+
+def digits_halfwidth(count, mean, std):
+    """Half-width of the 95% confidence interval on the significant digits.
+
+    Delta method on s = log10|mean| - log10(std) for normal samples: the
+    relative standard error is 1/sqrt(2(n-1)) for std and cv/sqrt(n) for
+    the mean, where cv = std/|mean|.
+    """
+    count = np.asarray(count, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cv = np.asarray(std, dtype=float) / np.abs(mean)
+        variance = 1.0 / (2.0 * (count - 1)) + cv ** 2 / count
+    return Z_95 * np.sqrt(variance) / np.log(10)
+
+
+class PointStats:
+    """Running count, mean and M2 of the samples of a set of points"""
+
+    def __init__(self, npoints):
+        self.count = np.zeros(npoints, dtype=np.int64)
+        self.mean = np.zeros(npoints)
+        self.m2 = np.zeros(npoints)
+        self.finite = np.ones(npoints, dtype=bool)
+
+    def add(self, point, values):
+        """Merge a batch of samples into one point (Chan et al.)"""
+        if not all(math.isfinite(v) for v in values):
+            self.finite[point] = False
+            return
+        n = len(values)
+        batch_mean = sum(values) / n
+        batch_m2 = sum((v - batch_mean) ** 2 for v in values)
+        total = self.count[point] + n
+        delta = batch_mean - self.mean[point]
+        self.mean[point] += delta * n / total
+        self.m2[point] += batch_m2 + delta ** 2 * self.count[point] * n / total
+        self.count[point] = total
+
+    @property
+    def std(self):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.sqrt(np.where(self.count > 0, self.m2 / self.count, 0.0))
+
+
+def next_samples(stats, target, max_samples, precision_bits):
+    """Samples to draw for each point in the next round (0 once it is settled)"""
+    std = stats.std
+    digits = significant_digits(stats.mean, std, precision_bits)
+    halfwidth = digits_halfwidth(stats.count, stats.mean, std)
+    max_digits = precision_bits * np.log10(2)
+
+    settled = (
+        ~stats.finite
+        | (std < 1e-15)
+        | (stats.mean == 0)
+        | (halfwidth <= target)
+        # Confidently at the precision cap, no sample can change it
+        | (digits - halfwidth >= max_digits)
+        | (stats.count >= max_samples)
+    )
+    more = np.minimum(stats.count, max_samples - stats.count)
+    return np.where(settled, 0, more)
+
+
+def renumber(lines, start):
+    """Number a point's new sample lines on from the start-th sample"""
+    return [f"{start + k + 1} {line.split(' ', 1)[1]}" for k, line in enumerate(lines)]
+
+
+def sample_window(pool, envs, points, settings, chunk_size):
+    """Adaptively sample a window of points under every environment index in envs.
+
+    Yields (env_index, lines) with each point's samples contiguous and
+    numbered from 1, in point order.
+    """
+    samples = {k: [[] for _ in points] for k in envs}
+    stats = {k: PointStats(len(points)) for k in envs}
+    todo = {k: np.full(len(points), settings.min_samples) for k in envs}
+
+    while any(todo[k].any() for k in envs):
+        tasks = []
+        for k in envs:
+            requests = [(point, int(n)) for point, n in enumerate(todo[k]) if n]
+            tasks += [(k, chunk) for chunk in chunked(requests, chunk_size)]
+
+        results = pool.map((k, [(n, points[point]) for point, n in chunk])
+                           for k, chunk in tasks)
+        for (k, chunk), (_, lines) in zip(tasks, results):
+            values = sample_results(lines)
+            position = 0
+            for point, n in chunk:
+                new = lines[position:position + n]
+                stats[k].add(point, values[position:position + n])
+                position += n
+                samples[k][point] += renumber(new, len(samples[k][point]))
+
+        for k in envs:
+            todo[k] = next_samples(stats[k], settings.target, settings.max_samples,
+                                   settings.precision_bits[k])
+
+    for k in envs:
+        yield k, [line for point in samples[k] for line in point]
+
+
+def run_adaptive(pool, nenvs, requests, window, chunk_size, settings, skip=None):
+    """Adaptively sample the points of a sweep, one window of points at a time.
+
+    requests are the sweep's (repeats, inputs) batch requests; only the
+    inputs are used. Yields (env_index, lines, npoints) once per window
+    and environment, in the order the windows come. skip gives, per
+    environment, a number of leading windows already done.
+    """
+    skip = skip or [0] * nenvs
+    inputs = (point for _, point in requests)
+    for number, points in enumerate(chunked(inputs, window)):
+        envs = [k for k in range(nenvs) if number >= skip[k]]
+        for k, lines in sample_window(pool, envs, points, settings, chunk_size):
+            yield k, lines, len(points)
@@ -0,0 +1,155 @@
+"""
+Content-addressed cache of compiled Verificarlo binaries.
+
+A binary is keyed on the verificarlo version, the compiler flags and the
+contents of every file the build reads (sources, extra files, and the
+headers of the -I directories and of the sources' own directories, where
+#include "x.h" looks first), never on paths. The same build requested
+from another examples directory, or by a later run, reuses the cached
+binary instead of recompiling it.
+
+The cache lives in $VFC_CACHE_DIR (default ~/.cache/vfctools/binaries)
+and is kept under $VFC_CACHE_MAX_MB megabytes (default 1024) by evicting
+the least recently used binaries. The values of reference programs (see
+reference.py) are cached the same way in $VFC_REFERENCE_CACHE_DIR
+(default ~/.cache/vfctools/references).
+"""
+
+import functools
+import hashlib
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+DEFAULT_MAX_MB = 1024
+
+
+def cache_dir():
+    """Directory holding the cached binaries"""
+    if os.environ.get('VFC_CACHE_DIR'):
+        return Path(os.environ['VFC_CACHE_DIR'])
+    base = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(base) / 'vfctools' / 'binaries'
+
+
+def reference_cache_dir():
+    """Directory holding the cached reference values"""
+    if os.environ.get('VFC_REFERENCE_CACHE_DIR'):
+        return Path(os.environ['VFC_REFERENCE_CACHE_DIR'])
+    base = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(base) / 'vfctools' / 'references'
+
+
+def max_cache_bytes():
+    return int(os.environ.get('VFC_CACHE_MAX_MB', DEFAULT_MAX_MB)) * 1024 * 1024
+
+
+@functools.lru_cache(maxsize=None)
+def compiler_version(compiler='verificarlo'):
+    """Version banner of the compiler, part of every cache key"""
+    result = subprocess.run([compiler, '--version'], capture_output=True, text=True)
+    return result.stdout + result.stderr
+
+
+def file_digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def _stamped_digest(path, size, mtime_ns):
+    return file_digest(path)
+
+
+def program_digest(path):
+    """file_digest() of a program, hashed once per version of the file"""
+    st = os.stat(path)
+    return _stamped_digest(str(path), st.st_size, st.st_mtime_ns)
+
+
+def _hash_headers(h, directory):
+    for header in sorted(Path(directory).glob('*.h')):
+        h.update(f'\0header {header.name} {file_digest(header)}'.encode())
+
+
+def build_key(args, compiler='verificarlo'):
+    """Hash a compiler argument list (without -o) into a cache key"""
+    h = hashlib.sha256()
+    h.update(compiler_version(compiler).encode())
+    source_dirs = []
+    for arg in args:
+        if arg.startswith('-I') and Path(arg[2:]).is_dir():
+            # Include directories are hashed by the headers they hold
+            _hash_headers(h, arg[2:])
+        elif not arg.startswith('-') and Path(arg).is_file():
+            h.update(f'\0file {Path(arg).name} {file_digest(arg)}'.encode())
+            if arg.endswith('.c') and Path(arg).resolve().parent not in source_dirs:
+                source_dirs.append(Path(arg).resolve().parent)
+        else:
+            h.update(f'\0arg {arg}'.encode())
+    # Quoted includes are looked up next to the source first
+    for directory in source_dirs:
+        h.update(b'\0source directory')
+        _hash_headers(h, directory)
+    return h.hexdigest()
+
+
+def binary_name(args, key):
+    """Readable cache entry name: first source stem plus the key"""
+    sources = [Path(a).stem for a in args if a.endswith('.c')]
+    stem = sources[0] if sources else 'program'
+    return f'{stem}-{key[:24]}'
+
+
+def evict(directory, max_bytes, keep=None):
+    """Delete least recently used entries until the cache fits in max_bytes"""
+    entries = []
+    for path in directory.iterdir():
+        if path.is_file() and not path.name.startswith('.'):
+            st = path.stat()
+            entries.append((st.st_mtime, st.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if path == keep:
+            continue
+        path.unlink(missing_ok=True)
+        total -= size
+
+
+def cached_build(args, compiler='verificarlo', log=None):
+    """Return the path of a binary built from args, compiling it if needed.
+
+    args is the compiler argument list without the -o option. Hits
+    refresh the entry's mtime, which is what eviction orders on. Progress
+    messages and compiler output go to log (default sys.stdout).
+    """
+    log = log or sys.stdout
+    directory = cache_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    binary = directory / binary_name(args, build_key(args, compiler))
+
+    if binary.is_file():
+        os.utime(binary)
+        print(f"Using cached binary: {binary}", file=log)
+        return binary
+
+    # Build under a temporary name so concurrent sweeps never see a
+    # partially written binary
+    fd, tmp = tempfile.mkstemp(prefix='.build-', dir=directory)
+    os.close(fd)
+    try:
+        cmd = [compiler, *args, '-o', tmp]
+        print(f"Compiling with: {' '.join(cmd)}", file=log, flush=True)
+        subprocess.run(cmd, check=True, stdout=log)
+        os.chmod(tmp, 0o755)
+        os.replace(tmp, binary)
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+
+    evict(directory, max_cache_bytes(), keep=binary)
+    return binary
@@ -0,0 +1,129 @@
+"""
+Run manifests for resumable sweeps.
+
+A sweep's chunks are written to each .tab file in order, so its progress
+is a prefix: for every output file the manifest records how many chunks
+are complete and the byte offset just past them. Resuming truncates each
+.tab file back to that offset and re-runs only the chunks after it.
+
+Manifests are stored in the output directory as .sweep-<id>.json, where
+the id is a hash of the options that determine the job list, so a
+resumed run finds its manifest simply by being given the same options.
+They are deleted once a sweep completes.
+"""
+
+import hashlib
+import json
+import os
+import random
+import time
+from pathlib import Path
+
+# Seconds between manifest updates while a sweep is running
+CHECKPOINT_INTERVAL = 5.0
+
+
+def fingerprint(config):
+    """Options that determine the job list and the output files"""
+    return {
+        'program': config.program,
+        'real': config.real,
+        'ninputs': config.ninputs,
+        'pattern': config.pattern,
+        'ranges': {var: list(r) for var, r in config.ranges.items()},
+        'steps': config.steps,
+        'fixed': config.fixed,
+        'iterations': config.iterations,
+        'precisions': config.precisions,
+        'modes': config.modes,
+        'optimization': config.optimization,
+        'extra_files': config.extra_files,
+        'adaptive': config.adaptive,
+        'min_samples': config.min_samples,
+        'max_samples': config.max_samples,
+        'depth': config.depth,
+        'budget': config.budget,
+        'threshold': config.threshold,
+        'objective': config.objective,
+        'reference': config.reference,
+        'population': config.population,
+        'points': config.points,
+        'seed': config.seed,
+        'scramble': config.scramble,
+        'plan': config.plan_file,
+    }
+
+
+def manifest_path(config):
+    digest = hashlib.sha256(json.dumps(fingerprint(config), sort_keys=True).encode())
+    return Path(config.output_dir) / f'.sweep-{digest.hexdigest()[:16]}.json'
+
+
+class Manifest:
+    """Completed chunks and .tab offsets of one sweep"""
+
+    def __init__(self, path, config, outputs, chunk_size, seed=None, workers=None):
+        self.path = Path(path)
+        self.config = fingerprint(config)
+        self.outputs = [str(output_file) for output_file in outputs]
+        self.chunk_size = chunk_size
+        # Worker count the chunks were cut for (see runner.guided_chunks),
+        # kept so that a resumed run with another -j cuts them the same way
+        self.workers = workers
+        self.seed = random.randrange(2**32) if seed is None else seed
+        self.chunks = [0] * len(outputs)
+        self.offsets = [None] * len(outputs)
+        self.saved_at = 0.0
+
+    @classmethod
+    def load(cls, path):
+        """Read a manifest, or return None if there is none"""
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        manifest = cls.__new__(cls)
+        manifest.path = Path(path)
+        manifest.config = data['config']
+        manifest.outputs = data['outputs']
+        manifest.chunk_size = data['chunk_size']
+        manifest.workers = data.get('workers')
+        manifest.seed = data['seed']
+        manifest.chunks = data['chunks']
+        manifest.offsets = data['offsets']
+        manifest.saved_at = 0.0
+        return manifest
+
+    def matches(self, config):
+        """True if the manifest was written by a sweep with these options"""
+        # Round-trip through JSON so tuples and lists compare equal
+        return self.config == json.loads(json.dumps(fingerprint(config)))
+
+    def record(self, index, offset):
+        """Mark one more chunk of output index as written up to offset"""
+        self.chunks[index] += 1
+        self.offsets[index] = offset
+
+    def save(self, force=False):
+        """Write the manifest atomically, at most every CHECKPOINT_INTERVAL"""
+        now = time.monotonic()
+        if not force and now - self.saved_at < CHECKPOINT_INTERVAL:
+            return
+        data = {
+            'config': self.config,
+            'outputs': self.outputs,
+            'chunk_size': self.chunk_size,
+            'workers': self.workers,
+            'seed': self.seed,
+            'chunks': self.chunks,
+            'offsets': self.offsets,
+        }
+        tmp = self.path.with_suffix('.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, self.path)
+        self.saved_at = now
+
+    def remove(self):
+        self.path.unlink(missing_ok=True)
@@ -0,0 +1,202 @@
+"""
+Columnar binary copies of .tab files.
+
+Next to each X.tab, the writers in this package also produce X.npy: a
+NumPy structured array with one record per sample, 'i' as int32 and the
+other columns of the .tab header (x0 ... or x, then result) as float64.
+Loading it is a single read instead of a text parse, and it is about
+half the size of the text.
+
+The .npy header has a fixed size, so the record count can be rewritten
+in place as samples are appended and the file stays loadable (also with
+np.load(mmap_mode='r')) at every checkpoint. A copy is only used while
+it is at least as recent as its .tab file; tools/tab2npy.py builds the
+copies of existing results.
+
+Loaded with mmap=True, the samples are memory-mapped rather than read,
+and the helpers below scan them in blocks: as the sweep writes the
+samples of each point one after the other, point_runs() finds the
+[start, stop) range of every point, and the statistics are computed on
+slices of the mapped file without copying the samples.
+"""
+
+import os
+import struct
+from pathlib import Path
+
+import numpy as np
+
+HEADER_BYTES = 256
+
+# Records buffered by ColumnarWriter between writes
+BLOCK = 1 << 14
+
+# Rows compared at a time by point_runs() and varies()
+SCAN_BLOCK = 1 << 20
+
+
+def columnar_path(tab_path):
+    """Path of the columnar copy of a .tab file"""
+    return Path(tab_path).with_suffix('.npy')
+
+
+def columnar_dtype(names):
+    """Record type of a .tab file with the given column names"""
+    return np.dtype([(name, '<i4' if name == 'i' else '<f8') for name in names])
+
+
+def _header(dtype, count):
+    fields = {'descr': np.lib.format.dtype_to_descr(dtype), 'fortran_order': False,
+              'shape': (count,)}
+    text = repr(fields).encode('latin1')
+    if len(text) > HEADER_BYTES - 11:
+        raise ValueError(f"Too many columns for a columnar file: {', '.join(dtype.names)}")
+    return (np.lib.format.MAGIC_PREFIX + struct.pack('<BBH', 1, 0, HEADER_BYTES - 10)
+            + text.ljust(HEADER_BYTES - 11) + b'\n')
+
+
+def _number(text, kind):
+    try:
+        return kind(text)
+    except ValueError:
+        return np.nan if kind is float else 0
+
+
+class ColumnarWriter:
+    """Appends the records of .tab lines to a new columnar file"""
+
+    def __init__(self, path, names):
+        self.path = Path(path)
+        self.dtype = columnar_dtype(names)
+        self.ninputs = len(names) - 2
+        self.count = 0
+        self.records = []
+        self.file = open(self.path, 'wb')
+        self.file.write(_header(self.dtype, 0))
+
+    def add(self, line, value=None):
+        """Add the sample of a .tab line, whose result is value if known.
+
+        Blank and comment lines are skipped, as readers of the text skip
+        them. Any other line with the wrong number of fields still gets a
+        record, with NaN inputs and result, so that the copy keeps one
+        record per sample line.
+        """
+        fields = line.split()
+        if not fields or fields[0].startswith('#'):
+            return
+        if len(fields) != self.ninputs + 2:
+            self.records.append((_number(fields[0], int), *[np.nan] * self.ninputs, np.nan))
+        else:
+            if value is None:
+                value = _number(fields[-1], float)
+            self.records.append((_number(fields[0], int),
+                                 *[_number(x, float) for x in fields[1:-1]], value))
+        if len(self.records) >= BLOCK:
+            self._write()
+
+    def _write(self):
+        if self.records:
+            self.file.write(np.array(self.records, dtype=self.dtype).tobytes())
+            self.count += len(self.records)
+            self.records = []
+
+    def flush(self):
+        """Write buffered records and update the record count"""
+        self._write()
+        self.file.seek(0)
+        self.file.write(_header(self.dtype, self.count))
+        self.file.seek(0, 2)
+        self.file.flush()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+def convert(tab_path):
+    """Write the columnar copy of an existing .tab file.
+
+    Returns the number of records written.
+    """
+    writer = None
+    with open(tab_path) as f:
+        for line in f:
+            if writer is not None:
+                writer.add(line)
+            elif not line.startswith('#'):
+                # The header is the first line that is not a comment
+                writer = ColumnarWriter(columnar_path(tab_path), line.split())
+    if writer is None:
+        raise ValueError(f"{tab_path} has no header line")
+    writer.close()
+    return writer.count
+
+
+def is_fresh(tab_path):
+    """True if the .tab file has a columnar copy at least as recent as it"""
+    try:
+        return (os.stat(columnar_path(tab_path)).st_mtime_ns
+                >= os.stat(tab_path).st_mtime_ns)
+    except FileNotFoundError:
+        return False
+
+
+def load(tab_path, names=None, mmap=False):
+    """Samples of a .tab file from its columnar copy.
+
+    Returns a structured array, with its fields renamed to names if
+    given, or None if the file has no up to date columnar copy. With
+    mmap set the array is a read-only memory map of the file.
+    """
+    if not is_fresh(tab_path):
+        return None
+    data = np.load(columnar_path(tab_path), mmap_mode='r' if mmap else None)
+    return data if names is None else rename(data, names)
+
+
+def varies(data, name):
+    """True if field name of data takes more than one value"""
+    column = data[name]
+    if len(column) == 0:
+        return False
+    first = column[0]
+    return any(np.any(column[start:start + SCAN_BLOCK] != first)
+               for start in range(0, len(column), SCAN_BLOCK))
+
+
+def point_runs(data, fields):
+    """[start, stop) rows of each point, if each point's rows are contiguous.
+
+    A point is a combination of the values of fields. Returns the start
+    and stop arrays of the runs of rows holding the same point, in file
+    order, or None if some point has more than one run (e.g. after an
+    adaptive sweep added samples to it). Only one block of rows and
+    the runs are held in memory at a time.
+    """
+    n = len(data)
+    starts = [np.zeros(1 if n else 0, dtype=np.int64)]
+    for start in range(1, n, SCAN_BLOCK):
+        stop = min(start + SCAN_BLOCK, n)
+        changed = np.zeros(stop - start, dtype=bool)
+        for name in fields:
+            column = data[name]
+            changed |= column[start:stop] != column[start - 1:stop - 1]
+        starts.append(start + np.flatnonzero(changed))
+    starts = np.concatenate(starts)
+    stops = np.append(starts[1:], n)
+
+    keys = np.empty(len(starts), dtype=[(name, data.dtype[name]) for name in fields])
+    for name in fields:
+        keys[name] = data[name][starts]
+    if len(np.unique(keys)) != len(keys):
+        return None
+    return starts, stops
+
+
+def rename(data, names):
+    """View of a columnar array with its fields renamed to names, in order"""
+    if len(names) != len(data.dtype.names):
+        raise ValueError(f"Columns {' '.join(data.dtype.names)} do not match "
+                         f"{' '.join(names)}")
+    return data.view(np.dtype([(name, data.dtype[k]) for k, name in enumerate(names)]))
@@ -0,0 +1,170 @@
+"""
+In-process high-precision references for the example kernels.
+
+Each entry of REFERENCES evaluates the formula of an example kernel on
+an (n, ninputs) array of inputs and returns the float64 array of its
+values, correctly rounded from a much more precise result:
+
+  harmonic     2 x0 x1 / (x0 + x1)              exact rational arithmetic
+  softmax_y0   e^x0 / (e^x0 + e^x1 + e^x2)      decimal, PRECISION digits
+  gelu_exp     x / (1 + e^(-2c (x + 0.044715 x^3)))
+  gelu_tanh    x/2 (1 + tanh(c (x + 0.044715 x^3))), the same function
+  sqrt_diff    sqrt(x + 1) - sqrt(x) = 1 / (sqrt(x) + sqrt(x + 1))
+  tree_sumN    2^N copies of x summed pairwise (parallel_sumN), 2^N x
+
+with c = 0.7978845608028654 as written in the kernels' sources. The
+inputs are the doubles the kernels receive; rows with a non-finite input
+and points outside a formula's domain get nan.
+
+evaluate() splits large arrays over a pool of processes, and
+ExactReference has the interface of reference.ReferenceProgram, so the
+ULP tools can use either without starting any process per point.
+"""
+
+import decimal
+from concurrent.futures import ProcessPoolExecutor
+from fractions import Fraction
+
+import numpy as np
+
+# Significant decimal digits of the intermediate results
+PRECISION = 50
+
+# Rows below which evaluate() does not start a process pool
+POOL_ROWS = 1 << 12
+
+_CONTEXT = decimal.Context(prec=PRECISION, Emax=decimal.MAX_EMAX, Emin=decimal.MIN_EMIN)
+_C = decimal.Decimal('0.7978845608028654')
+_GELU_CUBIC = decimal.Decimal('0.044715')
+
+
+def _rowwise(ninputs):
+    """Turn a function of one row of Decimal inputs into a vectorized one"""
+    def decorate(function):
+        def vectorized(x):
+            out = np.full(len(x), np.nan)
+            finite = np.isfinite(x).all(axis=1)
+            rows = np.flatnonzero(finite)
+            with decimal.localcontext(_CONTEXT):
+                for k, row in zip(rows.tolist(), x[rows].tolist()):
+                    try:
+                        out[k] = float(function(*map(decimal.Decimal, row)))
+                    except (ArithmeticError, ValueError):
+                        pass
+            return out
+        vectorized.ninputs = ninputs
+        vectorized.__doc__ = function.__doc__
+        return vectorized
+    return decorate
+
+
+def harmonic(x):
+    """2 x0 x1 / (x0 + x1) of each row, rounded once"""
+    out = np.full(len(x), np.nan)
+    for k, (x0, x1) in enumerate(x.tolist()):
+        if np.isfinite(x0) and np.isfinite(x1) and x0 + x1 != 0:
+            out[k] = float(2 * Fraction(x0) * Fraction(x1) / (Fraction(x0) + Fraction(x1)))
+    return out
+
+
+harmonic.ninputs = 2
+
+
+@_rowwise(3)
+def softmax_y0(x0, x1, x2):
+    """First output of the softmax of (x0, x1, x2)"""
+    # Shifting by the largest input changes nothing mathematically and
+    # keeps the exponentials in range
+    top = max(x0, x1, x2)
+    e0, e1, e2 = (x - top for x in (x0, x1, x2))
+    e0, e1, e2 = e0.exp(), e1.exp(), e2.exp()
+    return e0 / (e0 + e1 + e2)
+
+
+@_rowwise(1)
+def gelu_exp(x):
+    """GELU in its logistic form"""
+    return x / (1 + (-2 * _C * (x + _GELU_CUBIC * x * x * x)).exp())
+
+
+# 1 + tanh(u) = 2 / (1 + e^-2u), so both GELU kernels compute the same
+# function
+gelu_tanh = gelu_exp
+
+
+@_rowwise(1)
+def sqrt_diff(x):
+    """sqrt(x + 1) - sqrt(x), without its cancellation"""
+    if x < 0:
+        raise ValueError("sqrt of a negative input")
+    return 1 / (x.sqrt() + (x + 1).sqrt())
+
+
+def _tree_sum(levels):
+    def tree_sum(x):
+        # The sum of 2^levels copies of x is exact in binary, barring
+        # overflow, which rounds to inf as the exact value does
+        with np.errstate(over='ignore'):
+            return np.ldexp(x[:, 0], levels)
+    tree_sum.ninputs = 1
+    tree_sum.__doc__ = f"Sum of {2 ** levels} copies of x"
+    return tree_sum
+
+
+REFERENCES = {
+    'harmonic': harmonic,
+    'softmax_y0': softmax_y0,
+    'gelu_exp': gelu_exp,
+    'gelu_tanh': gelu_tanh,
+    'sqrt_diff': sqrt_diff,
+    **{f'tree_sum{levels}': _tree_sum(levels) for levels in range(1, 6)},
+}
+
+
+def _evaluate(name, x):
+    return REFERENCES[name](x)
+
+
+def evaluate(name, x, workers=1):
+    """Values of reference name at the rows of x, in workers processes.
+
+    x is an (n, ninputs) array, or (n,) for one input. The rows are
+    split evenly over a pool of workers processes if workers > 1 and
+    there are more than POOL_ROWS of them.
+    """
+    function = REFERENCES[name]
+    x = np.asarray(x, dtype=np.float64)
+    if x.ndim == 1:
+        x = x[:, None]
+    if x.ndim != 2 or x.shape[1] != function.ninputs:
+        raise ValueError(f"{name} takes {function.ninputs} inputs per point")
+    if workers <= 1 or len(x) <= POOL_ROWS:
+        return function(x)
+    shares = np.array_split(x, workers)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return np.concatenate(list(executor.map(_evaluate, [name] * len(shares), shares)))
+
+
+class ExactReference:
+    """Reference values of REFERENCES[name], computed once per distinct point"""
+
+    def __init__(self, name, workers=1):
+        if name not in REFERENCES:
+            raise ValueError(f"Unknown reference '{name}'. "
+                             f"Choose between [{' | '.join(REFERENCES)}]")
+        self.name = name
+        self.workers = max(1, workers)
+        self.values = {}
+
+    def __call__(self, points):
+        """Reference values of a list of points (tuples of inputs).
+
+        Returns an array aligned to points; inputs may be floats or
+        their string forms, as for ReferenceProgram.
+        """
+        points = [tuple(p) for p in points]
+        todo = [p for p in dict.fromkeys(points) if p not in self.values]
+        if todo:
+            x = np.array(todo, dtype=np.float64)
+            self.values.update(zip(todo, evaluate(self.name, x, self.workers).tolist()))
+        return np.array([self.values[p] for p in points], dtype=np.float64)
@@ -0,0 +1,69 @@
+"""
+Test case generation for Verificarlo sweeps.
+
+A sweep is a sequence of batch requests ``(repeats, inputs)`` where
+``inputs`` is a tuple of formatted input strings. This is the stdin
+protocol of tools/vfc_driver.h: each request is sampled ``repeats`` times.
+The requests are described compactly by a vfctools.plan.JobPlan.
+"""
+
+from .plan import JobPlan
+
+VARIABLES = ('x0', 'x1', 'x2')
+PATTERNS = ('grid', 'diagonal', 'random', 'fixed', 'adaptive', 'sobol', 'halton', 'search')
+
+
+def parse_assignments(text):
+    """Parse 'x0=a,x1=b' into {'x0': 'a', 'x1': 'b'}"""
+    values = {}
+    if not text:
+        return values
+    for pair in text.split(','):
+        var, value = pair.strip().split('=', 1)
+        values[var.strip()] = value.strip()
+    return values
+
+
+def parse_range(text):
+    """Parse 'start:end' into a (start, end) pair of floats"""
+    start, end = text.split(':', 1)
+    return float(start), float(end)
+
+
+def format_value(x):
+    """Format an input value the way the runners always have"""
+    return f'{x:.6f}'
+
+
+def input_variables(config):
+    """Return the names of the inputs taken by the program"""
+    return VARIABLES[:config.ninputs]
+
+
+def job_plan(config):
+    """The sweep's JobPlan, built from the options unless config.plan is set"""
+    if getattr(config, 'plan', None) is None:
+        config.plan = JobPlan.from_config(config)
+    return config.plan
+
+
+def generate_requests(config, block=4096):
+    """Yield (repeats, inputs) batch requests for the configured pattern.
+
+    For the adaptive pattern these are the coarse grid it starts from;
+    the refinement itself is done by vfctools.refine.
+    """
+    sweep_plan = job_plan(config)
+    for start in range(0, len(sweep_plan), block):
+        yield from sweep_plan.requests(start, start + block, format_value)
+
+
+def count_requests(config):
+    """Number of batch requests generate_requests() will produce"""
+    return len(job_plan(config))
+
+
+def count_tests(config):
+    """Total number of kernel evaluations in the sweep"""
+    sweep_plan = job_plan(config)
+    return len(sweep_plan) * sweep_plan.repeats
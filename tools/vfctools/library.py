@@ -0,0 +1,124 @@
+"""
+In-process execution of kernels compiled as shared libraries.
+
+With -E library the kernel is compiled by verificarlo into a shared
+object (-shared -fPIC) rather than an executable, and called through
+ctypes on NumPy arrays of inputs: vfc_driver.h exports
+vfc_driver_eval(), which evaluates every row of an input array a given
+number of times and writes the results to an output array. No kernel
+process is fed text through a pipe; the results come back as a float64
+array that the stats code uses directly.
+
+The MCA backend reads VFC_BACKENDS when the library is loaded, so each
+backend configuration gets worker processes of its own, which load the
+library with that configuration's environment.
+"""
+
+import ctypes
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from . import cache
+from .runner import KernelPool, compile_args, format_samples
+
+LONG = np.dtype(ctypes.c_long)
+
+
+def compile_library(config):
+    """Return the cached shared library of the program, compiling it if needed"""
+    return cache.cached_build(compile_args(config) + ['-shared', '-fPIC'])
+
+
+class KernelLibrary:
+    """A kernel shared library loaded in the current process"""
+
+    def __init__(self, path):
+        self.lib = ctypes.CDLL(str(path))
+        self.lib.vfc_driver_ninputs.restype = ctypes.c_int
+        self.lib.vfc_driver_eval.restype = ctypes.c_long
+        self.lib.vfc_driver_eval.argtypes = [
+            np.ctypeslib.ndpointer(np.float64, flags='C_CONTIGUOUS'),
+            np.ctypeslib.ndpointer(LONG, flags='C_CONTIGUOUS'),
+            ctypes.c_long,
+            np.ctypeslib.ndpointer(np.float64, flags='C_CONTIGUOUS'),
+        ]
+        self.ninputs = self.lib.vfc_driver_ninputs()
+
+    def evaluate(self, x, repeats):
+        """Evaluate each row of x repeats[k] times.
+
+        x is an (n, ninputs) array, or (n, m) with m > ninputs, in which
+        case only the first ninputs columns are read as in --batch mode.
+        Returns the results of every row one after the other.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        if x.ndim != 2 or x.shape[1] < self.ninputs:
+            raise ValueError(f"Expected {self.ninputs} inputs per point")
+        x = np.ascontiguousarray(x[:, :self.ninputs])
+        repeats = np.ascontiguousarray(repeats, dtype=LONG)
+        out = np.empty(int(repeats.sum()))
+        self.lib.vfc_driver_eval(x, repeats, len(repeats), out)
+        return out
+
+
+# Library of a worker process, loaded by _load_library()
+_library = None
+
+
+def _load_library(path, env):
+    global _library
+    os.environ.clear()
+    os.environ.update(env)
+    _library = KernelLibrary(path)
+
+
+def _evaluate(x, repeats):
+    return _library.evaluate(x, repeats)
+
+
+class LibraryPool(KernelPool):
+    """KernelPool running the kernel in process from its shared library.
+
+    Worker threads turn each chunk into NumPy arrays and hand it to a
+    process of the chunk's configuration, which calls the library and
+    sends back the results as an array. Every configuration has its own
+    set of worker processes, so its VFC_BACKENDS is in effect when the
+    library is loaded. The workers processes are divided between the
+    configurations; with more configurations than workers each still
+    gets one, but no more than workers of them are busy at a time, as
+    that many threads hand out the chunks.
+    """
+
+    def __init__(self, library, envs, workers, materialize=None, usage=None):
+        super().__init__(library, envs, workers, materialize, usage)
+        context = multiprocessing.get_context('spawn')
+        shares = [workers // len(envs) + (k < workers % len(envs)) for k in range(len(envs))]
+        self.libraries = [ProcessPoolExecutor(max_workers=max(share, 1), mp_context=context,
+                                              initializer=_load_library,
+                                              initargs=(str(library), env))
+                          for share, env in zip(shares, envs)]
+
+    def _run(self, index, requests):
+        try:
+            x = np.array([[float(v) for v in inputs] for _, inputs in requests])
+        except ValueError as e:
+            raise RuntimeError(f"Invalid kernel input: {e}") from e
+        repeats = [n for n, _ in requests]
+        try:
+            values = self.libraries[index].submit(_evaluate, x, repeats).result()
+        except ValueError as e:
+            raise RuntimeError(f"Cannot run {self.binary}: {e}") from e
+        except BrokenProcessPool as e:
+            # The library failed to load, or the kernel killed its worker
+            # process (e.g. by calling exit())
+            raise RuntimeError(f"{self.binary} failed in a worker process: {e}") from e
+        return format_samples(requests, values)
+
+    def close(self):
+        super().close()
+        for executor in self.libraries:
+            executor.shutdown(wait=True)
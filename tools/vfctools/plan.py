@@ -0,0 +1,222 @@
+"""
+Compact job plans.
+
+A job plan describes a sweep's input points without listing them: one
+descriptor per input (an axis of evenly stepped values or a fixed
+value), the test
+pattern, the samples per point and, for the random/sobol/halton
+patterns, the point count and seed. Any index range of points can be
+materialized on its own with vectorized NumPy code, so a plan takes
+O(1) memory however large the sweep is, and workers pull index ranges
+rather than lines of text.
+
+Plans are saved as JSON. A plan can instead hold explicit points in a
+.npy array of shape (npoints, ninputs) next to it, which is
+memory-mapped and sliced the same way.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+from . import qmc
+
+PLAN_VERSION = 2
+
+# Random points are drawn in fixed blocks, each from its own seeded
+# generator, so that any range can be drawn without the ones before it
+RANDOM_BLOCK = 4096
+
+
+def axis_count(start, end, step):
+    """Number of values of an axis, as len(np.arange(start, end + step / 2, step)).
+
+    Axes keep the points of the bash runners: start, start + step, ...
+    up to end, which is included when step divides end - start, the
+    last value being otherwise the nearest to end.
+    """
+    return max(int(np.ceil((end + step / 2 - start) / step)), 0)
+
+
+class JobPlan:
+    """Index-addressable list of a sweep's (repeats, inputs) requests"""
+
+    def __init__(self, pattern, variables, iterations, points=None, seed=None,
+                 scramble=True, explicit=None):
+        self.pattern = pattern
+        self.variables = variables
+        self.iterations = iterations
+        self.points = points
+        self.seed = seed
+        self.scramble = scramble
+        self.explicit = explicit
+
+    @classmethod
+    def from_config(cls, config, seed=None):
+        """Build the plan of a sweep configuration (see tools/sweep.py).
+
+        seed, if given, overrides config.seed.
+        """
+        variables = []
+        for k in range(config.ninputs):
+            var = f'x{k}'
+            if config.pattern == 'diagonal' and k > 0:
+                # Every input takes the values of x0
+                variables.append(dict(variables[0], name=var))
+                continue
+            if var in config.fixed:
+                variables.append({'name': var, 'fixed': config.fixed[var]})
+                continue
+            start, end = config.ranges[var]
+            step = config.steps[var]
+            if step <= 0:
+                raise ValueError(f"Step for variable {var} must be positive, got {step}")
+            variables.append({'name': var, 'start': start, 'end': end, 'step': step,
+                              'count': axis_count(start, end, step)})
+
+        points = None
+        if config.pattern == 'random':
+            points = config.iterations
+        elif config.pattern in qmc.GENERATORS:
+            points = config.points
+        seed = config.seed if seed is None else seed
+        if seed is None and points is not None:
+            seed = int(np.random.default_rng().integers(2**32))
+        return cls(config.pattern, variables, config.iterations, points=points,
+                   seed=seed, scramble=config.scramble)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            data = json.load(f)
+        if data.get('version') != PLAN_VERSION:
+            raise ValueError(f"Unsupported job plan version in {path}")
+        explicit = None
+        if data.get('explicit'):
+            explicit = np.load(Path(path).parent / data['explicit'], mmap_mode='r')
+        return cls(data['pattern'], data['variables'], data['iterations'],
+                   points=data.get('points'), seed=data.get('seed'),
+                   scramble=data.get('scramble', True), explicit=explicit)
+
+    def save(self, path, explicit_file=None):
+        """Write the plan as JSON; explicit points go to explicit_file (.npy)"""
+        data = {
+            'version': PLAN_VERSION,
+            'pattern': self.pattern,
+            'variables': self.variables,
+            'iterations': self.iterations,
+            'points': self.points,
+            'seed': self.seed,
+            'scramble': self.scramble,
+        }
+        if self.explicit is not None:
+            explicit_file = Path(explicit_file or Path(path).with_suffix('.npy'))
+            np.save(explicit_file, np.asarray(self.explicit, dtype=np.float64))
+            data['explicit'] = explicit_file.name
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+
+    @property
+    def ninputs(self):
+        return len(self.variables)
+
+    def varying(self):
+        return [v for v in self.variables if 'fixed' not in v]
+
+    def __len__(self):
+        if self.explicit is not None:
+            return len(self.explicit)
+        if self.points is not None:
+            return self.points
+        if self.pattern == 'diagonal':
+            return self.variables[0].get('count', 1)
+        total = 1
+        for v in self.variables:
+            total *= v.get('count', 1)
+        return total
+
+    @property
+    def repeats(self):
+        """Samples per point (random points are sampled once each)"""
+        return 1 if self.pattern == 'random' else self.iterations
+
+    def _axis(self, v):
+        return np.arange(v['start'], v['end'] + v['step'] / 2, v['step'])[:v['count']]
+
+    def _random(self, start, stop, bounds):
+        first, last = start // RANDOM_BLOCK, (stop - 1) // RANDOM_BLOCK
+        blocks = [np.random.default_rng([self.seed, b]).random((RANDOM_BLOCK, len(bounds)))
+                  for b in range(first, last + 1)]
+        unit = np.concatenate(blocks)[start - first * RANDOM_BLOCK:stop - first * RANDOM_BLOCK]
+        low = np.array([b[0] for b in bounds])
+        high = np.array([b[1] for b in bounds])
+        return low + unit * (high - low)
+
+    def values(self, start, stop):
+        """Float inputs of points [start, stop) as an (n, ninputs) array"""
+        stop = min(stop, len(self))
+        n = max(stop - start, 0)
+        out = np.zeros((n, self.ninputs))
+        if n == 0:
+            return out
+        if self.explicit is not None:
+            return np.array(self.explicit[start:stop], dtype=np.float64)
+
+        index = np.arange(start, stop)
+        if self.pattern == 'diagonal':
+            first = self.variables[0]
+            column = (np.full(n, float(first['fixed'])) if 'fixed' in first
+                      else self._axis(first)[index])
+            out[:] = column[:, None]
+            return out
+
+        varying = self.varying()
+        columns = {}
+        if self.pattern == 'random' or self.pattern in qmc.GENERATORS:
+            bounds = [(v['start'], v['end']) for v in varying]
+            if self.pattern == 'random':
+                sampled = self._random(start, stop, bounds)
+            else:
+                sampled = qmc.sample_inputs(self.pattern, n, bounds, scramble=self.scramble,
+                                            seed=self.seed, start=start)
+            columns = {v['name']: sampled[:, k] for k, v in enumerate(varying)}
+        else:
+            # Mixed-radix decomposition, last input varying fastest as
+            # in itertools.product
+            remaining = index
+            for v in reversed(varying):
+                columns[v['name']] = self._axis(v)[remaining % v['count']]
+                remaining = remaining // v['count']
+
+        for k, v in enumerate(self.variables):
+            out[:, k] = float(v['fixed']) if 'fixed' in v else columns[v['name']]
+        return out
+
+    def requests(self, start, stop, format_value):
+        """(repeats, inputs) requests of points [start, stop).
+
+        Varying inputs are formatted with format_value; fixed inputs are
+        passed through as given.
+        """
+        values = self.values(start, stop)
+        if self.explicit is not None:
+            fixed = [None] * self.ninputs
+        elif self.pattern == 'diagonal':
+            fixed = [self.variables[0].get('fixed')] * self.ninputs
+        else:
+            fixed = [v.get('fixed') for v in self.variables]
+        repeats = self.repeats
+        return [(repeats, tuple(f if f is not None else format_value(x)
+                                for f, x in zip(fixed, row)))
+                for row in values.tolist()]
+
+    def describe(self):
+        """Short description of the plan for configuration printouts"""
+        axes = []
+        for v in self.variables:
+            if 'fixed' in v:
+                axes.append(f"{v['name']}={v['fixed']}")
+            else:
+                axes.append(f"{v['name']}=[{v['start']}, {v['end']}]x{v.get('count', '')}")
+        return f"{self.pattern}, {len(self)} points, " + ', '.join(axes)
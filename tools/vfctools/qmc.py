@@ -0,0 +1,133 @@
+"""
+Low-discrepancy (quasi-random) point sets for the sobol and halton
+test patterns.
+
+Both generators are vectorized with NumPy and return an (n, dims) array
+of points in [0, 1). With scrambling (the default) the points are
+randomized from a seed while keeping their low discrepancy: Sobol
+points get a random linear matrix scramble plus a digital shift, Halton
+points a random permutation of the digits at every position.
+
+Points are computed directly from their index, so any index range of a
+seeded sequence can be generated on its own (start=...). Sobol balance
+properties hold for n a power of two.
+
+The unscrambled sequences are ordered differently from
+scipy.stats.qmc. Sobol points are in natural index order, not scipy's
+Gray-code order, so the first 2^k points are the same set as scipy's but
+permuted. Halton points start at index 1, skipping the origin, so point
+k is scipy's point k + 1.
+"""
+
+import numpy as np
+
+# Sobol direction numbers (Joe & Kuo, new-joe-kuo-6.21201) for dimensions
+# 2 and 3 as (degree s, coefficients a, initial m values); dimension 1 is
+# the van der Corput sequence
+SOBOL_PARAMETERS = [(1, 0, [1]), (2, 1, [1, 3])]
+HALTON_BASES = [2, 3, 5]
+BITS = 32
+
+
+def _direction_numbers(dims):
+    """Direction numbers V[d, j] as BITS-bit integers"""
+    v = np.zeros((dims, BITS), dtype=np.uint64)
+    v[0] = [1 << (BITS - 1 - j) for j in range(BITS)]
+    for d in range(1, dims):
+        s, a, m = SOBOL_PARAMETERS[d - 1]
+        m = list(m)
+        for j in range(s, BITS):
+            value = m[j - s] ^ (m[j - s] << s)
+            for k in range(1, s):
+                if (a >> (s - 1 - k)) & 1:
+                    value ^= m[j - k] << k
+            m.append(value)
+        v[d] = [m[j] << (BITS - 1 - j) for j in range(BITS)]
+    return v
+
+
+def _scramble_directions(v, rng):
+    """Random linear matrix scramble of the direction numbers"""
+    dims = v.shape[0]
+    scrambled = np.zeros_like(v)
+    for d in range(dims):
+        # Lower triangular binary matrix with a unit diagonal; row k acts
+        # on the k-th most significant bit
+        lower = np.tril(rng.integers(0, 2, size=(BITS, BITS), dtype=np.uint64), -1)
+        lower += np.eye(BITS, dtype=np.uint64)
+        for j in range(BITS):
+            bits = (v[d, j] >> np.arange(BITS - 1, -1, -1, dtype=np.uint64)) & np.uint64(1)
+            out = (lower @ bits) % 2
+            scrambled[d, j] = np.sum(out << np.arange(BITS - 1, -1, -1, dtype=np.uint64))
+    return scrambled
+
+
+def sobol(n, dims, scramble=True, seed=None, start=0):
+    """n points of the (optionally scrambled) Sobol sequence from index start.
+
+    Point k is the XOR of the direction numbers of the bits of k itself
+    (natural order, not Gray-code order).
+    """
+    if not 1 <= dims <= len(SOBOL_PARAMETERS) + 1:
+        raise ValueError(f"Sobol points are available for 1 to "
+                         f"{len(SOBOL_PARAMETERS) + 1} dimensions")
+    rng = np.random.default_rng(seed)
+    v = _direction_numbers(dims)
+    if scramble:
+        v = _scramble_directions(v, rng)
+
+    index = np.arange(start, start + n, dtype=np.uint64)
+    x = np.zeros((n, dims), dtype=np.uint64)
+    # Only the bits that occur in the indices contribute
+    for j in range(max(start + n - 1, 1).bit_length()):
+        bit = (index >> np.uint64(j)) & np.uint64(1)
+        x ^= bit[:, None] * v[:, j]
+    if scramble:
+        x ^= rng.integers(0, 2**BITS, size=dims, dtype=np.uint64)
+    return x.astype(np.float64) / 2.0**BITS
+
+
+def halton(n, dims, scramble=True, seed=None, start=0):
+    """n points of the (optionally scrambled) Halton sequence from index start.
+
+    Point k is the radical inverse of k + 1, so the sequence starts at
+    (1/2, 1/3, 1/5) rather than at the origin.
+    """
+    if not 1 <= dims <= len(HALTON_BASES):
+        raise ValueError(f"Halton points are available for 1 to {len(HALTON_BASES)} dimensions")
+    rng = np.random.default_rng(seed)
+    # Start at 1: index 0 is the origin in every base
+    index = np.arange(start + 1, start + n + 1, dtype=np.int64)
+    points = np.zeros((n, dims))
+    for d, base in enumerate(HALTON_BASES[:dims]):
+        # Enough digits to reach double precision
+        ndigits = int(np.ceil(53 / np.log2(base)))
+        remaining = index.copy()
+        scale = 1.0 / base
+        for _ in range(ndigits):
+            permutation = rng.permutation(base) if scramble else np.arange(base)
+            if remaining.any():
+                points[:, d] += permutation[remaining % base] * scale
+                remaining //= base
+            else:
+                # Past the last digit of every index, all digits are 0
+                points[:, d] += permutation[0] * scale
+            scale /= base
+    return points
+
+
+GENERATORS = {'sobol': sobol, 'halton': halton}
+
+
+def sample_inputs(pattern, n, bounds, scramble=True, seed=None, start=0):
+    """n points of a low-discrepancy pattern mapped onto the given bounds.
+
+    bounds is a list of (start, end) pairs, one per varying input.
+    Returns an (n, len(bounds)) array.
+    """
+    if not bounds:
+        return np.zeros((n, 0))
+    unit = GENERATORS[pattern](n, len(bounds), scramble=scramble, seed=seed, start=start)
+    start = np.array([b[0] for b in bounds])
+    end = np.array([b[1] for b in bounds])
+    return start + unit * (end - start)
@@ -0,0 +1,185 @@
+"""
+Exact values from reference programs, for ULP errors.
+
+A reference program (like examples/softmax/softmax_ref2) reads the
+inputs of one point per line on stdin and prints the exact value of the
+kernel at each point, one per line, until the end of its input. All the
+points of an analysis are sent to a single process, or to one process
+per worker over contiguous shares of the points, instead of starting a
+process per point.
+
+Programs that stop after their first line (the one-shot references this
+protocol extends) are detected and run once per point, as before.
+
+Values are also kept on disk, so that every analysis of the same inputs
+with the same program (another precision's .tab file, a rerun of a ULP
+script, a later search) only runs the program on points it has not seen.
+Each program has a file of its own in cache.reference_cache_dir(), named
+after the hash of the binary, holding its values sorted by the bits of
+their inputs.
+
+reference_for() also accepts the name of an in-process reference of
+exact.py, which needs no program at all.
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from . import cache, exact
+
+
+def _line(point):
+    return ' '.join(map(str, point)) + '\n'
+
+
+def _bits(x):
+    return np.ascontiguousarray(x, dtype=np.float64).view(np.uint64)
+
+
+def _keys(bits):
+    """Rows of input bits as comparable fixed-size byte strings"""
+    bits = np.ascontiguousarray(bits)
+    return bits.view(f'V{8 * bits.shape[1]}').ravel()
+
+
+class ReferenceStore:
+    """Values of a reference program at points of ninputs inputs, on disk"""
+
+    def __init__(self, program, ninputs):
+        program = shutil.which(program) or program
+        digest = cache.program_digest(program)
+        self.directory = cache.reference_cache_dir()
+        self.path = self.directory / f'{Path(program).name}-{digest[:24]}-{ninputs}.npy'
+        self.ninputs = ninputs
+        self.dtype = np.dtype([('x', '<u8', (ninputs,)), ('value', '<f8')])
+
+    def _load(self):
+        try:
+            records = np.load(self.path)
+        except (OSError, ValueError):
+            return np.empty(0, dtype=self.dtype)
+        return records if records.dtype == self.dtype else np.empty(0, dtype=self.dtype)
+
+    def lookup(self, x):
+        """Cached values of the rows of x, nan where missing, and a found mask"""
+        records = self._load()
+        values = np.full(len(x), np.nan)
+        if not len(records) or not len(x):
+            return values, np.zeros(len(x), dtype=bool)
+        keys = _keys(records['x'])
+        wanted = _keys(_bits(x))
+        index = np.minimum(np.searchsorted(keys, wanted), len(keys) - 1)
+        found = keys[index] == wanted
+        values[found] = records['value'][index[found]]
+        os.utime(self.path)
+        return values, found
+
+    def add(self, x, values):
+        """Store the values of the rows of x, with those already stored"""
+        new = np.empty(len(x), dtype=self.dtype)
+        new['x'] = _bits(x)
+        new['value'] = values
+        # Entries written by other analyses since the lookup are kept
+        records = np.concatenate([self._load(), new])
+        _, first = np.unique(_keys(records['x']), return_index=True)
+        records = records[first]
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix='.references-', dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, records)
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, self.path)
+        finally:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+        cache.evict(self.directory, cache.max_cache_bytes(), keep=self.path)
+
+
+class ReferenceProgram:
+    """Reference values of a program, computed once per distinct point.
+
+    With persistent set, values are looked up in and added to the
+    program's ReferenceStore.
+    """
+
+    def __init__(self, path, workers=1, persistent=True):
+        self.path = str(path)
+        self.workers = max(1, workers)
+        self.persistent = persistent
+        self.values = {}
+
+    def _failed(self, points, e):
+        detail = _line(points[0]).strip() if len(points) == 1 else f"{len(points)} points"
+        return RuntimeError(f"Reference program {self.path} failed on {detail}: {e}")
+
+    def _run(self, points):
+        try:
+            result = subprocess.run([self.path], input=''.join(map(_line, points)),
+                                    capture_output=True, text=True, check=True)
+            values = np.array(result.stdout.split(), dtype=np.float64)
+        except (OSError, ValueError, subprocess.CalledProcessError) as e:
+            raise self._failed(points, e) from e
+        if len(values) == 1 and len(points) > 1:
+            # A one-shot reference: only the first line was read
+            return np.concatenate([values] + [self._run([p]) for p in points[1:]])
+        if len(values) != len(points):
+            raise self._failed(points, f"{len(values)} values printed for "
+                                       f"{len(points)} points")
+        return values
+
+    def evaluate(self, points):
+        """Reference values of a list of points, without the cache"""
+        points = list(points)
+        if not points:
+            return np.empty(0)
+        shares = np.array_split(np.arange(len(points)), min(self.workers, len(points)))
+        with ThreadPoolExecutor(max_workers=len(shares)) as executor:
+            parts = executor.map(self._run, [[points[k] for k in share] for share in shares])
+            return np.concatenate(list(parts))
+
+    def __call__(self, points):
+        """Reference values of a list of points (tuples of inputs).
+
+        Returns an array aligned to points. Inputs are passed to the
+        program as str() prints them, which for floats is the shortest
+        exact representation.
+        """
+        points = [tuple(p) for p in points]
+        todo = [p for p in dict.fromkeys(points) if p not in self.values]
+        store = None
+        if todo and self.persistent:
+            try:
+                store = ReferenceStore(self.path, len(todo[0]))
+                x = np.array(todo, dtype=np.float64)
+                values, found = store.lookup(x)
+            except (OSError, ValueError):
+                store = None
+            else:
+                self.values.update((p, v) for p, v, hit in zip(todo, values.tolist(), found)
+                                   if hit)
+                todo = [p for p, hit in zip(todo, found) if not hit]
+
+        values = self.evaluate(todo)
+        self.values.update(zip(todo, values.tolist()))
+        if store is not None and todo:
+            try:
+                store.add(np.array(todo, dtype=np.float64), values)
+            except OSError:
+                # The cache is an optimization; a read-only one is skipped
+                pass
+        return np.array([self.values[p] for p in points], dtype=np.float64)
+
+
+def reference_for(name, workers=1):
+    """exact.ExactReference if name is in exact.REFERENCES, else a ReferenceProgram"""
+    if name in exact.REFERENCES:
+        return exact.ExactReference(name, workers)
+    return ReferenceProgram(name, workers)
@@ -0,0 +1,174 @@
+"""
+Adaptive grid refinement, the 'adaptive' test pattern.
+
+The sweep starts from the coarse grid given by the ranges and steps.
+Every grid cell (the box between neighbouring grid points over the
+non-fixed inputs) whose corners' significant digits differ by more than
+a threshold, or whose worst corner is more than the threshold below the
+median of the points sampled so far, is split in half along every axis.
+The new vertices are sampled, and their sub-cells are examined the same
+way, up to a maximum depth and a per-configuration budget of points.
+
+Points live on an integer lattice whose spacing is the finest step,
+step / 2**depth, so refined vertices shared by neighbouring cells are
+only sampled once. Each level's samples are appended to the .tab file
+in the usual format, so the plotting scripts read it unchanged.
+"""
+
+import itertools
+
+import numpy as np
+
+from . import jobs, plan
+from .adaptive import PointStats
+from .runner import chunked
+from .stats import significant_digits
+from .tabfile import SampleLines, results as sample_results
+
+
+class Lattice:
+    """Integer lattice over the refined (non-fixed, non-degenerate) inputs"""
+
+    def __init__(self, config, depth):
+        self.config = config
+        self.scale = 2 ** depth
+        self.variables = []
+        self.coarse = []
+        for var in jobs.input_variables(config):
+            if var in config.fixed:
+                continue
+            start, end = config.ranges[var]
+            step = config.steps[var]
+            if step <= 0:
+                raise ValueError(f"Step for variable {var} must be positive, got {step}")
+            count = plan.axis_count(start, end, step)
+            if count > 1:
+                self.variables.append(var)
+                self.coarse.append(count)
+
+    def coarse_points(self):
+        axes = [range(0, (n - 1) * self.scale + 1, self.scale) for n in self.coarse]
+        return list(itertools.product(*axes))
+
+    def coarse_cells(self):
+        """Lower corners of the coarse cells, all of size scale"""
+        axes = [range(0, (n - 1) * self.scale, self.scale) for n in self.coarse]
+        return [(corner, self.scale) for corner in itertools.product(*axes)]
+
+    def inputs(self, point):
+        """Formatted program inputs for a lattice point"""
+        coordinates = dict(zip(self.variables, point))
+        values = []
+        for var in jobs.input_variables(self.config):
+            if var in self.config.fixed:
+                values.append(self.config.fixed[var])
+            elif var in coordinates:
+                start = self.config.ranges[var][0]
+                fine_step = self.config.steps[var] / self.scale
+                values.append(jobs.format_value(start + coordinates[var] * fine_step))
+            else:
+                values.append(jobs.format_value(self.config.ranges[var][0]))
+        return tuple(values)
+
+
+def cell_vertices(corner, size, divisions):
+    """Vertices of a cell on a grid with divisions intervals per axis"""
+    offsets = range(0, size + 1, size // divisions)
+    return [tuple(c + o for c, o in zip(corner, delta))
+            for delta in itertools.product(offsets, repeat=len(corner))]
+
+
+def split(corner, size):
+    half = size // 2
+    return [(tuple(c + o for c, o in zip(corner, delta)), half)
+            for delta in itertools.product((0, half), repeat=len(corner))]
+
+
+class Refinement:
+    """Refinement state of one configuration"""
+
+    def __init__(self, lattice, precision_bits):
+        self.lattice = lattice
+        self.precision_bits = precision_bits
+        self.index = {}
+        self.points = []
+        self.stats = PointStats(0)
+        self.cells = lattice.coarse_cells()
+
+    def add_points(self, points):
+        """Register new lattice points, returning those not sampled yet"""
+        new = [p for p in dict.fromkeys(points) if p not in self.index]
+        for p in new:
+            self.index[p] = len(self.points)
+            self.points.append(p)
+        grown = PointStats(len(self.points))
+        n = len(self.stats.count)
+        grown.count[:n] = self.stats.count
+        grown.mean[:n] = self.stats.mean
+        grown.m2[:n] = self.stats.m2
+        grown.finite[:n] = self.stats.finite
+        self.stats = grown
+        return new
+
+    def refine(self, threshold, budget):
+        """Split the cells that need it; return the new points to sample"""
+        digits = significant_digits(self.stats.mean, self.stats.std, self.precision_bits)
+        # Non-finite points count as having no significant digits
+        digits = np.where(self.stats.finite, digits, 0.0)
+        median = np.median(digits)
+
+        candidates = []
+        for corner, size in self.cells:
+            if size < 2:
+                continue
+            corners = digits[[self.index[v] for v in cell_vertices(corner, size, 1)]]
+            worst, best = corners.min(), corners.max()
+            if best - worst > threshold or worst < median - threshold:
+                candidates.append((worst, corner, size))
+
+        # Worst cells first, so the budget is spent where accuracy is lowest
+        candidates.sort(key=lambda c: c[0])
+        self.cells = []
+        new_points = []
+        for _, corner, size in candidates:
+            vertices = [v for v in cell_vertices(corner, size, 2) if v not in self.index]
+            if len(self.points) + len(new_points) + len(vertices) > budget:
+                break
+            new_points += vertices
+            self.cells += split(corner, size)
+        return self.add_points(new_points)
+
+
+def run_refinement(pool, envs, config, settings, chunk_size):
+    """Sample the adaptive pattern under every environment.
+
+    settings holds depth, budget, threshold and precision_bits (one per
+    environment). Yields (env_index, lines, npoints) once per level and
+    environment; each point's samples are contiguous.
+    """
+    lattice = Lattice(config, settings.depth)
+    states = [Refinement(lattice, bits) for bits in settings.precision_bits]
+    todo = [state.add_points(lattice.coarse_points()) for state in states]
+
+    for level in range(settings.depth + 1):
+        tasks = [(k, chunk) for k in range(len(envs))
+                 for chunk in chunked(todo[k], chunk_size)]
+        lines_by_env = [SampleLines([], []) for _ in envs]
+        results = pool.map((k, [(config.iterations, lattice.inputs(p)) for p in chunk])
+                           for k, chunk in tasks)
+        for (k, chunk), (_, lines) in zip(tasks, results):
+            values = sample_results(lines)
+            for n, point in enumerate(chunk):
+                states[k].stats.add(states[k].index[point],
+                                    values[n * config.iterations:(n + 1) * config.iterations])
+            lines_by_env[k] += lines
+            lines_by_env[k].values.extend(values)
+
+        for k in range(len(envs)):
+            if todo[k]:
+                yield k, lines_by_env[k], len(todo[k])
+
+        if level < settings.depth:
+            todo = [state.refine(settings.threshold, settings.budget) for state in states]
+            if not any(todo):
+                return
@@ -0,0 +1,332 @@
+"""
+Compilation and parallel execution of Verificarlo kernels.
+
+Kernels are built against tools/vfc_driver.h and run in --batch mode.
+Each worker thread owns one long-lived kernel process per backend
+configuration and feeds it chunks of batch requests; the chunks' outputs
+are yielded back in submission order so a single writer per
+configuration can stream them to its .tab file.
+
+Scheduling is dynamic: workers pull chunks from the executor's shared
+queue as soon as they are free, and chunks shrink towards the end of a
+sweep (guided scheduling) so that the workers finish together even when
+the kernel's cost varies with its inputs.
+"""
+
+import array
+import collections
+import itertools
+import os
+import shlex
+import subprocess
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+from . import cache
+from .tabfile import SampleLines
+
+TOOLS_DIR = Path(__file__).resolve().parent.parent
+
+# Requests per chunk are capped so that a chunk always fits in the pipe
+# buffer: the whole chunk is written before its output is read back
+MAX_CHUNK_SIZE = 256
+
+# Guided scheduling never cuts chunks below this many requests
+MIN_CHUNK_SIZE = 4
+
+# Completed chunks held back, per worker, while an earlier chunk is still
+# running; results are written in order, so this bounds both the memory
+# spent on out-of-order results and how long a slow chunk can stall the
+# others
+REORDER_WINDOW = 16
+
+
+def compile_args(config):
+    """Verificarlo arguments (without -o) for the configured program"""
+    args = [f'-D{config.real}', '-DVFC_DRIVER', f'-I{TOOLS_DIR}']
+    args += shlex.split(config.optimization)
+    args.append(f'{config.program}.c')
+    args += shlex.split(config.extra_files)
+    args.append('-lm')
+    return args
+
+
+def compile_program(config):
+    """Return the cached binary for the program, compiling it if needed"""
+    return cache.cached_build(compile_args(config))
+
+
+def backend_env(precision, mode):
+    """Environment selecting the MCA backend for a kernel process"""
+    env = dict(os.environ)
+    env['VFC_BACKENDS'] = (f'libinterflop_mca.so --precision-binary32={precision} '
+                           f'--precision-binary64={precision} --mode {mode}')
+    return env
+
+
+def chunk_size_for(n_requests, workers, batch_size=None):
+    """Pick the number of requests per chunk"""
+    if batch_size:
+        return max(1, min(batch_size, MAX_CHUNK_SIZE))
+    return max(1, min(n_requests // (workers * 10) + 1, MAX_CHUNK_SIZE))
+
+
+def guided_chunks(total, chunk_size, workers, nenvs=1):
+    """Split range(total) into chunks for guided scheduling.
+
+    Chunks are chunk_size requests long while there is plenty of work
+    left; once the remaining work (over all nenvs configurations) no
+    longer fills two chunks per worker, they shrink in proportion to it,
+    down to MIN_CHUNK_SIZE, so that the last chunks finish close
+    together. The split only depends on the arguments, so a resumed
+    sweep can skip the chunks already done.
+    """
+    start = 0
+    while start < total:
+        guided = -(-(total - start) * nenvs // (2 * workers))
+        size = max(min(chunk_size, guided), min(MIN_CHUNK_SIZE, chunk_size))
+        yield range(start, min(start + size, total))
+        start += size
+
+
+def chunked(iterable, size):
+    """Split an iterable into lists of at most size items"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def format_samples(requests, values):
+    """.tab lines of the results of (repeats, inputs) requests.
+
+    values holds the results of all requests one after the other; lines
+    are formatted the way vfc_driver.h prints them.
+    """
+    lines = []
+    samples = iter(values)
+    for repeats, inputs in requests:
+        columns = ' '.join(inputs)
+        lines += [f"{i} {columns} {next(samples):.17g}\n" for i in range(1, repeats + 1)]
+    return SampleLines(lines, values)
+
+
+class KernelProcess:
+    """A kernel binary running in --batch mode.
+
+    With raw_results, the kernel writes its results as raw doubles to a
+    pipe of their own (--result-fd) and the .tab lines are formatted
+    here, the way vfc_driver.h prints them, from the exact values.
+    """
+
+    def __init__(self, binary, env, raw_results=False):
+        self.binary = str(binary)
+        self.results = None
+        if not raw_results:
+            self.proc = subprocess.Popen([self.binary, '--batch'],
+                                         stdin=subprocess.PIPE,
+                                         stdout=subprocess.PIPE,
+                                         env=env, text=True)
+            return
+
+        read_fd, write_fd = os.pipe()
+        try:
+            self.proc = subprocess.Popen([self.binary, '--batch', '--result-fd', str(write_fd)],
+                                         stdin=subprocess.PIPE,
+                                         stdout=subprocess.DEVNULL,
+                                         env=env, text=True, pass_fds=(write_fd,))
+        finally:
+            os.close(write_fd)
+        self.results = os.fdopen(read_fd, 'rb')
+
+    def _failed(self):
+        return RuntimeError(f"{self.binary} exited with status "
+                            f"{self.proc.wait()} before finishing its batch")
+
+    def run(self, requests):
+        """Evaluate a list of (repeats, inputs) requests, return output lines"""
+        lines = [f"{repeats} {' '.join(inputs)}\n" for repeats, inputs in requests]
+        self.proc.stdin.write(''.join(lines))
+        self.proc.stdin.flush()
+
+        expected = sum(repeats for repeats, _ in requests)
+        if self.results is not None:
+            values = array.array('d')
+            data = self.results.read(expected * values.itemsize)
+            if len(data) < expected * values.itemsize:
+                raise self._failed()
+            values.frombytes(data)
+            return format_samples(requests, values.tolist())
+
+        output = []
+        for _ in range(expected):
+            line = self.proc.stdout.readline()
+            if not line:
+                raise self._failed()
+            output.append(line)
+        return output
+
+    def close(self):
+        try:
+            self.proc.stdin.close()
+        except BrokenPipeError:
+            # The process already exited; run() reported why
+            pass
+        self.proc.wait()
+        if self.results is not None:
+            self.results.close()
+
+
+class WorkerUsage:
+    """Busy time, chunks and samples of each worker thread"""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.lock = threading.Lock()
+        self.workers = {}
+
+    def record(self, busy, samples):
+        """Account one chunk to the calling worker thread"""
+        with self.lock:
+            usage = self.workers.setdefault(threading.get_ident(),
+                                            {'busy': 0.0, 'chunks': 0, 'samples': 0,
+                                             'slowest': 0.0})
+            usage['busy'] += busy
+            usage['chunks'] += 1
+            usage['samples'] += samples
+            usage['slowest'] = max(usage['slowest'], busy)
+
+    def report(self):
+        """Print per-worker utilization over the time since creation"""
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        if not self.workers:
+            return
+        print("\n=== Worker Utilization ===")
+        for number, usage in enumerate(self.workers.values(), 1):
+            print(f"Worker {number}: {usage['busy']:.1f}s busy of {elapsed:.1f}s "
+                  f"({usage['busy'] * 100 / elapsed:.0f}%), {usage['chunks']} chunks, "
+                  f"{usage['samples']} samples")
+        busy = sum(usage['busy'] for usage in self.workers.values())
+        slowest = max(usage['slowest'] for usage in self.workers.values())
+        print(f"Overall: {busy * 100 / (elapsed * len(self.workers)):.0f}% busy, "
+              f"slowest chunk {slowest:.2f}s")
+
+
+class KernelPool:
+    """Worker threads, each keeping one kernel process per environment.
+
+    Use as a context manager; the kernel processes are started lazily
+    and stay alive across calls to map() until the pool is closed. Tasks
+    are lists of requests, or index ranges that the worker turns into
+    requests with materialize(range). Pass a WorkerUsage as usage to
+    account the workers' busy time, and raw_results to read the kernels'
+    results through their binary channel (see KernelProcess).
+    """
+
+    def __init__(self, binary, envs, workers, materialize=None, usage=None,
+                 raw_results=False):
+        self.binary = binary
+        self.envs = envs
+        self.workers = workers
+        self.materialize = materialize
+        self.usage = usage
+        self.raw_results = raw_results
+        self.local = threading.local()
+        self.processes = []
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+
+    def _work(self, index, chunk):
+        started = time.monotonic()
+        if isinstance(chunk, range):
+            chunk = self.materialize(chunk)
+        lines = self._run(index, chunk)
+        if self.usage is not None:
+            self.usage.record(time.monotonic() - started, len(lines))
+        return index, lines
+
+    def _run(self, index, requests):
+        """Evaluate requests under environment index, in a worker thread"""
+        # Each worker keeps one kernel process per configuration
+        if not hasattr(self.local, 'processes'):
+            self.local.processes = {}
+        if index not in self.local.processes:
+            self.local.processes[index] = KernelProcess(self.binary, self.envs[index],
+                                                        self.raw_results)
+            with self.lock:
+                self.processes.append(self.local.processes[index])
+        return self.local.processes[index].run(requests)
+
+    def map(self, tasks):
+        """Run (env_index, requests) tasks, yielding (env_index, lines) in order.
+
+        Free workers pull the next task from a shared queue that is kept
+        2 * workers deep. Finished tasks wait for the ones before them,
+        up to REORDER_WINDOW * workers tasks in all, so memory use stays
+        bounded however many tasks there are.
+        """
+        pending = collections.deque()
+        for index, chunk in tasks:
+            pending.append(self.executor.submit(self._work, index, chunk))
+            while True:
+                while pending and pending[0].done():
+                    yield pending.popleft().result()
+                running = [f for f in pending if not f.done()]
+                if len(running) < 2 * self.workers:
+                    break
+                if len(pending) >= REORDER_WINDOW * self.workers:
+                    yield pending.popleft().result()
+                else:
+                    wait(running, return_when=FIRST_COMPLETED)
+        while pending:
+            yield pending.popleft().result()
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        for process in self.processes:
+            process.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def plan_materializer(plan, format_value):
+    """materialize() for a KernelPool running the chunks of a job plan"""
+    def materialize(chunk):
+        return plan.requests(chunk.start, chunk.stop, format_value)
+    return materialize
+
+
+def run_plan(pool, plan, chunk_size, skip=None, schedule_workers=None):
+    """Run the requests of a job plan on a pool of kernels.
+
+    Every chunk of the plan is run once per environment of the pool (one
+    per backend configuration), sharing the job list and the binary.
+    Chunks are handed to the workers as index ranges, which they turn
+    into requests themselves with the pool's materialize (see
+    plan_materializer). Yields (env_index, output_lines) pairs in
+    submission order.
+
+    Chunks follow guided_chunks() for schedule_workers workers (by
+    default the pool's). skip optionally gives, per environment, a
+    number of leading chunks that are already done and must not be run
+    again.
+    """
+    nenvs = len(pool.envs)
+    skip = skip or [0] * nenvs
+    chunks = guided_chunks(len(plan), chunk_size, schedule_workers or pool.workers, nenvs)
+
+    def tasks():
+        for number, chunk in enumerate(chunks):
+            for index in range(nenvs):
+                if number >= skip[index]:
+                    yield index, chunk
+
+    yield from pool.map(tasks())
@@ -0,0 +1,223 @@
+"""
+Worst-case input search, the 'search' test pattern.
+
+Instead of sweeping a whole grid, the input box is searched for the
+points where the kernel is least accurate, within a fixed budget of
+points per configuration. The optimizer is differential evolution
+(DE/rand/1/bin): the initial population is a scrambled Sobol set, so
+the first generation is a multi-start spread over the whole box, and
+each following generation proposes one trial point per member. Every
+generation is a single batch of points sampled through the worker pool,
+and the samples are appended to the .tab file as usual.
+
+The objective is one of:
+
+  digits  fewest significant digits, as in compute_statistics
+  std     largest standard deviation of the samples
+  ulp     largest error of the sample mean against a reference program,
+          in ulps of the reference value at the sweep's precision type
+
+The reference program reads one line of inputs per point on stdin and
+prints the exact values (like softmax_ref2; see reference.py). Points with non-finite samples rank
+worst of all. Scores come from the -i samples of each point, so they
+are noisy estimates; the report lists the distinct worst points found.
+"""
+
+import csv
+
+import numpy as np
+
+from . import jobs, qmc
+from .adaptive import PointStats
+from .runner import chunked
+from .stats import significant_digits
+from .tabfile import SampleLines, results as sample_results
+from .ulp import ulp_error
+
+OBJECTIVES = ('digits', 'std', 'ulp')
+
+# DE/rand/1/bin control parameters; the scale factor is redrawn every
+# generation (dither), which helps on noisy objectives
+CROSSOVER = 0.9
+SCALE = (0.5, 1.0)
+
+
+class SearchSpace:
+    """Box over the searched (non-fixed, non-degenerate) inputs"""
+
+    def __init__(self, config):
+        self.config = config
+        self.variables = []
+        bounds = []
+        for var in jobs.input_variables(config):
+            if var in config.fixed:
+                continue
+            start, end = config.ranges[var]
+            if start != end:
+                self.variables.append(var)
+                bounds.append((min(start, end), max(start, end)))
+        if not self.variables:
+            raise ValueError("The search needs at least one input with a non-empty range")
+        self.bounds = bounds
+        self.low = np.array([b[0] for b in bounds])
+        self.high = np.array([b[1] for b in bounds])
+
+    @property
+    def dims(self):
+        return len(self.variables)
+
+    def snap(self, points):
+        """Round points to the values the kernel actually receives"""
+        return np.array([[float(jobs.format_value(x)) for x in row] for row in points])
+
+    def inputs(self, point):
+        """Formatted program inputs for a point of the box"""
+        coordinates = dict(zip(self.variables, point))
+        values = []
+        for var in jobs.input_variables(self.config):
+            if var in self.config.fixed:
+                values.append(self.config.fixed[var])
+            elif var in coordinates:
+                values.append(jobs.format_value(coordinates[var]))
+            else:
+                values.append(jobs.format_value(self.config.ranges[var][0]))
+        return tuple(values)
+
+
+class Search:
+    """Differential evolution state of one configuration"""
+
+    def __init__(self, space, settings, precision_bits, seed, reference=None):
+        self.space = space
+        self.settings = settings
+        self.precision_bits = precision_bits
+        self.reference = reference
+        self.rng = np.random.default_rng(seed)
+        self.population = None
+        self.fitness = None
+        self.evaluated = 0
+        # Best estimate of every distinct point evaluated, by inputs
+        self.found = {}
+
+    def initial(self):
+        """Scrambled Sobol starting points spread over the box"""
+        n = min(self.settings.population, self.settings.budget)
+        unit = qmc.sobol(n, self.space.dims, seed=int(self.rng.integers(2**32)))
+        return self.space.snap(self.space.low + unit * (self.space.high - self.space.low))
+
+    def trials(self):
+        """One DE/rand/1/bin trial point per member, within the budget"""
+        size, dims = self.population.shape
+        n = min(size, self.settings.budget - self.evaluated)
+        scale = self.rng.uniform(*SCALE)
+        trials = np.empty((n, dims))
+        for i in range(n):
+            others = [j for j in range(size) if j != i]
+            a, b, c = self.population[self.rng.choice(others, 3, replace=False)]
+            cross = self.rng.random(dims) < CROSSOVER
+            cross[self.rng.integers(dims)] = True
+            trials[i] = np.where(cross, a + scale * (b - c), self.population[i])
+
+        # Components leaving the box are put back between the parent and
+        # the bound they crossed
+        parents = self.population[:n]
+        low, high = self.space.low, self.space.high
+        below, above = trials < low, trials > high
+        trials = np.where(below, low + self.rng.random(trials.shape) * (parents - low), trials)
+        trials = np.where(above, high - self.rng.random(trials.shape) * (high - parents), trials)
+        return self.space.snap(trials)
+
+    def score(self, points, stats):
+        """Loss of each evaluated point; larger means less accurate"""
+        objective = self.settings.objective
+        references = None
+        if objective == 'digits':
+            loss = -significant_digits(stats.mean, stats.std, self.precision_bits)
+        elif objective == 'std':
+            loss = stats.std
+        else:
+            references = self.reference([self.space.inputs(p) for p in points])
+            loss = ulp_error(stats.mean, references, self.settings.real)
+        loss = np.where(stats.finite, np.where(np.isnan(loss), np.inf, loss), np.inf)
+
+        for n, point in enumerate(points):
+            inputs = self.space.inputs(point)
+            entry = {
+                'inputs': inputs,
+                'loss': loss[n],
+                'mean': stats.mean[n] if stats.finite[n] else np.nan,
+                'std': stats.std[n] if stats.finite[n] else np.nan,
+                'count': int(stats.count[n]),
+                'reference': None if references is None else references[n],
+            }
+            previous = self.found.get(inputs)
+            if previous is None or entry['count'] > previous['count']:
+                self.found[inputs] = entry
+        self.evaluated += len(points)
+        return loss
+
+    def select(self, points, loss):
+        """Keep each trial that is at least as bad as its parent"""
+        if self.population is None:
+            self.population, self.fitness = points, loss
+            return
+        n = len(points)
+        better = loss >= self.fitness[:n]
+        self.population[:n][better] = points[better]
+        self.fitness[:n][better] = loss[better]
+
+    def done(self):
+        return self.evaluated >= self.settings.budget or len(self.population) < 4
+
+    def worst(self, top):
+        """The top distinct points found, least accurate first"""
+        return sorted(self.found.values(), key=lambda e: -e['loss'])[:top]
+
+
+def write_report(path, search, ninputs, top):
+    """Write the worst points found by a search as CSV"""
+    entries = search.worst(top)
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        header = [f'x{k}' for k in range(ninputs)] + ['mean', 'std_dev', 'significant_digits']
+        if search.settings.objective == 'ulp':
+            header += ['reference', 'ulp_error']
+        writer.writerow(header + ['samples'])
+        for entry in entries:
+            digits = significant_digits(entry['mean'], entry['std'], search.precision_bits)
+            row = list(entry['inputs']) + [repr(float(entry['mean'])), repr(float(entry['std'])),
+                                           f'{float(digits):.3f}']
+            if search.settings.objective == 'ulp':
+                row += [repr(float(entry['reference'])), f"{entry['loss']:.3f}"]
+            writer.writerow(row + [entry['count']])
+    return entries
+
+
+def run_search(pool, searches, config, chunk_size):
+    """Run one search per environment until their budgets are spent.
+
+    searches holds one Search per environment of the pool. Yields
+    (env_index, lines, npoints) once per generation and environment;
+    each point's samples are contiguous.
+    """
+    batches = [search.initial() for search in searches]
+    while any(len(points) for points in batches):
+        tasks = [(k, chunk) for k, points in enumerate(batches)
+                 for chunk in chunked(range(len(points)), chunk_size)]
+        results = pool.map((k, [(config.iterations, searches[k].space.inputs(batches[k][n]))
+                                for n in chunk]) for k, chunk in tasks)
+        stats = [PointStats(len(points)) for points in batches]
+        lines_by_env = [SampleLines([], []) for _ in searches]
+        for (k, chunk), (_, lines) in zip(tasks, results):
+            values = sample_results(lines)
+            for offset, n in enumerate(chunk):
+                stats[k].add(n, values[offset * config.iterations:(offset + 1) * config.iterations])
+            lines_by_env[k] += lines
+            lines_by_env[k].values.extend(values)
+
+        for k, search in enumerate(searches):
+            if len(batches[k]):
+                search.select(batches[k], search.score(batches[k], stats[k]))
+                yield k, lines_by_env[k], len(batches[k])
+        batches = [search.trials() if not search.done() else np.empty((0, search.space.dims))
+                   for search in searches]
@@ -0,0 +1,326 @@
+"""
+Per-point statistics of MCA samples.
+
+group_statistics() summarizes the samples of every input point of a
+result file at once. The rows are put in point order, which for files
+written by the runners needs no sort since each point's samples are
+contiguous, and every statistic is then a single np.*.reduceat over the
+ordered results. The cost is O(N) for runner output and O(N log N)
+otherwise, instead of one pass over the samples per point.
+
+The per-point results are kept as PointSummary accumulators (count,
+mean, M2, min, max), which merge exactly, so summarize_file() reduces a
+file of any size chunk by chunk, optionally in parallel, in bounded
+memory. They can also keep a sketch of each point's distribution, its
+QUANTILES, which the merge interpolates.
+
+Significant digits follow compute_statistics in the plotting scripts:
+s = -log10(std / |mean|), capped at precision_bits * log10(2), with the
+cap when std < 1e-15 and 0 when mean == 0.
+"""
+
+import collections
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from . import columnar, tabfile
+
+# Probabilities of the quantile sketch of PointSummary
+QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+# Fields of group_statistics() after the inputs, in the column order of
+# the plotting scripts' statistics CSV files
+STATISTICS = ('mean', 'std', 'min', 'max', 'count', 'sig_digits')
+
+
+def significant_digits(mean, std, precision_bits, tiny=1e-15):
+    """Vectorized significant digits, as computed by compute_statistics.
+
+    A std below tiny (or exactly 0) gets the cap; the example_1 and gelu
+    plotters pass tiny=0 to cap only exactly reproducible results.
+    """
+    mean = np.asarray(mean, dtype=float)
+    std = np.asarray(std, dtype=float)
+    max_digits = precision_bits * np.log10(2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        digits = np.minimum(-np.log10(std / np.abs(mean)), max_digits)
+    digits = np.where(mean == 0, 0.0, digits)
+    return np.where((std < tiny) | (std == 0), max_digits, digits)
+
+
+def statistics_dtype(inputs):
+    """Record type of group_statistics() for the given input fields"""
+    return np.dtype([(var, 'f8') for var in inputs]
+                    + [(name, 'i8' if name == 'count' else 'f8') for name in STATISTICS])
+
+
+def _key_starts(keys, inputs):
+    """Starts of the runs of equal inputs in keys"""
+    changed = np.zeros(len(keys), dtype=bool)
+    changed[:1] = True
+    for var in inputs:
+        column = keys[var]
+        changed[1:] |= column[1:] != column[:-1]
+    return np.flatnonzero(changed)
+
+
+def _point_order(data, inputs):
+    """Row order grouping the samples of each point, and the run starts"""
+    runs = columnar.point_runs(data, inputs)
+    if runs is not None:
+        return None, runs[0]
+    order = np.lexsort([data[var] for var in reversed(inputs)])
+    keys = np.empty(len(order), dtype=[(var, data.dtype[var]) for var in inputs])
+    for var in inputs:
+        keys[var] = data[var][order]
+    return order, _key_starts(keys, inputs)
+
+
+def _key_order(records, inputs):
+    return np.lexsort([records[var] for var in reversed(inputs)])
+
+
+def _group_quantiles(block, offsets, counts):
+    """QUANTILES of each run of block, as np.quantile computes them"""
+    ids = np.repeat(np.arange(len(counts)), counts)
+    ordered = block[np.lexsort((block, ids))]
+    position = offsets[:, None] + np.asarray(QUANTILES) * (counts[:, None] - 1)
+    low = np.floor(position).astype(np.int64)
+    high = np.minimum(low + 1, (offsets + counts - 1)[:, None])
+    fraction = position - low
+    return ordered[low] + (ordered[high] - ordered[low]) * fraction
+
+
+def _mixture_quantiles(counts, mins, maxs, quantiles):
+    """QUANTILES of the union of several parts of a point's samples.
+
+    Each part's distribution is taken as the piecewise-linear CDF
+    through its min, its quantiles and its max; the union's CDF is their
+    count-weighted mean, which is inverted at QUANTILES.
+    """
+    probabilities = np.concatenate([[0.0], QUANTILES, [1.0]])
+    knots = np.column_stack([mins, quantiles, maxs])
+    values = np.unique(knots)
+    cdf = sum(n * np.interp(values, part, probabilities, left=0.0, right=1.0)
+              for n, part in zip(counts, knots)) / np.sum(counts)
+    return np.interp(QUANTILES, cdf, values)
+
+
+class PointSummary:
+    """Mergeable per-point accumulators of the results.
+
+    records holds one record per point, sorted by inputs: the input
+    values, then the count, mean, M2 (sum of squared deviations from
+    the mean), min and max of the point's results. Summaries of separate
+    parts of a file, such as chunks or the ranges of parallel workers,
+    merge into the summary of the whole with the pairwise update of
+    Chan et al., so the samples never need to be in memory together.
+
+    quantiles, if kept, is a sketch of the distribution of each point's
+    results: an (npoints, len(QUANTILES)) array of its quantiles. They
+    are exact for points whose samples were summarized together, and
+    interpolated from the parts' sketches when parts are merged.
+    """
+
+    def __init__(self, inputs, records=None, quantiles=None):
+        self.inputs = tuple(inputs)
+        self.dtype = np.dtype([(var, 'f8') for var in self.inputs]
+                              + [('count', 'i8'), ('mean', 'f8'), ('m2', 'f8'),
+                                 ('min', 'f8'), ('max', 'f8')])
+        self.records = np.empty(0, dtype=self.dtype) if records is None else records
+        self.quantiles = quantiles
+
+    def __len__(self):
+        return len(self.records)
+
+    @classmethod
+    def of(cls, data, inputs, result='result', quantiles=False):
+        """Summary of the samples of a structured array (or memory map).
+
+        With quantiles set, the summary keeps the quantile sketch.
+        """
+        summary = cls(inputs)
+        inputs = summary.inputs
+        order, starts = _point_order(data, inputs)
+        values = data[result] if order is None else data[result][order]
+        stops = np.append(starts[1:], len(values))
+
+        records = np.empty(len(starts), dtype=summary.dtype)
+        first_rows = starts if order is None else order[starts]
+        for var in inputs:
+            records[var] = data[var][first_rows]
+        records['count'] = stops - starts
+        sketch = np.empty((len(starts), len(QUANTILES))) if quantiles else None
+
+        # Points are reduced a block of rows at a time, so the
+        # temporaries stay small when data is a memory map
+        first = 0
+        while first < len(starts):
+            last = max(first + 1, int(np.searchsorted(stops, starts[first] + columnar.SCAN_BLOCK,
+                                                      side='right')))
+            block = np.asarray(values[starts[first]:stops[last - 1]], dtype=np.float64)
+            offsets = starts[first:last] - starts[first]
+            counts = records['count'][first:last]
+            mean = np.add.reduceat(block, offsets) / counts
+            deviation = block - np.repeat(mean, counts)
+            # One refinement step with the mean deviation recovers the
+            # rounding error of the plain sum, which otherwise shows in
+            # the mean and inflates M2 by count * error^2
+            with np.errstate(invalid='ignore'):
+                correction = np.add.reduceat(deviation, offsets) / counts
+            correction[~np.isfinite(correction)] = 0.0
+            mean += correction
+            deviation -= np.repeat(correction, counts)
+            records['mean'][first:last] = mean
+            records['m2'][first:last] = np.add.reduceat(deviation * deviation, offsets)
+            records['min'][first:last] = np.minimum.reduceat(block, offsets)
+            records['max'][first:last] = np.maximum.reduceat(block, offsets)
+            if quantiles:
+                sketch[first:last] = _group_quantiles(block, offsets, counts)
+            first = last
+
+        if quantiles:
+            # As np.quantile, points with a nan result have nan quantiles
+            sketch[np.isnan(records['mean'])] = np.nan
+        if order is None:
+            # Runs are in file order
+            order = _key_order(records, inputs)
+            records = records[order]
+            sketch = sketch[order] if quantiles else None
+        summary.records = records
+        summary.quantiles = sketch
+        return summary
+
+    @classmethod
+    def merge(cls, summaries):
+        """Summary of the union of the samples of several summaries.
+
+        The merged summary keeps a quantile sketch if they all do.
+        """
+        summaries = [summary for summary in summaries if len(summary)] or summaries[:1]
+        if len(summaries) == 1:
+            return summaries[0]
+        merged = cls(summaries[0].inputs)
+        quantiles = all(summary.quantiles is not None for summary in summaries)
+
+        records = np.concatenate([summary.records for summary in summaries])
+        order = _key_order(records, merged.inputs)
+        records = records[order]
+        starts = _key_starts(records, merged.inputs)
+        sizes = np.diff(np.append(starts, len(records)))
+        count = np.add.reduceat(records['count'], starts)
+        mean = np.add.reduceat(records['count'] * records['mean'], starts) / count
+        # Points found in a single part keep their mean as is
+        mean = np.where(sizes == 1, records['mean'][starts], mean)
+        deviation = records['mean'] - np.repeat(mean, sizes)
+
+        merged.records = np.empty(len(starts), dtype=merged.dtype)
+        for var in merged.inputs:
+            merged.records[var] = records[var][starts]
+        merged.records['count'] = count
+        merged.records['mean'] = mean
+        merged.records['m2'] = np.add.reduceat(
+            records['m2'] + records['count'] * deviation * deviation, starts)
+        merged.records['min'] = np.minimum.reduceat(records['min'], starts)
+        merged.records['max'] = np.maximum.reduceat(records['max'], starts)
+
+        if quantiles:
+            parts = np.concatenate([summary.quantiles for summary in summaries])[order]
+            merged.quantiles = parts[starts]
+            for k in np.flatnonzero(sizes > 1):
+                rows = slice(starts[k], starts[k] + sizes[k])
+                merged.quantiles[k] = _mixture_quantiles(
+                    records['count'][rows], records['min'][rows], records['max'][rows],
+                    parts[rows])
+            merged.quantiles[np.isnan(mean)] = np.nan
+        return merged
+
+    def statistics(self, precision_bits=53, tiny=1e-15):
+        """Statistics of each point, as returned by group_statistics()"""
+        records = self.records
+        stats = np.empty(len(records), dtype=statistics_dtype(self.inputs))
+        for name in self.inputs + ('mean', 'min', 'max', 'count'):
+            stats[name] = records[name]
+        stats['std'] = np.sqrt(records['m2'] / records['count'])
+        stats['sig_digits'] = significant_digits(stats['mean'], stats['std'], precision_bits,
+                                                 tiny)
+        return stats
+
+
+def group_statistics(data, inputs, precision_bits=53, result='result', tiny=1e-15):
+    """Statistics of the samples of each distinct combination of inputs.
+
+    data is a structured array of samples, such as read_tab() returns
+    (it may be a memory map), and inputs the names of its input fields.
+    Returns a structured array with one record per point, sorted by
+    inputs: the input values, then the mean, std (population, as np.std),
+    min, max, count and significant digits of the point's results (see
+    significant_digits() for tiny).
+    """
+    return PointSummary.of(data, inputs, result).statistics(precision_bits, tiny)
+
+
+def _summarize(chunk, inputs, quantiles, skip_nan=False):
+    if skip_nan:
+        chunk = chunk[~np.isnan(chunk['result'])]
+    return PointSummary.of(chunk, inputs, quantiles=quantiles)
+
+
+def merge_all(summaries, inputs, chunk_rows=columnar.SCAN_BLOCK):
+    """Merge of an iterable of partial summaries, as they come.
+
+    Partial summaries are merged into the total whenever they hold more
+    points than chunk_rows and the total, so memory holds a few of them
+    however many there are.
+    """
+    total = PointSummary(inputs)
+    partial = []
+    for summary in summaries:
+        partial.append(summary)
+        if sum(map(len, partial)) > max(chunk_rows, 2 * len(total)):
+            total = PointSummary.merge([total] + partial)
+            partial.clear()
+    return PointSummary.merge([total] + partial)
+
+
+def _pooled(executor, workers, chunks, inputs, quantiles, skip_nan):
+    pending = collections.deque()
+    for chunk in chunks:
+        # Chunks are sent as copies; at most two per worker are in flight
+        pending.append(executor.submit(_summarize, np.array(chunk), inputs, quantiles,
+                                       skip_nan))
+        if len(pending) >= 2 * workers:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def summarize_file(path, inputs=None, chunk_rows=columnar.SCAN_BLOCK, workers=1,
+                   quantiles=False, skip_nan=False):
+    """PointSummary of a .tab file, read chunk_rows samples at a time.
+
+    inputs defaults to the input columns of the file. Chunks are
+    summarized by a pool of workers processes if workers > 1 and the
+    file holds more than one chunk, so small files start no pool. Partial
+    summaries are merged as they pile up, so memory holds a few chunks
+    and the summaries, whatever the size of the file. With quantiles
+    set, the summary keeps the quantile sketch. With skip_nan set,
+    samples with a NaN result are left out, so a point is summarized
+    from its other samples instead of getting a NaN mean.
+    """
+    chunks = tabfile.iter_tab(path, chunk_rows)
+    first = next(chunks, None)
+    if first is None:
+        return PointSummary(inputs or ())
+    inputs = tuple(inputs or first.dtype.names[1:-1])
+    second = next(chunks, None)
+    chunks = itertools.chain([first], [] if second is None else [second], chunks)
+
+    if workers <= 1 or second is None:
+        return merge_all((_summarize(chunk, inputs, quantiles, skip_nan) for chunk in chunks),
+                         inputs, chunk_rows)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return merge_all(_pooled(executor, workers, chunks, inputs, quantiles, skip_nan),
+                         inputs, chunk_rows)
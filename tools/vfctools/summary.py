@@ -0,0 +1,94 @@
+"""
+Per-point summary sidecars of .tab files.
+
+Next to each X.tab, the sweep writes X.summary.npz: the PointSummary of
+the file (count, mean, M2, min and max of every point, and its quantile
+sketch), so the analysis tools get the per-point statistics without
+reading the samples. The sidecar records the size and modification time
+of the .tab file it summarizes, taken before the samples were read, and
+is only used while they still match; file_summary() rebuilds it
+otherwise.
+"""
+
+import os
+from pathlib import Path
+
+import numpy as np
+
+from . import columnar, stats
+
+# Incremented when the layout of the sidecar changes
+VERSION = 2
+
+
+def summary_path(tab_path):
+    """Path of the summary sidecar of a .tab file"""
+    return Path(tab_path).with_suffix('.summary.npz')
+
+
+def _stamp(tab_path):
+    info = os.stat(tab_path)
+    return info.st_size, info.st_mtime_ns
+
+
+def write_summary(tab_path, summary, stamp=None):
+    """Write the sidecar of a .tab file holding summary.
+
+    stamp is the (size, mtime_ns) of the .tab file when it was
+    summarized, by default its current one. The sidecar is replaced
+    atomically, so readers never see a partial file.
+    """
+    size, mtime_ns = _stamp(tab_path) if stamp is None else stamp
+    fields = {'version': VERSION, 'inputs': np.array(summary.inputs, dtype=str),
+              'records': summary.records, 'tab_size': size, 'tab_mtime_ns': mtime_ns}
+    if summary.quantiles is not None:
+        fields['quantiles'] = summary.quantiles
+        fields['probabilities'] = np.array(stats.QUANTILES)
+    path = summary_path(tab_path)
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'wb') as f:
+        np.savez(f, **fields)
+    os.replace(tmp, path)
+
+
+def load_summary(tab_path, quantiles=False):
+    """PointSummary of a .tab file from its sidecar.
+
+    Returns None if there is no sidecar, if the .tab file changed since
+    it was written, or, with quantiles set, if it has no quantile
+    sketch.
+    """
+    try:
+        stamp = _stamp(tab_path)
+        with np.load(summary_path(tab_path)) as f:
+            if (int(f['version']) != VERSION
+                    or (int(f['tab_size']), int(f['tab_mtime_ns'])) != stamp):
+                return None
+            sketch = None
+            if 'quantiles' in f.files and tuple(f['probabilities']) == stats.QUANTILES:
+                sketch = f['quantiles']
+            if quantiles and sketch is None:
+                return None
+            return stats.PointSummary(f['inputs'].tolist(), f['records'], sketch)
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def file_summary(tab_path, quantiles=True, workers=1, chunk_rows=columnar.SCAN_BLOCK):
+    """PointSummary of a .tab file, from its sidecar if it is up to date.
+
+    Otherwise the file is summarized by stats.summarize_file() and the
+    sidecar rewritten; a sidecar that cannot be written (e.g. in a
+    read-only directory) is not an error.
+    """
+    summary = load_summary(tab_path, quantiles)
+    if summary is not None:
+        return summary
+    stamp = _stamp(tab_path)
+    summary = stats.summarize_file(tab_path, chunk_rows=chunk_rows, workers=workers,
+                                   quantiles=quantiles)
+    try:
+        write_summary(tab_path, summary, stamp)
+    except OSError:
+        pass
+    return summary
@@ -0,0 +1,257 @@
+"""
+Reading and writing of Verificarlo .tab result files.
+
+A .tab file holds one header line "i x0 [x1 [x2]] result" followed by
+one line per sample; some runners write '#' comment lines before the
+header. TabWriter also keeps a columnar binary copy of the samples next
+to it (see columnar.py), which read_tab() loads instead of the text.
+"""
+
+import itertools
+import math
+
+import numpy as np
+
+from . import columnar
+from .columnar import ColumnarWriter, columnar_path
+
+
+def tab_filename(config):
+    """Output filename used by the sweep runners"""
+    return (f"{config.program}-{config.ninputs}inputs-{config.pattern}-{config.real}"
+            f"-vp{config.precision}-{config.mode}.tab")
+
+
+def tab_header(ninputs):
+    """Column header line for a program with ninputs inputs"""
+    inputs = ' '.join(f'x{k}' for k in range(ninputs))
+    return f"i {inputs} result\n"
+
+
+class RunningSummary:
+    """Count, mean, std, min and max of the results, updated one at a time"""
+
+    def __init__(self):
+        self.total = 0
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        self.total += 1
+        if not math.isfinite(value):
+            return
+        # Welford's update
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    @property
+    def std(self):
+        return math.sqrt(self.m2 / self.count) if self.count else 0.0
+
+    def report(self):
+        """Print the summary the way the bash runners did"""
+        if self.count == 0:
+            print("Warning: No valid numeric results found")
+            return
+        print(f"Mean result: {self.mean:.6e}")
+        print(f"Std deviation: {self.std:.6e}")
+        print(f"Min result: {self.min:.6e}")
+        print(f"Max result: {self.max:.6e}")
+        print(f"Valid numeric results: {self.count}/{self.total}")
+
+
+def parse_result(line):
+    """Result column of a .tab line, or nan if it is not a number"""
+    try:
+        return float(line.rsplit(None, 1)[-1])
+    except (ValueError, IndexError):
+        return math.nan
+
+
+class TabLayout:
+    """Columns of a .tab file, as found by read_tab()"""
+
+    def __init__(self, names, header_lines, varying):
+        self.names = names
+        # Comment and header lines before the first sample
+        self.header_lines = header_lines
+        # Inputs taking more than one value
+        self.varying = varying
+
+    @property
+    def inputs(self):
+        return self.names[1:-1]
+
+    @property
+    def ninputs(self):
+        return len(self.names) - 2
+
+
+def _is_sample(line):
+    try:
+        int(line.split(None, 1)[0])
+        return True
+    except (ValueError, IndexError):
+        return False
+
+
+def _read_header(f):
+    """Column names and number of header lines of an open .tab file.
+
+    The header lines are the lines before the first one starting with a
+    sample number; the last one that is not a comment names the
+    columns, which are i x0 ... result if there is none. Leaves f
+    somewhere past the header.
+    """
+    header = None
+    header_lines = 0
+    while line := f.readline():
+        if _is_sample(line):
+            break
+        header_lines += 1
+        if not line.startswith('#') and line.strip():
+            header = line.split()
+    if header is None:
+        ncolumns = len(line.split()) if line else 2
+        header = ['i'] + [f'x{k}' for k in range(ncolumns - 2)] + ['result']
+    return header, header_lines
+
+
+def read_tab(path, names=None, mmap=False):
+    """Samples of a .tab file and the layout of its columns.
+
+    The columnar copy of the file is loaded if it is up to date (memory
+    mapped with mmap set); otherwise the text is parsed in a single pass
+    after the header lines. Column names come from the header, or are
+    i x0 ... result if there is none, and are replaced by names if
+    given. Returns a structured array with 'i' as int32 and the other
+    columns as float64, and a TabLayout.
+    """
+    with open(path) as f:
+        header, header_lines = _read_header(f)
+        data = columnar.load(path, mmap=mmap)
+        if data is None:
+            f.seek(0)
+            data = np.loadtxt(f, skiprows=header_lines, ndmin=1,
+                              dtype=columnar.columnar_dtype(header))
+
+    data = columnar.rename(data, names or header)
+    names = list(data.dtype.names)
+    varying = [var for var in names[1:-1] if columnar.varies(data, var)]
+    return data, TabLayout(names, header_lines, varying)
+
+
+def iter_tab(path, chunk_rows, names=None):
+    """Samples of a .tab file as structured arrays of chunk_rows rows.
+
+    Like read_tab() but holding one chunk at a time: chunks are slices
+    of the memory-mapped columnar copy if it is up to date, and
+    otherwise parsed from chunk_rows lines of text at a time.
+    """
+    with open(path) as f:
+        header, header_lines = _read_header(f)
+        names = names or header
+        data = columnar.load(path, names=names, mmap=True)
+        if data is not None:
+            for start in range(0, len(data), chunk_rows):
+                yield data[start:start + chunk_rows]
+            return
+
+        dtype = columnar.columnar_dtype(names)
+        f.seek(0)
+        for _ in range(header_lines):
+            f.readline()
+        while lines := list(itertools.islice(f, chunk_rows)):
+            yield np.loadtxt(lines, ndmin=1, dtype=dtype)
+
+
+class SampleLines(list):
+    """.tab lines of a chunk of samples along with their results as floats"""
+
+    def __init__(self, lines, values):
+        super().__init__(lines)
+        self.values = values
+
+
+def results(lines):
+    """Results of a list of .tab lines, parsed only if they are not known"""
+    values = getattr(lines, 'values', None)
+    if values is not None:
+        return values
+    return [parse_result(line) for line in lines]
+
+
+class TabWriter:
+    """Single writer streaming sample lines to a .tab file.
+
+    With offset set, an existing file is truncated to that many bytes
+    and appended to, the lines already in it counting towards written
+    and the summary. With append set, lines are added after whatever the
+    file holds (e.g. a header written by a bash runner) and only the new
+    lines count. header replaces the default "i x0 ... result" line.
+
+    The samples also go to the file's columnar copy, which is rebuilt
+    from the lines already in the file when appending or resuming, and
+    is written after the .tab file at every checkpoint.
+    """
+
+    def __init__(self, path, ninputs, renumber=False, offset=None, header=None,
+                 append=False):
+        self.renumber = renumber
+        self.written = 0
+        self.summary = RunningSummary()
+        if offset is None and not append:
+            header = header or tab_header(ninputs)
+            self.file = open(path, 'w')
+            self.file.write(header)
+            self.columns = ColumnarWriter(columnar_path(path), header.split())
+            return
+
+        if append:
+            self.file = open(path, 'a+')
+            self.file.seek(0)
+        else:
+            self.file = open(path, 'r+')
+            self.file.truncate(offset)
+        # The header is the first line that is not a comment
+        self.columns = None
+        while line := self.file.readline():
+            if self.columns is None:
+                if not line.startswith('#'):
+                    self.columns = ColumnarWriter(columnar_path(path), line.split())
+                continue
+            value = parse_result(line)
+            self.columns.add(line, value)
+            if not append:
+                self.written += 1
+                self.summary.add(value)
+        self.file.seek(0, 2)
+
+    def write(self, lines):
+        for line, value in zip(lines, results(lines)):
+            self.written += 1
+            if self.renumber:
+                line = f"{self.written} {line.split(' ', 1)[1]}"
+            self.summary.add(value)
+            self.file.write(line)
+            if self.columns is not None:
+                self.columns.add(line, value)
+
+    def checkpoint(self):
+        """Flush written lines and return the .tab file's size in bytes"""
+        self.file.flush()
+        if self.columns is not None:
+            self.columns.flush()
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+        if self.columns is not None:
+            self.columns.close()
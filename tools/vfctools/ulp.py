@@ -0,0 +1,182 @@
+"""
+ULP errors of kernel results against reference values.
+
+Errors are measured in units in the last place of the reference value
+rounded to the kernel's working precision type, FLOAT (binary32) or
+DOUBLE (binary64). real_of() reads it from the -FLOAT-/-DOUBLE- tag that
+the runners put in .tab file names, or from the "# Type:" comment some
+runners write before the header.
+
+Everything works on whole arrays: the error of every point's mean, and
+of every sample, which sample_points() matches to its point with one
+sort and search over the bits of the inputs. error_distribution() reads
+a .tab file a chunk at a time and reduces the errors of its samples to
+the tail of each point's distribution (from the quantile sketch of a
+stats.PointSummary of the errors) and to a histogram of them all.
+"""
+
+import csv
+import re
+from pathlib import Path
+
+import numpy as np
+
+from . import columnar, stats, tabfile
+
+REALS = {'FLOAT': np.float32, 'DOUBLE': np.float64}
+
+# Bins of the histogram of error_distribution(): [0, 2^-10), then one
+# bin per binade up to 2^64 ulps, and everything above, inf included
+HISTOGRAM_EDGES = np.concatenate([[0.0], np.exp2(np.arange(-10.0, 65.0)), [np.inf]])
+
+# Per-point fields of error_distribution(), from the PointSummary of the
+# errors and its quantile sketch
+TAIL = ('count', 'mean', 'p50', 'p99', 'max')
+
+_NAME_TAG = re.compile(r'-(FLOAT|DOUBLE)-')
+_TYPE_COMMENT = re.compile(r'^#.*\bType:\s*(FLOAT|DOUBLE)\b')
+
+
+def real_of(path, default='DOUBLE'):
+    """Working precision type of a .tab file, 'FLOAT' or 'DOUBLE'"""
+    match = _NAME_TAG.search(Path(path).name)
+    if match:
+        return match.group(1)
+    try:
+        with open(path) as f:
+            for line in f:
+                if not line.startswith('#'):
+                    break
+                match = _TYPE_COMMENT.match(line)
+                if match:
+                    return match.group(1)
+    except (OSError, UnicodeDecodeError):
+        pass
+    return default
+
+
+def ulp(reference, real):
+    """Size of an ulp of each reference value rounded to real"""
+    with np.errstate(over='ignore'):
+        rounded = np.asarray(reference, dtype=np.float64).astype(REALS[real])
+    return np.abs(np.spacing(rounded)).astype(np.float64)
+
+
+def ulp_error(value, reference, real):
+    """|value - reference| in ulps of the reference rounded to real.
+
+    0 where the ulp is not a positive finite number (a non-finite
+    reference), as in the ULP scripts.
+    """
+    size = ulp(reference, real)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        error = np.abs(np.asarray(value, dtype=np.float64) - reference) / size
+    return np.where(size > 0, error, 0.0)
+
+
+def _keys(columns):
+    # +0.0 maps -0.0 to 0.0, which the statistics group with it
+    bits = np.column_stack([np.asarray(c, dtype=np.float64) + 0.0 for c in columns])
+    return np.ascontiguousarray(bits).view(np.uint64).view(f'V{8 * len(columns)}').ravel()
+
+
+def sample_points(data, points, inputs):
+    """Index in points of the point of each sample of data.
+
+    data and points are structured arrays (or memory maps, or anything
+    else indexed by field name, such as DataFrames) with the input
+    fields inputs, such as the samples of a .tab file and the records of
+    its PointSummary. Samples whose inputs are not in points
+    get -1.
+    """
+    keys = _keys([points[var] for var in inputs])
+    order = np.argsort(keys)
+    keys = keys[order]
+    wanted = _keys([data[var] for var in inputs])
+    if not len(keys):
+        return np.full(len(wanted), -1)
+    index = np.minimum(np.searchsorted(keys, wanted), len(keys) - 1)
+    return np.where(keys[index] == wanted, order[index], -1)
+
+
+def sample_ulp_errors(data, points, references, inputs, real, result='result'):
+    """ULP error of every sample of data against its point's reference.
+
+    references is aligned to points; see sample_points(). Samples of
+    unknown points get nan.
+    """
+    index = sample_points(data, points, inputs)
+    references = np.append(np.asarray(references, dtype=np.float64), np.nan)
+    errors = ulp_error(data[result], references[index], real)
+    return np.where(index >= 0, errors, np.nan)
+
+
+def histogram(errors):
+    """Counts of the non-nan errors in the bins of HISTOGRAM_EDGES"""
+    errors = np.asarray(errors, dtype=np.float64)
+    errors = errors[~np.isnan(errors)]
+    bins = np.searchsorted(HISTOGRAM_EDGES, errors, side='right') - 1
+    nbins = len(HISTOGRAM_EDGES) - 1
+    return np.bincount(np.minimum(bins, nbins - 1), minlength=nbins)
+
+
+def error_distribution(path, points, references, inputs, real=None, names=None,
+                       chunk_rows=columnar.SCAN_BLOCK):
+    """Distribution of the ULP errors of the samples of a .tab file.
+
+    points and references are as for sample_ulp_errors(), real defaults
+    to real_of(path), and names replaces the column names of the file
+    as for tabfile.iter_tab(). The file is read chunk_rows samples at a
+    time, and the errors of each chunk are summarized per point with a
+    quantile sketch and merged into the rest, so memory does not grow
+    with the number of samples. Samples with a nan error (a nan result,
+    or inputs not in points) are left out.
+
+    Returns a structured array aligned to points with the fields of
+    TAIL: the number of samples of each point, the mean, median, 99th
+    percentile and maximum of their errors (nan for points without
+    samples), and the histogram() counts of the errors of all the
+    samples.
+    """
+    real = real or real_of(path)
+    inputs = tuple(inputs)
+    counts = np.zeros(len(HISTOGRAM_EDGES) - 1, dtype=np.int64)
+
+    def summaries():
+        for chunk in tabfile.iter_tab(path, chunk_rows, names):
+            result = sample_ulp_errors(chunk, points, references, inputs, real)
+            kept = ~np.isnan(result)
+            errors = np.empty(int(kept.sum()), dtype=[(var, 'f8') for var in inputs]
+                              + [('result', 'f8')])
+            for var in inputs:
+                errors[var] = chunk[var][kept]
+            errors['result'] = result[kept]
+            counts[:] += histogram(errors['result'])
+            yield stats.PointSummary.of(errors, inputs, quantiles=True)
+
+    summary = stats.merge_all(summaries(), inputs, chunk_rows)
+
+    tail = np.empty(len(references), dtype=[('count', 'i8')] + [(name, 'f8') for name in TAIL[1:]])
+    tail['count'] = 0
+    for name in TAIL[1:]:
+        tail[name] = np.nan
+    index = sample_points(points, summary.records, inputs)
+    found = index >= 0
+    records = summary.records[index[found]]
+    tail['count'][found] = records['count']
+    tail['mean'][found] = records['mean']
+    tail['max'][found] = records['max']
+    if summary.quantiles is not None:
+        sketch = summary.quantiles[index[found]]
+        tail['p50'][found] = sketch[:, stats.QUANTILES.index(0.5)]
+        tail['p99'][found] = sketch[:, stats.QUANTILES.index(0.99)]
+    return tail, counts
+
+
+def write_histogram(path, counts):
+    """Write histogram() counts as a CSV file of bins"""
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['lower_ulps', 'upper_ulps', 'count'])
+        writer.writerows(zip(HISTOGRAM_EDGES[:-1].tolist(), HISTOGRAM_EDGES[1:].tolist(),
+                             counts.tolist()))